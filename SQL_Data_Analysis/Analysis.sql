@@ -22,6 +22,20 @@ JOIN sales_dw.dim_date d
 GROUP BY d.year, d.month
 ORDER BY d.year, d.month;
 
+--Monthly sales trend for a time window
+--Filtering on f.date_id (not only on dim_date columns) lets PostgreSQL
+--prune a partitioned fact_sales to the months in the window
+SELECT
+    d.year,
+    d.month,
+    CAST(SUM(COALESCE(f.net_sale_amount, 0)) as DECIMAL(10,2)) AS monthly_revenue
+FROM sales_dw.fact_sales f
+JOIN sales_dw.dim_date d
+  ON f.date_id = d.date_id
+WHERE f.date_id BETWEEN 20250101 AND 20251231
+GROUP BY d.year, d.month
+ORDER BY d.year, d.month;
+
 --Average order value per customer
 SELECT
     c.customer_id,
@@ -182,4 +196,74 @@ SELECT
 FROM sales_dw.fact_sales f
 JOIN sales_dw.dim_date d
   ON f.date_id = d.date_id
-GROUP BY day_type;
\ No newline at end of file
+GROUP BY day_type;
+
+-- =========================================================
+-- Dashboard versions on the aggregate tables
+-- =========================================================
+--sales_dw.agg_sales_by_* are kept up to date by every fact load
+--(rebuild with: python main.py --rebuild-aggregates), so these read
+--a few thousand pre-aggregated rows instead of scanning fact_sales
+
+-- Top 10 products by total revenue
+SELECT
+    p.product_id,
+    p.product_name,
+    a.revenue AS total_revenue
+FROM sales_dw.agg_sales_by_product a
+JOIN sales_dw.dim_product p
+  ON a.product_id = p.product_id
+ORDER BY total_revenue DESC
+LIMIT 10;
+
+--Monthly sales trend
+SELECT
+    year,
+    month,
+    revenue AS monthly_revenue
+FROM sales_dw.agg_sales_by_month
+ORDER BY year, month;
+
+--Average order value per customer
+SELECT
+    c.customer_id,
+    c.customer_name,
+    CAST(a.revenue / a.order_count as DECIMAL(10,2)) AS avg_order_value
+FROM sales_dw.agg_sales_by_customer a
+JOIN sales_dw.dim_customer c
+  ON a.customer_id = c.customer_id
+ORDER BY avg_order_value DESC;
+
+-- Top 5 customers by lifetime value (LTV)
+SELECT
+    c.customer_id,
+    c.customer_name,
+    a.revenue AS lifetime_value
+FROM sales_dw.agg_sales_by_customer a
+JOIN sales_dw.dim_customer c
+  ON a.customer_id = c.customer_id
+ORDER BY lifetime_value DESC
+LIMIT 5;
+
+--Revenue contribution by product category (% of total)
+SELECT
+    category,
+    revenue,
+    ROUND((revenue / SUM(revenue) OVER ()) * 100, 2) AS revenue_pct
+FROM sales_dw.agg_sales_by_category
+ORDER BY revenue_pct DESC;
+
+--Rolling 3-month sales average
+SELECT
+    year,
+    month,
+    revenue AS monthly_sales,
+    ROUND(
+        AVG(revenue) OVER (
+            ORDER BY year, month
+            ROWS BETWEEN 2 PRECEDING AND CURRENT ROW
+        ),
+        2
+    ) AS rolling_3_month_avg
+FROM sales_dw.agg_sales_by_month
+ORDER BY year, month;
@@ -47,3 +47,10 @@ SELECT *
 FROM sales_dw.fact_sales
 WHERE net_sale_amount > total_sale_amount
    OR net_sale_amount < 0;
+
+
+-- Quarantined staging rows per run and reason (SQL validation backend)
+SELECT run_id, reject_reason, COUNT(*) AS rows_quarantined, MAX(quarantined_at) AS quarantined_at
+FROM sales_staging.quarantine_sales
+GROUP BY run_id, reject_reason
+ORDER BY quarantined_at DESC, reject_reason;
@@ -7,3 +7,9 @@ ON sales_dw.fact_sales (product_id);
 
 CREATE INDEX IF NOT EXISTS idx_fact_sales_date
 ON sales_dw.fact_sales (date_id);
+
+-- Fact grain (load_fact anti-join)
+-- On a partitioned fact_sales (create_dw_tables(partition_facts=True))
+-- these indexes are created on every monthly partition.
+CREATE INDEX IF NOT EXISTS idx_fact_sales_grain
+ON sales_dw.fact_sales (customer_id, product_id, date_id);
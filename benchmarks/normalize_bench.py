@@ -0,0 +1,92 @@
+"""
+Benchmark + equivalence check for normalize_empty_strings.
+
+Scales the generator's sample CSVs (raw_data/processed_files) by
+--scale and compares the text-column fast path in etl/validate.py with
+the original whole-frame regex replace.
+
+Usage:
+    python -m benchmarks.normalize_bench --scale 1000
+"""
+
+import argparse
+import datetime
+import os
+import time
+
+import pandas as pd
+
+from etl.validate import normalize_empty_strings_with_counts
+
+SAMPLE_DIR = os.path.join("raw_data", "processed_files")
+SAMPLE_FILES = ["customers.csv", "products.csv", "sales_transactions.csv"]
+
+
+def normalize_empty_strings_reference(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Original implementation.
+    """
+    return df.replace(r"^\s*$", pd.NA, regex=True)
+
+
+def load_scaled(file_name: str, scale: int) -> pd.DataFrame:
+    """
+    Sample file repeated `scale` times, shaped like a staging frame:
+    numeric columns stay numeric, missing text comes back as blanks.
+    """
+    df = pd.read_csv(os.path.join(SAMPLE_DIR, file_name))
+    df = pd.concat([df] * scale, ignore_index=True)
+
+    for col in df.columns:
+        if df[col].dtype == object or pd.api.types.is_string_dtype(df[col]):
+            missing = df[col].isna()
+            df.loc[missing, col] = ""
+            df.loc[missing & (df.index % 2 == 1), col] = "   "
+
+    df["ingest_date"] = pd.Timestamp.now("UTC")
+    return df
+
+
+def check_object_columns() -> None:
+    """
+    Object columns holding no strings (dates) or a mix of strings and
+    other values must behave like the reference.
+    """
+    df = pd.DataFrame({
+        "dates": [datetime.date(2024, 1, 1), None, datetime.date(2024, 1, 2)],
+        "mixed": ["  ", 1, "a"],
+        "empty": pd.Series([None, None, None], dtype=object),
+    })
+    fast, _ = normalize_empty_strings_with_counts(df)
+    pd.testing.assert_frame_equal(fast, normalize_empty_strings_reference(df))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--scale", type=int, default=1000)
+    args = parser.parse_args()
+
+    check_object_columns()
+
+    for file_name in SAMPLE_FILES:
+        df = load_scaled(file_name, args.scale)
+
+        start = time.perf_counter()
+        fast, counts = normalize_empty_strings_with_counts(df)
+        fast_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        ref = normalize_empty_strings_reference(df)
+        ref_s = time.perf_counter() - start
+
+        pd.testing.assert_frame_equal(fast, ref)
+
+        print(
+            f"{file_name:<24} rows={len(df):>10,} "
+            f"regex={ref_s:7.2f}s fast={fast_s:7.2f}s "
+            f"speedup={ref_s / fast_s:6.1f}x nulled={counts}"
+        )
+
+
+if __name__ == "__main__":
+    main()
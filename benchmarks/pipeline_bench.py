@@ -0,0 +1,343 @@
+"""
+End-to-end benchmark for SalesETLPipeline.
+
+For each --rows scale, synthetic staging data (benchmarks/synthetic_data.py)
+is written to sales_staging and the pipeline is run stage by stage:
+extract, validate, transform, load. Each stage reports wall time,
+rows/sec and peak RSS, and the results are written as JSON so runs can
+be compared across commits.
+
+Every stage after extract also reports memory_multiple: its RSS growth
+over the in-memory size of the frames it starts from. The run exits
+non-zero when a stage grows by more than --memory-overhead-mb plus
+--max-memory-multiple times its input (0 disables), so a change that
+reintroduces whole-frame copies shows up as an error at any scale.
+tests/test_memory_bound.py runs the same check.
+
+Runs against Postgres with --dsn, otherwise against an embedded SQLite
+stand-in where sales_staging and sales_dw are attached databases.
+The run happens in a scratch working directory so reject files, logs
+and caches do not land in the repo.
+
+Usage:
+    python -m benchmarks.pipeline_bench --rows 10000 100000 1000000 \\
+        --output bench_results.json
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import Engine
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from benchmarks.synthetic_data import make_staging_frames  # noqa: E402
+
+# Bound on a stage's RSS growth: a fixed overhead (worker thread
+# arenas, first-use allocations) plus a multiple of its input frames
+MAX_MEMORY_MULTIPLE = 4.0
+MEMORY_OVERHEAD_MB = 64.0
+
+STAGING_TABLES = {
+    "customers": "customers_stage",
+    "products": "products_stage",
+    "sales": "sales_transactions_stage",
+}
+
+
+# =========================
+# DATABASE
+# =========================
+def sqlite_engine(workdir: str) -> Engine:
+    """
+    File-backed SQLite with sales_staging / sales_dw attached as schemas.
+    """
+    engine = create_engine(f"sqlite:///{os.path.join(workdir, 'main.db')}")
+
+    @event.listens_for(engine, "connect")
+    def _attach(dbapi_conn, _):
+        for schema in ("sales_staging", "sales_dw"):
+            path = os.path.join(workdir, f"{schema}.db")
+            dbapi_conn.execute(f"ATTACH DATABASE '{path}' AS {schema}")
+
+    return engine
+
+
+def reset_database(engine: Engine) -> None:
+    with engine.begin() as conn:
+        for schema in ("sales_staging", "sales_dw"):
+            if engine.dialect.name == "postgresql":
+                conn.execute(text(f"DROP SCHEMA IF EXISTS {schema} CASCADE"))
+                conn.execute(text(f"CREATE SCHEMA {schema}"))
+            else:
+                tables = conn.execute(text(
+                    f"SELECT name FROM {schema}.sqlite_master "
+                    f"WHERE type = 'table'"
+                )).scalars().all()
+                for table in tables:
+                    conn.execute(text(f"DROP TABLE {schema}.{table}"))
+
+        conn.execute(text("""
+            CREATE TABLE sales_staging.etl_audit_log (
+                pipeline_name VARCHAR PRIMARY KEY,
+                last_processed_ingest_date TIMESTAMP,
+                records_processed INTEGER,
+                records_rejected INTEGER,
+                records_loaded INTEGER,
+                run_status VARCHAR,
+                updated_at TIMESTAMP
+            )
+        """))
+
+
+def seed_staging(engine: Engine, sales_rows: int, seed: int) -> int:
+    customers, products, sales = make_staging_frames(sales_rows, seed)
+    frames = {"customers": customers, "products": products, "sales": sales}
+
+    for name, df in frames.items():
+        df.to_sql(
+            STAGING_TABLES[name],
+            engine,
+            schema="sales_staging",
+            if_exists="append",
+            index=False,
+            chunksize=50_000
+        )
+
+    return sum(len(df) for df in frames.values())
+
+
+# =========================
+# STAGES
+# =========================
+def _frames(pipeline) -> List[pd.DataFrame]:
+    return [
+        df for df in (pipeline.customers, pipeline.products, pipeline.sales)
+        if df is not None
+    ]
+
+
+def _frame_rows(pipeline) -> int:
+    return sum(len(df) for df in _frames(pipeline))
+
+
+def _frame_mb(pipeline) -> float:
+    from etl.dtypes import frame_bytes
+
+    return sum(frame_bytes(df) for df in _frames(pipeline)) / (1024 * 1024)
+
+
+def run_stages(
+    engine: Engine,
+    stages: List[str],
+    compact_dtypes: bool = False,
+    max_workers: Optional[int] = None,
+    partition_facts: bool = False,
+    validation_backend: str = "pandas"
+) -> List[Dict[str, Any]]:
+    """
+    Run the requested stages and return one metrics dict per stage.
+    rows_in is left empty for extract, which is rated on its output.
+    Later stages also get input_mb and memory_multiple
+    (rss_delta_mb / input_mb).
+    """
+    from etl.instrumentation import measure_stage
+    from etl.pipeline import SalesETLPipeline
+
+    options: Dict[str, Any] = {
+        "compact_dtypes": compact_dtypes,
+        "partition_facts": partition_facts,
+        "validation_backend": validation_backend,
+    }
+    if max_workers is not None:
+        options["max_workers"] = max_workers
+
+    pipeline = SalesETLPipeline(engine=engine, **options)
+    logging.getLogger().setLevel(logging.CRITICAL)
+
+    results = []
+    for stage in stages:
+        rows_in = input_mb = None
+        if stage != "extract":
+            rows_in = _frame_rows(pipeline)
+            input_mb = _frame_mb(pipeline)
+
+        with measure_stage(stage, rows_in=rows_in) as metrics:
+            getattr(pipeline, stage)()
+            metrics["rows_out"] = _frame_rows(pipeline)
+
+        multiple = ""
+        if input_mb:
+            metrics["input_mb"] = round(input_mb, 1)
+            metrics["memory_multiple"] = round(
+                metrics["rss_delta_mb"] / input_mb, 2
+            )
+            multiple = f" {metrics['memory_multiple']:.2f}x of {input_mb:.1f} MB"
+
+        results.append(metrics)
+        print(
+            f"  {stage:<10} {metrics['seconds']:9.3f}s "
+            f"{metrics['rows_per_sec'] or 0:>14,.0f} rows/s "
+            f"peak {metrics['peak_rss_mb']:>8.1f} MB "
+            f"(+{metrics['rss_delta_mb']:.1f}){multiple}"
+        )
+
+    # Drain the background reject writer before the next run
+    pipeline._close_reject_sink()
+
+    return results
+
+
+def memory_bound_mb(
+    input_mb: float,
+    max_multiple: float = MAX_MEMORY_MULTIPLE,
+    overhead_mb: float = MEMORY_OVERHEAD_MB
+) -> float:
+    return overhead_mb + max_multiple * input_mb
+
+
+def memory_violations(
+    runs: List[Dict[str, Any]],
+    max_multiple: float = MAX_MEMORY_MULTIPLE,
+    overhead_mb: float = MEMORY_OVERHEAD_MB
+) -> List[str]:
+    return [
+        f"sales_rows={run['sales_rows']:,} {m['stage']}: "
+        f"+{m['rss_delta_mb']} MB over its {m['input_mb']} MB input "
+        f"(max {memory_bound_mb(m['input_mb'], max_multiple, overhead_mb):.1f} MB)"
+        for run in runs
+        for m in run["stages"]
+        if "input_mb" in m
+        and m["rss_delta_mb"] > memory_bound_mb(
+            m["input_mb"], max_multiple, overhead_mb
+        )
+    ]
+
+
+# =========================
+# RUN
+# =========================
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "HEAD"], cwd=REPO_ROOT, text=True
+        ).strip()
+    except Exception:
+        return None
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="End-to-end SalesETLPipeline benchmark"
+    )
+    parser.add_argument(
+        "--rows", type=int, nargs="+", default=[10_000, 100_000],
+        help="Sales rows per scale (e.g. 10000 100000 1000000 10000000)"
+    )
+    parser.add_argument(
+        "--dsn", default=None,
+        help="SQLAlchemy URL of a scratch Postgres (schemas are dropped!)"
+    )
+    parser.add_argument(
+        "--stages", nargs="+",
+        default=["extract", "validate", "transform", "load"]
+    )
+    parser.add_argument("--compact-dtypes", action="store_true")
+    parser.add_argument("--partition-facts", action="store_true")
+    parser.add_argument(
+        "--validation-backend", choices=["pandas", "sql"], default="pandas",
+        help="sql pushes validation into the staging database (needs --dsn)"
+    )
+    parser.add_argument(
+        "--workers", type=int, default=None,
+        help="Pipeline max_workers (default: the pipeline's own)"
+    )
+    parser.add_argument(
+        "--max-memory-multiple", type=float, default=MAX_MEMORY_MULTIPLE,
+        help="Fail if a stage's RSS growth exceeds --memory-overhead-mb "
+             "plus this multiple of its input frames' size (0 disables)"
+    )
+    parser.add_argument(
+        "--memory-overhead-mb", type=float, default=MEMORY_OVERHEAD_MB,
+        help="Fixed RSS growth allowed per stage on top of the multiple"
+    )
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--workdir", default=None)
+    parser.add_argument("--output", default="bench_results.json")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+
+    output = os.path.abspath(args.output)
+    workdir = args.workdir or tempfile.mkdtemp(prefix="sales_etl_bench_")
+    os.makedirs(workdir, exist_ok=True)
+    os.chdir(workdir)
+
+    report: Dict[str, Any] = {
+        "git_commit": _git_commit(),
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "backend": "postgresql" if args.dsn else "sqlite",
+        "compact_dtypes": args.compact_dtypes,
+        "workers": args.workers,
+        "partition_facts": args.partition_facts,
+        "validation_backend": args.validation_backend,
+        "max_memory_multiple": args.max_memory_multiple,
+        "memory_overhead_mb": args.memory_overhead_mb,
+        "runs": [],
+    }
+
+    for rows in args.rows:
+        engine = create_engine(args.dsn) if args.dsn else sqlite_engine(workdir)
+        reset_database(engine)
+
+        print(f"sales_rows={rows:,}")
+        staged = seed_staging(engine, rows, args.seed)
+
+        report["runs"].append({
+            "sales_rows": rows,
+            "staged_rows": staged,
+            "stages": run_stages(
+                engine, args.stages, args.compact_dtypes, args.workers,
+                args.partition_facts, args.validation_backend
+            ),
+        })
+        engine.dispose()
+
+    with open(output, "w") as fh:
+        json.dump(report, fh, indent=2)
+    print(f"Results written to {output}")
+
+    if not args.max_memory_multiple:
+        return
+
+    violations = memory_violations(
+        report["runs"], args.max_memory_multiple, args.memory_overhead_mb
+    )
+    for violation in violations:
+        print(f"Memory check failed: {violation}")
+    if violations:
+        sys.exit(1)
+    print(
+        f"Memory check passed: every stage within "
+        f"{args.memory_overhead_mb:g} MB + {args.max_memory_multiple:g}x its input"
+    )
+
+
+if __name__ == "__main__":
+    main()
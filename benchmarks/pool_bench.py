@@ -0,0 +1,109 @@
+"""
+Benchmark + lifecycle check for the shared engine pool (db/database.py).
+
+Runs --threads threads doing --checkouts short queries each on one
+pooled engine and prints pool_stats(). Then checks that the engine
+still connects, with its stats intact, after engine.dispose() and in
+a forked child (where the pool is disposed and the stats reset).
+
+Usage:
+    python -m benchmarks.pool_bench --dsn postgresql+psycopg2://... \\
+        --threads 16 --checkouts 200
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from db.database import DATABASE_URL, _create_engine, pool_stats  # noqa: E402
+
+
+def select_one(engine: Engine) -> None:
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT 1")).scalar() == 1
+
+
+def run_load(engine: Engine, threads: int, checkouts: int) -> float:
+    def work():
+        for _ in range(checkouts):
+            select_one(engine)
+
+    workers = [threading.Thread(target=work) for _ in range(threads)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return time.perf_counter() - start
+
+
+def check_dispose(engine: Engine) -> None:
+    before = pool_stats(engine)["checkouts"]
+    engine.dispose()
+    select_one(engine)
+
+    stats = pool_stats(engine)
+    assert stats["checkouts"] == before + 1, stats
+    assert stats["in_use"] == 0, stats
+
+
+def check_fork(engine: Engine) -> None:
+    pid = os.fork()
+    if pid == 0:
+        # Child: inherited pool was disposed and its stats reset
+        try:
+            select_one(engine)
+            stats = pool_stats(engine)
+            assert stats["checkouts"] == 1, stats
+            assert stats["in_use"] == 0, stats
+        except BaseException as exc:
+            print(f"child failed: {exc!r}", file=sys.stderr)
+            os._exit(1)
+        os._exit(0)
+
+    _, status = os.waitpid(pid, 0)
+    assert os.waitstatus_to_exitcode(status) == 0, "forked child could not connect"
+
+    # The parent's pool is untouched
+    select_one(engine)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--dsn", default=DATABASE_URL)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--checkouts", type=int, default=200)
+    parser.add_argument("--null-pool", action="store_true")
+    args = parser.parse_args()
+
+    engine = _create_engine(args.dsn, args.null_pool)
+
+    seconds = run_load(engine, args.threads, args.checkouts)
+    total = args.threads * args.checkouts
+    print(
+        f"threads={args.threads} checkouts={total:,} "
+        f"{seconds:.2f}s ({total / seconds:,.0f}/s)"
+    )
+    print(f"pool: {pool_stats(engine)}")
+
+    check_dispose(engine)
+    print("dispose -> connect: ok")
+
+    if hasattr(os, "fork"):
+        check_fork(engine)
+        print("fork -> connect: ok")
+
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
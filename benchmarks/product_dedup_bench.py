@@ -0,0 +1,160 @@
+"""
+Benchmark + equivalence check for resolve_duplicate_products.
+
+Compares the vectorized engine in etl/product_dedup.py against the
+original per-group implementation kept below as the reference.
+
+Usage:
+    python -m benchmarks.product_dedup_bench --rows 20000
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from etl.product_dedup import (
+    INVALID_TOKENS,
+    is_valid_product_name,
+    resolve_duplicate_products,
+)
+
+
+# =========================
+# REFERENCE IMPLEMENTATION
+# =========================
+def resolve_duplicate_products_reference(products_df: pd.DataFrame):
+    """
+    Original groupby loop, logging removed.
+    """
+    df = products_df.copy()
+    df["product_name"] = df["product_name"].astype(str).str.strip()
+    df["is_valid_name"] = df["product_name"].apply(is_valid_product_name)
+
+    clean_rows = []
+    rejected_rows = []
+
+    for _, group in df.groupby("product_id"):
+        valid_names = group[group["is_valid_name"]]
+
+        if valid_names.empty:
+            rejected_rows.append(
+                group.assign(reject_reason="INVALID_PRODUCT_NAME")
+            )
+            continue
+
+        ranked = (
+            valid_names.assign(
+                valid_price=lambda x: x["unit_price"].fillna(0) > 0,
+                has_category=lambda x: x["category"].notna(),
+                has_brand=lambda x: x["brand"].notna()
+            )
+            .sort_values(
+                by=["valid_price", "has_category", "has_brand", "unit_price"],
+                ascending=False
+            )
+        )
+
+        keeper = ranked.iloc[[0]]
+        duplicates = group.drop(index=keeper.index)
+        clean_rows.append(keeper)
+
+        if not duplicates.empty:
+            rejected_rows.append(
+                duplicates.assign(reject_reason="DUPLICATE_PRODUCT_ID")
+            )
+
+    clean_df = pd.concat(clean_rows, ignore_index=True)
+    rejected_df = (
+        pd.concat(rejected_rows, ignore_index=True)
+        if rejected_rows else pd.DataFrame()
+    )
+    return clean_df, rejected_df
+
+
+# =========================
+# SYNTHETIC DATA
+# =========================
+def make_products(rows: int, seed: int = 42) -> pd.DataFrame:
+    """
+    Products with the anomaly mix of random_faker_data_generator.py:
+    ~2% duplicate ids, ~10% missing brand, ~10% bad prices,
+    plus short / stop-word / numeric names.
+    """
+    rng = np.random.default_rng(seed)
+
+    ids = np.arange(1, rows + 1)
+    dup = rng.random(rows) < 0.02
+    ids[dup] = rng.integers(1, max(rows // 10, 2), dup.sum())
+
+    valid_words = np.array(
+        ["Widget", "Gadget", "Lamp", "Chair", "Kettle",
+         "Blender", "Jacket", "Racket", "Novel", "Table"]
+    )
+    invalid_words = np.array(sorted(INVALID_TOKENS) + ["Pan", "1234"])
+    names = valid_words[rng.integers(0, len(valid_words), rows)]
+    bad_name = rng.random(rows) < 0.05
+    names[bad_name] = invalid_words[
+        rng.integers(0, len(invalid_words), bad_name.sum())
+    ]
+
+    categories = np.array(["Electronics", "Clothing", "Home", "Books", "Sports"])
+    brands = np.array(["Acme", "Globex", "Initech", "Umbrella", "Hooli"])
+
+    price = rng.uniform(5, 500, rows).round(2)
+    bad_price = rng.random(rows) < 0.1
+    price[bad_price] = rng.choice([np.nan, -10.0, 0.0], bad_price.sum())
+
+    df = pd.DataFrame({
+        "product_id": ids,
+        "product_name": names,
+        "category": categories[rng.integers(0, len(categories), rows)],
+        "brand": brands[rng.integers(0, len(brands), rows)],
+        "unit_price": price,
+    })
+    df.loc[rng.random(rows) < 0.1, "brand"] = None
+    df.loc[rng.random(rows) < 0.05, "category"] = None
+    return df
+
+
+# =========================
+# RUN
+# =========================
+def _timed(func, df):
+    start = time.perf_counter()
+    result = func(df)
+    return result, time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=20_000)
+    parser.add_argument(
+        "--skip-reference",
+        action="store_true",
+        help="Only time the vectorized engine (for very large --rows)"
+    )
+    args = parser.parse_args()
+
+    df = make_products(args.rows)
+
+    (clean, rejected), fast_s = _timed(resolve_duplicate_products, df)
+    print(f"vectorized : {fast_s:8.3f}s  ({args.rows / fast_s:,.0f} rows/s)")
+
+    if args.skip_reference:
+        return
+
+    (ref_clean, ref_rejected), ref_s = _timed(
+        resolve_duplicate_products_reference, df
+    )
+    print(f"reference  : {ref_s:8.3f}s  ({args.rows / ref_s:,.0f} rows/s)")
+    print(f"speedup    : {ref_s / fast_s:8.1f}x")
+
+    pd.testing.assert_frame_equal(clean, ref_clean)
+    pd.testing.assert_frame_equal(rejected, ref_rejected)
+    print("outputs identical")
+
+
+if __name__ == "__main__":
+    main()
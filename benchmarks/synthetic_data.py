@@ -0,0 +1,153 @@
+"""
+Synthetic staging data for benchmarks.
+
+Vectorized (NumPy) version of project_documents/random_faker_data_generator.py
+with the same anomaly mix, scalable to millions of rows without Faker.
+Customers and products are sized at 1/5 of the sales rows, as in the
+original 1100 / 1100 / 5500 split.
+"""
+
+from typing import Tuple
+
+import numpy as np
+import pandas as pd
+
+CATEGORIES = np.array(["Electronics", "Clothing", "Home", "Books", "Sports"])
+
+FIRST_NAMES = np.array(
+    ["JOHN", "DAWN", "TRACY", "EMMA", "LIAM", "NOAH", "OLIVIA", "AVA"]
+)
+LAST_NAMES = np.array(
+    ["CONWAY", "GRANT", "MILLER", "SMITH", "LOPEZ", "KING", "WRIGHT", "HILL"]
+)
+CITIES = np.array(
+    ["Lake Kimberly", "Port Anna", "East John", "New Mark", "West Amy",
+     "North Paul", "South Lisa", "Fort Kevin"]
+)
+STATES = np.array(["NV", "CA", "TX", "NY", "WA", "FL", "PW", "OH"])
+PRODUCT_WORDS = np.array(
+    ["Myself", "Project", "Kettle", "Lamp", "Chair", "Novel", "Jacket",
+     "Blender", "Racket", "Table"]
+)
+# Rejected by is_valid_product_name
+INVALID_PRODUCT_WORDS = np.array(["half", "the", "oil", "1234"])
+BRANDS = np.array(["Grant LLC", "Acme", "Globex", "Initech", "Hooli"])
+
+
+def _dates(rng, rows: int, years_back: int) -> np.ndarray:
+    today = np.datetime64("today", "D")
+    offsets = rng.integers(0, 365 * years_back, rows)
+    return (today - offsets).astype(str).astype(object)
+
+
+def _pick(rng, values: np.ndarray, rows: int) -> np.ndarray:
+    return values[rng.integers(0, len(values), rows)]
+
+
+def make_customers(rng, rows: int) -> pd.DataFrame:
+    ids = np.arange(1, rows + 1)
+    dup = rng.random(rows) < 0.02
+    ids[dup] = rng.integers(1, max(rows // 22, 2), dup.sum())
+
+    names = (
+        _pick(rng, FIRST_NAMES, rows).astype(object) + " "
+        + _pick(rng, LAST_NAMES, rows)
+    )
+    padded = rng.random(rows) < 0.1
+    names[padded] = "  " + np.char.title(names[padded].astype(str)).astype(object)
+
+    df = pd.DataFrame({
+        "customer_id": ids,
+        "customer_name": names,
+        "email": (np.char.lower(names.astype(str)) + "@example.com").astype(object),
+        "city": _pick(rng, CITIES, rows).astype(object),
+        "state": _pick(rng, STATES, rows).astype(object),
+        "signup_date": _dates(rng, rows, 5),
+    })
+    df.loc[rng.random(rows) < 0.1, "email"] = None
+    df.loc[rng.random(rows) < 0.1, "city"] = None
+    df.loc[rng.random(rows) < 0.1, "state"] = ""
+    df.loc[rng.random(rows) < 0.05, "signup_date"] = "invalid_date"
+    return df
+
+
+def make_products(rng, rows: int) -> pd.DataFrame:
+    ids = np.arange(1, rows + 1)
+    dup = rng.random(rows) < 0.02
+    ids[dup] = rng.integers(1, max(rows // 11, 2), dup.sum())
+
+    price = rng.uniform(5, 500, rows).round(2)
+    bad = rng.random(rows) < 0.1
+    price[bad] = rng.choice([np.nan, -10.0, 0.0], bad.sum())
+
+    df = pd.DataFrame({
+        "product_id": ids,
+        "product_name": _pick(rng, PRODUCT_WORDS, rows).astype(object),
+        "category": _pick(rng, CATEGORIES, rows).astype(object),
+        "brand": _pick(rng, BRANDS, rows).astype(object),
+        "unit_price": price,
+    })
+    df.loc[rng.random(rows) < 0.1, "brand"] = None
+
+    bad_name = rng.random(rows) < 0.03
+    df.loc[bad_name, "product_name"] = _pick(
+        rng, INVALID_PRODUCT_WORDS, bad_name.sum()
+    )
+    return df
+
+
+def make_sales(
+    rng,
+    rows: int,
+    customers: int,
+    products: int
+) -> pd.DataFrame:
+    ids = np.arange(1, rows + 1)
+    dup = rng.random(rows) < 0.03
+    ids[dup] = rng.integers(1, max(rows // 27, 2), dup.sum())
+
+    quantity = rng.integers(1, 11, rows).astype(float)
+    bad = rng.random(rows) < 0.1
+    quantity[bad] = rng.choice([np.nan, -3.0, 0.0], bad.sum())
+
+    price = rng.uniform(5, 500, rows).round(2)
+    bad = rng.random(rows) < 0.1
+    price[bad] = rng.choice([np.nan, -20.0, 0.0], bad.sum())
+
+    discount = np.where(
+        rng.random(rows) > 0.8, rng.uniform(0, 50, rows).round(2), 0.0
+    )
+
+    df = pd.DataFrame({
+        "transaction_id": ids,
+        # ~9% of ids point past the dimension ranges -> orphans
+        "customer_id": rng.integers(1, int(customers * 1.09) + 1, rows),
+        "product_id": rng.integers(1, int(products * 1.09) + 1, rows),
+        "transaction_date": _dates(rng, rows, 2),
+        "quantity": quantity,
+        "unit_price": price,
+        "discount": discount,
+    })
+    df.loc[rng.random(rows) < 0.05, "transaction_date"] = "2023-99-99"
+    return df
+
+
+def make_staging_frames(
+    sales_rows: int,
+    seed: int = 42
+) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    """
+    (customers, products, sales) staging frames, stamped with ingest_date.
+    """
+    rng = np.random.default_rng(seed)
+    dim_rows = max(sales_rows // 5, 10)
+
+    customers = make_customers(rng, dim_rows)
+    products = make_products(rng, dim_rows)
+    sales = make_sales(rng, sales_rows, dim_rows, dim_rows)
+
+    ingest_date = pd.Timestamp.now("UTC").tz_localize(None)
+    for df in (customers, products, sales):
+        df["ingest_date"] = ingest_date
+
+    return customers, products, sales
@@ -0,0 +1,182 @@
+# db/bulk_copy.py
+"""
+Bulk DataFrame writes through Postgres COPY.
+
+copy_dataframe() streams a frame into a table with
+COPY ... FROM STDIN via psycopg2's copy_expert. Rows are serialized to
+CSV one chunk at a time, so the whole frame is never rendered as text
+at once. Any other dialect falls back to DataFrame.to_sql.
+"""
+
+import io
+import logging
+from typing import List, Optional, Union
+
+import pandas as pd
+from sqlalchemy import Integer, inspect
+from sqlalchemy.engine import Connection, Engine
+
+logger = logging.getLogger(__name__)
+
+# Rows rendered to CSV per chunk
+COPY_CHUNK_ROWS = 50_000
+
+# Bytes psycopg2 pulls from the stream per read()
+COPY_READ_SIZE = 1 << 20
+
+# Bound parameters per multi-row INSERT in the to_sql fallback
+# (SQLite's default SQLITE_MAX_VARIABLE_NUMBER)
+INSERT_MAX_PARAMS = 32_766
+
+
+class _CSVChunkStream(io.TextIOBase):
+    """
+    Read-only text stream that renders a DataFrame to CSV lazily,
+    chunk_rows rows at a time, as COPY consumes it.
+    """
+
+    def __init__(
+        self,
+        df: pd.DataFrame,
+        chunk_rows: int,
+        int_columns: List[str]
+    ) -> None:
+        self._df = df
+        self._chunk_rows = chunk_rows
+        self._int_columns = int_columns
+        self._offset = 0
+        self._current = io.StringIO()
+
+    def readable(self) -> bool:
+        return True
+
+    def _next_chunk(self) -> bool:
+        if self._offset >= len(self._df):
+            return False
+
+        chunk = self._df.iloc[self._offset:self._offset + self._chunk_rows]
+        self._offset += self._chunk_rows
+
+        # Float columns bound for INTEGER targets (NaN-upcast ids,
+        # quantities) must render as "7", not "7.0"
+        if self._int_columns:
+            chunk = chunk.astype({c: "Int64" for c in self._int_columns})
+
+        self._current = io.StringIO(chunk.to_csv(index=False, header=False))
+        return True
+
+    def read(self, size: Optional[int] = -1) -> str:
+        if size is None or size < 0:
+            parts = [self._current.read()]
+            while self._next_chunk():
+                parts.append(self._current.read())
+            return "".join(parts)
+
+        parts = []
+        remaining = size
+        while remaining > 0:
+            data = self._current.read(remaining)
+            if data:
+                parts.append(data)
+                remaining -= len(data)
+            elif not self._next_chunk():
+                break
+        return "".join(parts)
+
+
+def _supports_copy(conn: Connection) -> bool:
+    return (
+        conn.dialect.name == "postgresql"
+        and conn.dialect.driver == "psycopg2"
+    )
+
+
+def _integer_columns_to_cast(
+    conn: Connection,
+    df: pd.DataFrame,
+    table_name: str,
+    schema: Optional[str]
+) -> List[str]:
+    """
+    Float frame columns whose target column is an INTEGER type.
+    """
+    int_targets = {
+        col["name"]
+        for col in inspect(conn).get_columns(table_name, schema=schema)
+        if isinstance(col["type"], Integer)
+    }
+    return [
+        c for c in df.columns
+        if c in int_targets and pd.api.types.is_float_dtype(df[c])
+    ]
+
+
+def copy_dataframe(
+    con: Union[Engine, Connection],
+    df: pd.DataFrame,
+    table_name: str,
+    schema: Optional[str] = None,
+    chunk_rows: int = COPY_CHUNK_ROWS
+) -> int:
+    """
+    Append df to schema.table_name, creating the table from the frame's
+    dtypes if it does not exist yet (like to_sql(if_exists="append")).
+
+    Pass a Connection to take part in an open transaction; an Engine
+    runs the write in its own transaction.
+
+    Returns:
+        Number of rows written.
+    """
+    if isinstance(con, Engine):
+        with con.begin() as conn:
+            return copy_dataframe(conn, df, table_name, schema, chunk_rows)
+
+    if df.empty:
+        return 0
+
+    if not _supports_copy(con):
+        df.to_sql(
+            table_name,
+            con,
+            schema=schema,
+            if_exists="append",
+            index=False,
+            method="multi",
+            chunksize=max(1, min(chunk_rows, INSERT_MAX_PARAMS // len(df.columns)))
+        )
+        return len(df)
+
+    if not inspect(con).has_table(table_name, schema=schema):
+        df.head(0).to_sql(
+            table_name,
+            con,
+            schema=schema,
+            if_exists="append",
+            index=False
+        )
+
+    preparer = con.dialect.identifier_preparer
+    target = preparer.quote(table_name)
+    if schema:
+        target = f"{preparer.quote_schema(schema)}.{target}"
+    columns = ", ".join(preparer.quote(str(c)) for c in df.columns)
+
+    stream = _CSVChunkStream(
+        df,
+        chunk_rows,
+        _integer_columns_to_cast(con, df, table_name, schema)
+    )
+
+    cursor = con.connection.cursor()
+    try:
+        cursor.copy_expert(
+            f"COPY {target} ({columns}) FROM STDIN WITH (FORMAT csv)",
+            stream,
+            size=COPY_READ_SIZE
+        )
+    finally:
+        cursor.close()
+
+    logger.debug("COPY wrote %d rows into %s", len(df), target)
+    return len(df)
@@ -1,16 +1,222 @@
 # db/database.py
-from sqlalchemy import create_engine
+"""
+Process-wide SQLAlchemy engines.
+
+get_engine() hands every caller (ingestion workers, pipeline stages)
+the same pooled engine, so they share one sized connection pool
+instead of each opening its own. Pool sizing, timeouts and psycopg2
+executemany tuning come from config.py when set there, otherwise from
+the defaults below.
+
+Pass null_pool=True for worker processes: a NullPool engine opens a
+fresh connection per checkout and never shares sockets across fork().
+Pooled engines are also disposed in forked children automatically.
+"""
+
+import logging
+import os
+import threading
+import time
+import weakref
+from typing import Any, Dict, Optional
+
+import config
+from sqlalchemy import create_engine, event
 from sqlalchemy.engine import Engine
+from sqlalchemy.pool import NullPool, QueuePool
 from config import DB_NAME, DB_USER, DB_PASSWORD, DB_HOST, DB_PORT
 
+logger = logging.getLogger(__name__)
+
 DATABASE_URL = (
     f"postgresql+psycopg2://{DB_USER}:{DB_PASSWORD}"
     f"@{DB_HOST}:{DB_PORT}/{DB_NAME}"
 )
 
-def get_engine() -> Engine:
+# =========================
+# CONFIG (overridable in config.py)
+# =========================
+# Persistent connections, and extra ones allowed under load.
+# Size for INGEST_WORKERS + DAG_MAX_WORKERS running at once.
+DB_POOL_SIZE = getattr(config, "DB_POOL_SIZE", 8)
+DB_MAX_OVERFLOW = getattr(config, "DB_MAX_OVERFLOW", 4)
+
+# Seconds to wait for a free connection before raising
+DB_POOL_TIMEOUT = getattr(config, "DB_POOL_TIMEOUT", 30)
+
+# Recycle connections older than this many seconds
+DB_POOL_RECYCLE = getattr(config, "DB_POOL_RECYCLE", 1800)
+
+# Server-side statement_timeout in ms (0 = no limit)
+DB_STATEMENT_TIMEOUT_MS = getattr(config, "DB_STATEMENT_TIMEOUT_MS", 0)
+
+# psycopg2 executemany: rows per INSERT ... VALUES page and per
+# execute_batch() page for UPDATE / DELETE
+DB_INSERT_PAGE_SIZE = getattr(config, "DB_INSERT_PAGE_SIZE", 1000)
+DB_BATCH_PAGE_SIZE = getattr(config, "DB_BATCH_PAGE_SIZE", 500)
+
+_engines: Dict[bool, Engine] = {}
+_engines_lock = threading.Lock()
+
+# Every engine built here, for the after-fork dispose
+_instrumented: "weakref.WeakSet[Engine]" = weakref.WeakSet()
+
+
+class PoolStats:
     """
-    Creates and returns a SQLAlchemy Engine.
+    Checkout latency and utilization of one engine's pool.
+    """
+
+    def __init__(self, capacity: Optional[int]) -> None:
+        self.capacity = capacity
+        self.reset()
+
+    def reset(self) -> None:
+        """
+        Zero the counters (a forked child starts with an empty pool).
+        The lock is replaced too: the parent may have held it at fork().
+        """
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.in_use = 0
+        self.peak_in_use = 0
+
+    def record_wait(self, seconds: float) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+
+    def checked_out(self) -> None:
+        with self._lock:
+            self.in_use += 1
+            self.peak_in_use = max(self.peak_in_use, self.in_use)
+
+    def checked_in(self) -> None:
+        with self._lock:
+            self.in_use -= 1
+
+    def as_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "wait_avg_ms": round(
+                    1000 * self.wait_total / self.checkouts, 3
+                ) if self.checkouts else 0.0,
+                "wait_max_ms": round(1000 * self.wait_max, 3),
+                "in_use": self.in_use,
+                "peak_in_use": self.peak_in_use,
+                "capacity": self.capacity,
+                "peak_utilization": round(
+                    self.peak_in_use / self.capacity, 3
+                ) if self.capacity else None,
+            }
+
+
+class _TimedCheckout:
+    """
+    Pool mixin: time each checkout, including any wait for a free
+    connection (or the connect itself on NullPool).
+    """
+
+    stats: PoolStats
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            self.stats.record_wait(time.perf_counter() - start)
+
+    def recreate(self):
+        # engine.dispose() swaps in a fresh pool; keep counting into the
+        # same stats, which the checkout / checkin listeners also hold
+        pool = super().recreate()
+        pool.stats = self.stats
+        return pool
+
+
+class InstrumentedQueuePool(_TimedCheckout, QueuePool):
+    pass
+
+
+class InstrumentedNullPool(_TimedCheckout, NullPool):
+    pass
+
+
+def _create_engine(url: str, null_pool: bool) -> Engine:
+    connect_args = {}
+    if DB_STATEMENT_TIMEOUT_MS:
+        connect_args["options"] = (
+            f"-c statement_timeout={int(DB_STATEMENT_TIMEOUT_MS)}"
+        )
+
+    pool_args: Dict[str, Any] = {"poolclass": InstrumentedNullPool}
+    capacity = None
+    if not null_pool:
+        pool_args = {
+            "poolclass": InstrumentedQueuePool,
+            "pool_size": DB_POOL_SIZE,
+            "max_overflow": DB_MAX_OVERFLOW,
+            "pool_timeout": DB_POOL_TIMEOUT,
+            "pool_recycle": DB_POOL_RECYCLE,
+            "pool_use_lifo": True,
+        }
+        capacity = DB_POOL_SIZE + max(DB_MAX_OVERFLOW, 0)
+
+    engine = create_engine(
+        url,
+        pool_pre_ping=True,
+        connect_args=connect_args,
+        executemany_mode="values_plus_batch",
+        insertmanyvalues_page_size=DB_INSERT_PAGE_SIZE,
+        executemany_batch_page_size=DB_BATCH_PAGE_SIZE,
+        **pool_args
+    )
+
+    stats = engine.pool.stats = PoolStats(capacity)
+    event.listen(engine, "checkout", lambda *_: stats.checked_out())
+    event.listen(engine, "checkin", lambda *_: stats.checked_in())
+
+    _instrumented.add(engine)
+    return engine
+
+
+def get_engine(null_pool: bool = False) -> Engine:
+    """
+    Returns the process-wide SQLAlchemy Engine.
     This is the single source of truth for DB connections.
     """
-    return create_engine(DATABASE_URL, pool_pre_ping=True)
+    with _engines_lock:
+        engine = _engines.get(null_pool)
+        if engine is None:
+            engine = _engines[null_pool] = _create_engine(
+                DATABASE_URL, null_pool
+            )
+        return engine
+
+
+def pool_stats(engine: Optional[Engine] = None) -> Dict[str, Any]:
+    """
+    Checkout latency / utilization counters plus the pool's current
+    status. Empty for engines not created by get_engine().
+    """
+    engine = engine or get_engine()
+    stats = getattr(engine.pool, "stats", None)
+    if stats is None:
+        return {}
+
+    return {**stats.as_dict(), "status": engine.pool.status()}
+
+
+def _dispose_after_fork() -> None:
+    # Pooled sockets belong to the parent; drop them without closing
+    for engine in list(_instrumented):
+        engine.pool.stats.reset()
+        engine.dispose(close=False)
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_dispose_after_fork)
@@ -0,0 +1,192 @@
+# etl/checkpoint.py
+"""
+Stage checkpoints for resumable batch runs.
+
+With checkpointing on, SalesETLPipeline.run() saves its frames after
+extract, validate and transform as Feather files (Arrow IPC, lz4),
+next to a small JSON manifest:
+
+    cache/checkpoints/<run_id>/manifest.json
+    cache/checkpoints/<run_id>/<stage>/<frame>.feather
+
+The manifest records the watermark the run extracted from, the
+ingest_date ceiling it was pinned to, the completed stages and the
+run's counters. Only the last completed stage's frames are kept, and
+a successful run clears the checkpoints (its watermark has moved past
+them).
+
+A resumed run (main.py --resume) picks the newest checkpoint whose
+watermark is still the pipeline's current one, reloads its frames and
+continues after the last completed stage.
+"""
+
+import json
+import logging
+import os
+import shutil
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401  (feather engine)
+except ImportError:  # optional: checkpointing is skipped without it
+    pyarrow = None
+
+logger = logging.getLogger(__name__)
+
+# =========================
+# CONFIG
+# =========================
+CHECKPOINT_DIR = "cache/checkpoints"
+
+# Save stage checkpoints on every batch run
+CHECKPOINT_STAGES = False
+
+_MANIFEST = "manifest.json"
+
+
+def checkpoints_supported() -> bool:
+    return pyarrow is not None
+
+
+def _watermark_key(watermark) -> str:
+    # The audit log returns a Timestamp, its default is a date string
+    return pd.Timestamp(watermark).isoformat()
+
+
+class RunCheckpoint:
+    """
+    Checkpoint directory of one pipeline run.
+    """
+
+    def __init__(self, path: str, manifest: Dict[str, Any]) -> None:
+        self.path = path
+        self.manifest = manifest
+
+    @classmethod
+    def create(
+        cls,
+        run_id: str,
+        watermark,
+        ceiling,
+        options: Dict[str, Any],
+        root: str = CHECKPOINT_DIR
+    ) -> "RunCheckpoint":
+        checkpoint = cls(os.path.join(root, run_id), {
+            "run_id": run_id,
+            "watermark": _watermark_key(watermark),
+            "ceiling": None if ceiling is None else str(ceiling),
+            "options": options,
+            "stages": [],
+            "counters": {},
+            "created_at": datetime.utcnow().isoformat(),
+        })
+        os.makedirs(checkpoint.path, exist_ok=True)
+        checkpoint._write_manifest()
+        return checkpoint
+
+    @classmethod
+    def load(cls, path: str) -> "RunCheckpoint":
+        with open(os.path.join(path, _MANIFEST)) as f:
+            return cls(path, json.load(f))
+
+    @property
+    def run_id(self) -> str:
+        return self.manifest["run_id"]
+
+    @property
+    def stages(self) -> List[str]:
+        return self.manifest["stages"]
+
+    @property
+    def last_stage(self) -> Optional[str]:
+        return self.stages[-1] if self.stages else None
+
+    @property
+    def counters(self) -> Dict[str, int]:
+        return self.manifest["counters"]
+
+    def save(
+        self,
+        stage: str,
+        frames: Dict[str, Optional[pd.DataFrame]],
+        **counters: int
+    ) -> None:
+        """
+        Persist frames as the output of stage. The stage counts as
+        completed once the manifest naming it is on disk.
+        """
+        stage_dir = os.path.join(self.path, stage)
+        os.makedirs(stage_dir, exist_ok=True)
+
+        for name, df in frames.items():
+            if df is not None:
+                df.reset_index(drop=True).to_feather(
+                    os.path.join(stage_dir, f"{name}.feather")
+                )
+
+        previous = self.last_stage
+        self.stages.append(stage)
+        self.counters.update(counters)
+        self._write_manifest()
+
+        # Only the newest stage is ever resumed from
+        if previous is not None:
+            shutil.rmtree(os.path.join(self.path, previous), ignore_errors=True)
+
+    def frames(self) -> Dict[str, pd.DataFrame]:
+        """
+        Frames saved by the last completed stage.
+        """
+        stage_dir = os.path.join(self.path, self.last_stage)
+        return {
+            name[:-len(".feather")]: pd.read_feather(os.path.join(stage_dir, name))
+            for name in os.listdir(stage_dir)
+            if name.endswith(".feather")
+        }
+
+    def _write_manifest(self) -> None:
+        tmp = os.path.join(self.path, f"{_MANIFEST}.tmp")
+        with open(tmp, "w") as f:
+            json.dump(self.manifest, f, indent=2)
+        os.replace(tmp, os.path.join(self.path, _MANIFEST))
+
+
+def latest_checkpoint(
+    watermark,
+    options: Dict[str, Any],
+    root: str = CHECKPOINT_DIR
+) -> Optional[RunCheckpoint]:
+    """
+    Newest checkpoint with at least one completed stage that was taken
+    at this watermark with the same options, if any.
+    """
+    if not os.path.isdir(root):
+        return None
+
+    candidates = []
+    for run_id in os.listdir(root):
+        try:
+            checkpoint = RunCheckpoint.load(os.path.join(root, run_id))
+        except (OSError, ValueError):
+            continue
+
+        if (
+            checkpoint.stages
+            and checkpoint.manifest["watermark"] == _watermark_key(watermark)
+            and checkpoint.manifest["options"] == options
+        ):
+            candidates.append(checkpoint)
+
+    if not candidates:
+        return None
+    return max(candidates, key=lambda c: c.manifest["created_at"])
+
+
+def clear_checkpoints(root: str = CHECKPOINT_DIR) -> None:
+    """
+    Delete every saved checkpoint.
+    """
+    shutil.rmtree(root, ignore_errors=True)
@@ -0,0 +1,217 @@
+# etl/continuous.py
+"""
+Continuous (event-driven) ETL.
+
+The watchdog ingester calls ContinuousETL.notify() after each staging
+commit. A scheduler thread then runs incremental SalesETLPipeline
+micro-batches on one long-lived pipeline, so the engine's connection
+pool, imports and the dimension key cache stay warm between runs.
+
+Signals are debounced: a run starts once staging has been quiet for
+CONTINUOUS_DEBOUNCE_SECONDS (or the first pending commit is
+CONTINUOUS_MAX_DELAY_SECONDS old), and never sooner than
+CONTINUOUS_MIN_INTERVAL_SECONDS after the previous run finished.
+Commits that arrive during a run trigger the next one.
+
+Each run reads staging only up to an ingest_date ceiling taken while
+no staging write is open (StagingGate), and advances the watermark to
+that ceiling. Rows committed mid-run are therefore never skipped.
+"""
+
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Optional
+
+from etl.pipeline import SalesETLPipeline
+
+logger = logging.getLogger(__name__)
+
+# =========================
+# CONFIG
+# =========================
+# Quiet period after the last staging commit before a run starts
+CONTINUOUS_DEBOUNCE_SECONDS = 1.0
+
+# Start anyway once the oldest pending commit has waited this long
+CONTINUOUS_MAX_DELAY_SECONDS = 10.0
+
+# Minimum gap between the end of one run and the start of the next
+CONTINUOUS_MIN_INTERVAL_SECONDS = 5.0
+
+
+class StagingGate:
+    """
+    Lets the scheduler pick an ingest_date ceiling that no open staging
+    write can fall under.
+
+    Writers stamp ingest_date and commit inside write(). ceiling()
+    holds new writers back, waits for open ones to commit and returns
+    the current time: every row stamped at or before it is committed,
+    and every later write is stamped after it.
+    """
+
+    def __init__(self) -> None:
+        self._cond = threading.Condition()
+        self._writers = 0
+        self._closed = False
+
+    @contextmanager
+    def write(self):
+        with self._cond:
+            self._cond.wait_for(lambda: not self._closed)
+            self._writers += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._writers -= 1
+                self._cond.notify_all()
+
+    def ceiling(self) -> datetime:
+        with self._cond:
+            self._closed = True
+            try:
+                self._cond.wait_for(lambda: self._writers == 0)
+                ceiling = datetime.utcnow()
+
+                # Writers let in next must stamp strictly later
+                while datetime.utcnow() <= ceiling:
+                    time.sleep(0.001)
+                return ceiling
+            finally:
+                self._closed = False
+                self._cond.notify_all()
+
+
+class ContinuousETL:
+    """
+    Runs pipeline micro-batches on a background thread whenever
+    staging commits are signalled through notify().
+    """
+
+    def __init__(
+        self,
+        pipeline: SalesETLPipeline,
+        debounce: float = CONTINUOUS_DEBOUNCE_SECONDS,
+        min_interval: float = CONTINUOUS_MIN_INTERVAL_SECONDS,
+        max_delay: float = CONTINUOUS_MAX_DELAY_SECONDS
+    ) -> None:
+        self.pipeline = pipeline
+        self.debounce = debounce
+        self.min_interval = min_interval
+        self.max_delay = max_delay
+        self.gate = StagingGate()
+
+        self._cond = threading.Condition()
+        self._pending: Dict[str, int] = {}
+        self._first_signal: Optional[float] = None
+        self._last_signal: Optional[float] = None
+        self._last_run_end = float("-inf")
+        self._stopping = False
+
+        self.runs = 0
+        self.failed_runs = 0
+
+        self._thread = threading.Thread(
+            target=self._loop,
+            name="etl-scheduler",
+            daemon=True
+        )
+
+    def start(self, catch_up: bool = True) -> None:
+        """
+        Start the scheduler. With catch_up, rows staged before start
+        are processed by an immediate first run.
+        """
+        if catch_up:
+            self.notify("startup", 0)
+        self._thread.start()
+
+    def notify(self, table: str, rows: int) -> None:
+        """
+        Staging commit signal (RawDataHandler on_commit callback).
+        """
+        now = time.monotonic()
+        with self._cond:
+            self._pending[table] = self._pending.get(table, 0) + rows
+            if self._first_signal is None:
+                self._first_signal = now
+            self._last_signal = now
+            self._cond.notify_all()
+
+    def stop(self, drain: bool = True, timeout: Optional[float] = None) -> None:
+        """
+        Stop the scheduler. With drain, pending signals get one final
+        run first; a run already in progress always finishes.
+        """
+        with self._cond:
+            if not drain:
+                self._pending.clear()
+            self._stopping = True
+            self._cond.notify_all()
+
+        if self._thread.is_alive():
+            self._thread.join(timeout)
+
+        logger.info(
+            "Continuous ETL stopped | runs=%d failed=%d",
+            self.runs, self.failed_runs
+        )
+
+    def _seconds_until_due(self) -> float:
+        now = time.monotonic()
+        due = min(
+            self._last_signal + self.debounce,
+            self._first_signal + self.max_delay
+        )
+        return max(due, self._last_run_end + self.min_interval) - now
+
+    def _loop(self) -> None:
+        while True:
+            with self._cond:
+                while True:
+                    if not self._pending:
+                        if self._stopping:
+                            return
+                        self._cond.wait()
+                    elif self._stopping:
+                        break
+                    else:
+                        wait = self._seconds_until_due()
+                        if wait <= 0:
+                            break
+                        self._cond.wait(wait)
+
+                pending, self._pending = self._pending, {}
+                first_signal = self._first_signal
+                self._first_signal = self._last_signal = None
+
+            self._run(pending, first_signal)
+
+    def _run(self, pending: Dict[str, int], first_signal: float) -> None:
+        start = time.monotonic()
+        self.pipeline.ingest_ceiling = self.gate.ceiling()
+
+        logger.info(
+            "Continuous ETL run %d | staged rows signalled: %s",
+            self.runs + 1, pending
+        )
+        try:
+            self.pipeline.run()
+        except Exception:
+            # Keep serving; the audit log records the failed run
+            self.failed_runs += 1
+            logger.exception("Continuous ETL run failed")
+        finally:
+            self.runs += 1
+            end = time.monotonic()
+            with self._cond:
+                self._last_run_end = end
+
+        logger.info(
+            "Continuous ETL run %d done in %.2fs (%.2fs after first commit)",
+            self.runs, end - start, end - first_signal
+        )
@@ -0,0 +1,243 @@
+# etl/dag.py
+"""
+Minimal dependency-aware step scheduler.
+
+Steps are declared in program order with the names of the values they
+read and write. A step depends on the most recent earlier step that
+wrote each of its inputs, so independent branches (customers vs
+products vs sales) run concurrently while same-entity steps keep their
+order:
+
+    steps = [
+        Step("dedup_customers", dedup, inputs=("customers",), outputs=("customers",)),
+        Step("dedup_products", dedup, inputs=("products",), outputs=("products",)),
+        Step("orphans", orphans, inputs=("sales", "customers", "products"),
+             outputs=("sales",)),
+    ]
+    values = run_dag(steps, {"customers": c, "products": p, "sales": s})
+
+Steps run on a thread pool: pandas and the database drivers release the
+GIL for the heavy work, and frames / engines are shared without pickling.
+Each step receives shallow copies of its DataFrame inputs.
+
+A value is dropped as soon as a later step has replaced it and every
+step that reads it has started, so a chain of steps over one frame
+keeps only the versions still in use. run_dag() takes the initial
+values out of the dict it is given for the same reason.
+"""
+
+import time
+import logging
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from collections import Counter
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Default pool size for independent branches
+DAG_MAX_WORKERS = 4
+
+# Marks an input that comes from the initial values
+_INITIAL = -1
+
+
+class Step:
+    """
+    One unit of work: func(*inputs) -> outputs.
+
+    With one output the return value is stored as-is; with several the
+    function must return a tuple of the same length.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        func: Callable[..., Any],
+        inputs: Sequence[str] = (),
+        outputs: Sequence[str] = (),
+        after: Sequence[str] = ()
+    ) -> None:
+        self.name = name
+        self.func = func
+        self.inputs = tuple(inputs)
+        self.outputs = tuple(outputs)
+        # Extra ordering on steps by name, for side effects
+        # (e.g. facts after dimensions) that are not data inputs
+        self.after = tuple(after)
+
+    def __repr__(self) -> str:
+        return f"Step({self.name!r}, inputs={self.inputs}, outputs={self.outputs})"
+
+
+def _isolate(value: Any) -> Any:
+    """
+    Steps may assign columns on the frames they receive, and a value
+    can feed several concurrent steps, so each step gets its own
+    shallow copy (cheap under copy-on-write).
+    """
+    if isinstance(value, pd.DataFrame):
+        return value.copy(deep=False)
+    return value
+
+
+def _resolve(
+    steps: List[Step],
+    initial: Dict[str, Any]
+) -> Tuple[List[List[Tuple[str, int]]], List[Set[int]]]:
+    """
+    For each step: where every input comes from (step index or
+    _INITIAL) and the set of step indexes it waits for.
+    """
+    last_writer: Dict[str, int] = {}
+    index_by_name: Dict[str, int] = {}
+    sources: List[List[Tuple[str, int]]] = []
+    deps: List[Set[int]] = []
+
+    for i, step in enumerate(steps):
+        if step.name in index_by_name:
+            raise ValueError(f"Duplicate step name: {step.name}")
+
+        step_sources = []
+        for name in step.inputs:
+            if name in last_writer:
+                step_sources.append((name, last_writer[name]))
+            elif name in initial:
+                step_sources.append((name, _INITIAL))
+            else:
+                raise ValueError(f"Step {step.name} reads unknown value {name!r}")
+
+        step_deps = {src for _, src in step_sources if src != _INITIAL}
+        for name in step.after:
+            if name not in index_by_name:
+                raise ValueError(f"Step {step.name} runs after unknown step {name!r}")
+            step_deps.add(index_by_name[name])
+
+        sources.append(step_sources)
+        deps.append(step_deps)
+        index_by_name[step.name] = i
+        for name in step.outputs:
+            last_writer[name] = i
+
+    return sources, deps
+
+
+def run_dag(
+    steps: List[Step],
+    initial: Optional[Dict[str, Any]] = None,
+    max_workers: int = DAG_MAX_WORKERS,
+    name: str = "dag"
+) -> Dict[str, Any]:
+    """
+    Run steps as soon as their dependencies finish and return the final
+    value of every name. max_workers=1 runs them in declaration order.
+
+    initial is emptied: its values belong to the run from here on, and
+    each is released once no step needs it any more.
+
+    The first failing step stops new submissions; steps already running
+    are allowed to finish and the error is re-raised.
+    """
+    owned = dict(initial or {})
+    if initial:
+        initial.clear()
+    initial = owned
+    sources, deps = _resolve(steps, initial)
+
+    results: Dict[int, Dict[str, Any]] = {}
+    seconds: Dict[int, float] = {}
+
+    # Which (name, source) pairs are still to be read, and which source
+    # holds the final value of each name
+    readers = Counter(source for step_sources in sources for source in step_sources)
+    final: Dict[str, int] = {name: _INITIAL for name in initial}
+    for i, step in enumerate(steps):
+        for name in step.outputs:
+            final[name] = i
+
+    def _release(name: str, src: int) -> None:
+        if readers[(name, src)] or final[name] == src:
+            return
+        if src == _INITIAL:
+            initial.pop(name, None)
+        else:
+            results[src].pop(name, None)
+
+    def _inputs(i: int) -> List[Any]:
+        args = [
+            _isolate(initial[name] if src == _INITIAL else results[src][name])
+            for name, src in sources[i]
+        ]
+        for source in sources[i]:
+            readers[source] -= 1
+            _release(*source)
+        return args
+
+    def _store(i: int, outputs: Dict[str, Any]) -> None:
+        results[i] = outputs
+        for name in list(outputs):
+            _release(name, i)
+
+    def _execute(i: int, args: List[Any]) -> Dict[str, Any]:
+        step = steps[i]
+        start = time.perf_counter()
+        value = step.func(*args)
+        seconds[i] = time.perf_counter() - start
+
+        if len(step.outputs) == 1:
+            return {step.outputs[0]: value}
+        if step.outputs:
+            if not isinstance(value, tuple) or len(value) != len(step.outputs):
+                raise ValueError(
+                    f"Step {step.name} must return {len(step.outputs)} values"
+                )
+            return dict(zip(step.outputs, value))
+        return {}
+
+    started = time.perf_counter()
+
+    if max_workers <= 1:
+        for i in range(len(steps)):
+            _store(i, _execute(i, _inputs(i)))
+    else:
+        pending = set(range(len(steps)))
+        running: Dict[Future, int] = {}
+        error: Optional[BaseException] = None
+
+        with ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix=name
+        ) as pool:
+            while pending or running:
+                if error is None:
+                    ready = [i for i in sorted(pending) if deps[i].issubset(results)]
+                    for i in ready:
+                        pending.discard(i)
+                        running[pool.submit(_execute, i, _inputs(i))] = i
+
+                if not running:
+                    break
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    i = running.pop(future)
+                    try:
+                        _store(i, future.result())
+                    except BaseException as exc:
+                        logger.error("Step %s failed", steps[i].name)
+                        if error is None:
+                            error = exc
+
+        if error is not None:
+            raise error
+
+    wall = time.perf_counter() - started
+    logger.info(
+        "%s finished | steps=%d wall=%.3fs sum_of_steps=%.3fs workers=%d",
+        name, len(steps), wall, sum(seconds.values()), max_workers
+    )
+
+    values = dict(initial)
+    for i in range(len(steps)):
+        values.update(results[i])
+    return values
@@ -0,0 +1,145 @@
+# etl/dates.py
+"""
+Shared date parsing.
+
+Raw date columns repeat a few hundred distinct values over millions of
+rows, and several stages used to run pd.to_datetime over the same
+column. parse_dates() instead:
+
+- returns datetime64 columns untouched (already parsed),
+- factorizes the column and parses each distinct value once,
+  ISO 8601 first, inferring the format only for values that miss,
+- remembers parsed values in a process-wide cache, so later stages
+  and streaming chunks only parse values they have not seen before.
+"""
+
+import threading
+import warnings
+from typing import Dict, Hashable, Optional
+
+import numpy as np
+import pandas as pd
+
+# =========================
+# CONFIG
+# =========================
+# Parsed values kept before the cache is reset
+DATE_CACHE_MAX_ENTRIES = 200_000
+
+_UNIT = "datetime64[us]"
+_NAT = np.datetime64("NaT", "us")
+
+
+class DateParseCache:
+    """
+    Raw value -> datetime64[us] (NaT for unparseable values).
+    """
+
+    def __init__(self, max_entries: int = DATE_CACHE_MAX_ENTRIES) -> None:
+        self.max_entries = max_entries
+        self._values: Dict[Hashable, np.datetime64] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+    def lookup(self, uniques) -> np.ndarray:
+        """
+        Parsed datetime64[us] values for an array of distinct raw values.
+        """
+        with self._lock:
+            cached = [self._values.get(value) for value in uniques]
+
+        missing = [value for value, hit in zip(uniques, cached) if hit is None]
+        self.hits += len(uniques) - len(missing)
+        self.misses += len(missing)
+
+        if missing:
+            parsed = dict(zip(missing, _parse_values(missing)))
+            with self._lock:
+                if len(self._values) + len(parsed) > self.max_entries:
+                    self._values.clear()
+                self._values.update(parsed)
+            cached = [
+                parsed[value] if hit is None else hit
+                for value, hit in zip(uniques, cached)
+            ]
+
+        return np.array(cached, dtype=_UNIT)
+
+
+DEFAULT_DATE_CACHE = DateParseCache()
+
+
+def _parse_values(values) -> np.ndarray:
+    """
+    Parse distinct raw values: ISO 8601 fast path, inferred format
+    for the rest. Unparseable values become NaT.
+    """
+    values = pd.Index(values, dtype=object)
+    parsed = pd.Series(_NAT, index=range(len(values)), dtype=_UNIT)
+
+    is_text = np.array([isinstance(v, str) for v in values], dtype=bool)
+
+    if is_text.any():
+        parsed[is_text] = pd.to_datetime(
+            values[is_text], format="ISO8601", errors="coerce"
+        ).as_unit("us")
+
+    # Non-ISO strings and date / datetime objects
+    retry = ~is_text | (is_text & parsed.isna().to_numpy())
+    if retry.any():
+        with warnings.catch_warnings():
+            # "Could not infer format" for junk such as "invalid_date"
+            warnings.simplefilter("ignore", UserWarning)
+            parsed[retry] = pd.to_datetime(
+                values[retry], errors="coerce"
+            ).as_unit("us")
+
+    return parsed.to_numpy()
+
+
+def is_parsed(series: pd.Series) -> bool:
+    return pd.api.types.is_datetime64_any_dtype(series)
+
+
+def parse_dates(
+    series: pd.Series,
+    errors: str = "coerce",
+    cache: Optional[DateParseCache] = None
+) -> pd.Series:
+    """
+    pd.to_datetime replacement for raw date columns.
+
+    errors="raise" raises ValueError if a non-null value cannot be
+    parsed; "coerce" turns it into NaT.
+    """
+    if is_parsed(series):
+        return series
+
+    cache = cache or DEFAULT_DATE_CACHE
+
+    codes, uniques = pd.factorize(series, use_na_sentinel=True)
+    parsed = cache.lookup(uniques)
+
+    values = np.full(len(codes), _NAT, dtype=_UNIT)
+    present = codes >= 0
+    values[present] = parsed[codes[present]]
+
+    result = pd.Series(values, index=series.index, name=series.name)
+
+    if errors == "raise":
+        bad = present & np.isnat(values)
+        if bad.any():
+            raise ValueError(
+                f"Unparseable dates in {series.name}: "
+                f"{series[bad].unique()[:5].tolist()}"
+            )
+
+    return result
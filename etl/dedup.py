@@ -1,16 +1,14 @@
-import os
 import logging
-from datetime import datetime
 from typing import Tuple
 
 import pandas as pd
 
+from etl.dates import parse_dates
+
 
 # =========================
 # CONFIG
 # =========================
-DUPLICATE_DIR = "rejected_data/customer_duplicates"
-os.makedirs(DUPLICATE_DIR, exist_ok=True)
 
 # LOG_DIR = "logs"
 # LOG_FILE = os.path.join(LOG_DIR, "duplicate_data.log")
@@ -43,9 +41,7 @@ def resolve_duplicate_customers(
     """
 
     # Ensure signup_date is datetime
-    customers_df["signup_date"] = pd.to_datetime(
-        customers_df["signup_date"], errors="coerce"
-    )
+    customers_df["signup_date"] = parse_dates(customers_df["signup_date"])
 
     # Sort so latest signup_date wins
     sorted_df = customers_df.sort_values(
@@ -78,30 +74,3 @@ def resolve_duplicate_customers(
         logger.info("No duplicate customer_id records found.")
 
     return clean_customers_df, rejected_duplicates_df
-
-
-# =========================
-# SAVE REJECTED DUPLICATES
-# =========================
-def save_rejected_customer_duplicates(
-    rejected_df: pd.DataFrame
-) -> None:
-    """
-    Save rejected duplicate customer records to CSV
-    under rejected_data/customer_duplicates/.
-    """
-
-    if rejected_df.empty:
-        return
-
-    timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
-    file_name = f"rejected_customer_duplicates_{timestamp}.csv"
-    file_path = os.path.join(DUPLICATE_DIR, file_name)
-
-    rejected_df.to_csv(file_path, index=False)
-
-    logger.warning(
-        "Saved %d duplicate customer records to %s",
-        len(rejected_df),
-        file_path
-    )
@@ -0,0 +1,163 @@
+# etl/dtypes.py
+"""
+Memory-compact dtype helpers.
+
+Used by the enforce_*_dtypes functions in compact mode:
+- low-cardinality text -> category
+- integers -> smallest signed width that holds the values
+- floats -> float32 only when the round trip is lossless
+- dates -> native datetime64 instead of Python date objects
+
+Also holds the categorical-safe helpers the transforms use, so the
+same transform code works on compacted and plain frames, and
+split_rows() for the validators.
+"""
+
+import logging
+from typing import Callable, Dict, Iterable, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from etl.dates import parse_dates
+
+logger = logging.getLogger(__name__)
+
+# Text columns with at most this share of distinct values become categoricals
+CATEGORY_MAX_UNIQUE_RATIO = 0.5
+
+_MB = 1024 * 1024
+
+
+# =========================
+# COMPACTION
+# =========================
+def frame_bytes(df: pd.DataFrame) -> int:
+    return int(df.memory_usage(deep=True).sum())
+
+
+def to_category(series: pd.Series) -> pd.Series:
+    """
+    Categorical if the column is low-cardinality, else unchanged.
+    """
+    if len(series) == 0:
+        return series
+
+    unique_ratio = series.nunique(dropna=True) / len(series)
+    if unique_ratio <= CATEGORY_MAX_UNIQUE_RATIO:
+        return series.astype("category")
+    return series
+
+
+def downcast_int(series: pd.Series) -> pd.Series:
+    return pd.to_numeric(series, downcast="integer")
+
+
+def downcast_float(series: pd.Series) -> pd.Series:
+    """
+    float32 when every value survives the round trip exactly.
+    """
+    narrow = series.astype("float32")
+    lossless = (narrow.astype("float64") == series) | series.isna()
+    return narrow if lossless.all() else series
+
+
+def to_datetime64_date(series: pd.Series) -> pd.Series:
+    """
+    Midnight-normalized datetime64 (vs .dt.date object columns).
+    """
+    return parse_dates(series).dt.normalize()
+
+
+def compact_frame(
+    df: pd.DataFrame,
+    name: str,
+    category_cols: Iterable[str] = (),
+    int_cols: Iterable[str] = (),
+    float_cols: Iterable[str] = ()
+) -> Tuple[pd.DataFrame, Dict[str, int]]:
+    """
+    Compact the given columns and log the bytes saved.
+
+    Returns:
+        compacted df, {"bytes_before", "bytes_after", "bytes_saved"}
+    """
+    before = frame_bytes(df)
+
+    for col in category_cols:
+        df[col] = to_category(df[col])
+    for col in int_cols:
+        df[col] = downcast_int(df[col])
+    for col in float_cols:
+        df[col] = downcast_float(df[col])
+
+    after = frame_bytes(df)
+    report = {
+        "bytes_before": before,
+        "bytes_after": after,
+        "bytes_saved": before - after,
+    }
+
+    logger.info(
+        "%s dtypes compacted: %.1f MB -> %.1f MB (saved %.1f MB, %.1fx)",
+        name,
+        before / _MB,
+        after / _MB,
+        (before - after) / _MB,
+        before / after if after else 1.0
+    )
+
+    return df, report
+
+
+# =========================
+# CATEGORICAL-SAFE HELPERS
+# =========================
+def fill_missing(series: pd.Series, value) -> pd.Series:
+    """
+    fillna that also works when value is not yet a category.
+    """
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        if value not in series.cat.categories:
+            series = series.cat.add_categories([value])
+    return series.fillna(value)
+
+
+def map_text(
+    series: pd.Series,
+    func: Callable[[pd.Series], pd.Series]
+) -> pd.Series:
+    """
+    Apply a vectorized string op. On categoricals it runs over the
+    categories only and the result stays categorical.
+    """
+    if not isinstance(series.dtype, pd.CategoricalDtype):
+        return func(series)
+
+    mapped = func(series.cat.categories.to_series(index=None)).to_numpy()
+    new_codes, new_categories = pd.factorize(mapped)
+
+    codes = series.cat.codes.to_numpy()
+    codes = np.where(codes >= 0, new_codes[codes], -1)
+
+    return pd.Series(
+        pd.Categorical.from_codes(codes, categories=new_categories),
+        index=series.index,
+        name=series.name
+    )
+
+
+# =========================
+# ROW SPLITS
+# =========================
+def split_rows(
+    df: pd.DataFrame,
+    reject_mask: Union[pd.Series, np.ndarray]
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    (clean, rejected) rows of df. When nothing is rejected, df itself
+    is returned as clean rather than a full boolean-mask copy.
+    """
+    if not reject_mask.any():
+        return df, df.iloc[:0]
+    return df[~reject_mask], df[reject_mask]
@@ -0,0 +1,206 @@
+# etl/dw/aggregates.py
+"""
+Summary tables for the Analysis.sql dashboards.
+
+agg_sales_by_product / _month / _customer / _category hold order count,
+quantity and revenue per key. load_fact() captures the rows it actually
+inserts into a temp table (FACT_DELTA_TABLE) and apply_fact_delta()
+upserts their totals in the same transaction, so the aggregates always
+match fact_sales. rebuild_aggregates() recomputes them from scratch.
+
+When a dimension load changes a product's category, the dimension
+load records the old category in PRODUCT_MOVES_TABLE, and
+move_product_categories() shifts that product's totals (read from
+agg_sales_by_product) from the old category row to the new one.
+"""
+
+import logging
+from typing import List, Sequence
+
+from sqlalchemy import inspect, text
+
+logger = logging.getLogger(__name__)
+
+# =========================
+# CONFIG
+# =========================
+# Keep the aggregate tables up to date on every fact load
+MAINTAIN_AGGREGATES = True
+
+# Temp table holding the fact rows inserted by the current load
+FACT_DELTA_TABLE = "fact_sales_delta"
+
+# Temp table of (product_id, old_category) for recategorized products
+PRODUCT_MOVES_TABLE = "product_category_moves"
+
+# table -> (key columns, key expressions over the delta / fact rows "d")
+_AGGREGATES = {
+    "agg_sales_by_product": (["product_id"], ["d.product_id"]),
+    "agg_sales_by_month": (
+        ["year", "month"],
+        ["d.date_id / 10000", "d.date_id / 100 % 100"]
+    ),
+    "agg_sales_by_customer": (["customer_id"], ["d.customer_id"]),
+    "agg_sales_by_category": (
+        ["category"],
+        ["COALESCE(p.category, 'unknown')"]
+    ),
+}
+AGGREGATE_TABLES = list(_AGGREGATES)
+
+_MEASURES = {
+    "order_count": "COUNT(*)",
+    "quantity": "SUM(COALESCE(d.quantity, 0))",
+    "revenue": "SUM(CAST(COALESCE(d.net_sale_amount, 0) AS NUMERIC(18, 2)))",
+}
+
+
+def create_fact_delta_table(conn, columns: Sequence[str]) -> None:
+    """
+    Empty temp table shaped like fact_sales' columns. PostgreSQL drops
+    it at commit; other databases drop it in apply_fact_delta().
+    """
+    select = f"SELECT {', '.join(columns)} FROM sales_dw.fact_sales"
+
+    if conn.dialect.name == "postgresql":
+        conn.execute(text(f"""
+            CREATE TEMP TABLE IF NOT EXISTS {FACT_DELTA_TABLE}
+            ON COMMIT DROP AS
+            {select}
+            WITH NO DATA
+        """))
+    else:
+        conn.execute(text(f"""
+            CREATE TEMP TABLE IF NOT EXISTS {FACT_DELTA_TABLE} AS
+            {select}
+            WHERE 1 = 0
+        """))
+    conn.execute(text(f"DELETE FROM {FACT_DELTA_TABLE}"))
+
+
+def _upsert_aggregate(conn, table: str, source: str) -> None:
+    keys, key_exprs = _AGGREGATES[table]
+
+    join = ""
+    if table == "agg_sales_by_category":
+        join = "JOIN sales_dw.dim_product p ON p.product_id = d.product_id"
+
+    columns = keys + list(_MEASURES)
+    select = key_exprs + list(_MEASURES.values())
+    updates = ", ".join(
+        f"{m} = a.{m} + excluded.{m}" for m in _MEASURES
+    )
+
+    # "WHERE TRUE" keeps SQLite from reading ON CONFLICT as a join clause
+    conn.execute(text(f"""
+        INSERT INTO sales_dw.{table} AS a ({", ".join(columns)})
+        SELECT {", ".join(select)}
+        FROM {source} d
+        {join}
+        WHERE TRUE
+        GROUP BY {", ".join(key_exprs)}
+        ON CONFLICT ({", ".join(keys)}) DO UPDATE SET {updates}
+    """))
+
+
+def apply_fact_delta(conn) -> None:
+    """
+    Add the rows in FACT_DELTA_TABLE to every aggregate.
+    Runs on the load's connection, inside its transaction.
+    """
+    for table in AGGREGATE_TABLES:
+        _upsert_aggregate(conn, table, FACT_DELTA_TABLE)
+
+    if conn.dialect.name != "postgresql":
+        conn.execute(text(f"DROP TABLE {FACT_DELTA_TABLE}"))
+
+
+def create_product_moves_table(conn) -> None:
+    """
+    Empty temp table for move_product_categories(), dropped like
+    FACT_DELTA_TABLE.
+    """
+    on_commit = "ON COMMIT DROP" if conn.dialect.name == "postgresql" else ""
+    conn.execute(text(f"""
+        CREATE TEMP TABLE IF NOT EXISTS {PRODUCT_MOVES_TABLE} (
+            product_id INTEGER PRIMARY KEY,
+            old_category VARCHAR
+        ) {on_commit}
+    """))
+    conn.execute(text(f"DELETE FROM {PRODUCT_MOVES_TABLE}"))
+
+
+def move_product_categories(conn) -> None:
+    """
+    Move the totals of the products in PRODUCT_MOVES_TABLE from their
+    old category to the one now in dim_product. Runs after the
+    dimension upsert, in its transaction.
+    """
+    moved = f"""
+        FROM {PRODUCT_MOVES_TABLE} mv
+        JOIN sales_dw.agg_sales_by_product p ON p.product_id = mv.product_id
+    """
+    sums = ", ".join(f"SUM(p.{m}) AS {m}" for m in _MEASURES)
+
+    conn.execute(text(f"""
+        UPDATE sales_dw.agg_sales_by_category AS a
+        SET {", ".join(f"{m} = a.{m} - m.{m}" for m in _MEASURES)}
+        FROM (
+            SELECT COALESCE(mv.old_category, 'unknown') AS category, {sums}
+            {moved}
+            GROUP BY COALESCE(mv.old_category, 'unknown')
+        ) m
+        WHERE a.category = m.category
+    """))
+    conn.execute(text(
+        "DELETE FROM sales_dw.agg_sales_by_category WHERE order_count = 0"
+    ))
+
+    updates = ", ".join(f"{m} = a.{m} + excluded.{m}" for m in _MEASURES)
+    conn.execute(text(f"""
+        INSERT INTO sales_dw.agg_sales_by_category AS a
+            (category, {", ".join(_MEASURES)})
+        SELECT COALESCE(d.category, 'unknown'), {sums}
+        {moved}
+        JOIN sales_dw.dim_product d ON d.product_id = mv.product_id
+        WHERE TRUE
+        GROUP BY COALESCE(d.category, 'unknown')
+        ON CONFLICT (category) DO UPDATE SET {updates}
+    """))
+
+    if conn.dialect.name != "postgresql":
+        conn.execute(text(f"DROP TABLE {PRODUCT_MOVES_TABLE}"))
+
+
+def rebuild_aggregates(engine) -> None:
+    """
+    Recompute every aggregate table from sales_dw.fact_sales.
+    """
+    with engine.begin() as conn:
+        for table in AGGREGATE_TABLES:
+            conn.execute(text(f"DELETE FROM sales_dw.{table}"))
+            _upsert_aggregate(conn, table, "sales_dw.fact_sales")
+
+    logger.info("Rebuilt aggregate tables: %s", ", ".join(AGGREGATE_TABLES))
+
+
+def missing_aggregate_tables(engine) -> List[str]:
+    inspector = inspect(engine)
+    return [
+        table for table in AGGREGATE_TABLES
+        if not inspector.has_table(table, schema="sales_dw")
+    ]
+
+
+def seed_aggregates(engine) -> None:
+    """
+    Aggregate tables created next to a fact table that already has rows
+    start empty; fill them once so later deltas add up correctly.
+    """
+    with engine.connect() as conn:
+        has_facts = conn.execute(
+            text("SELECT 1 FROM sales_dw.fact_sales LIMIT 1")
+        ).first() is not None
+
+    if has_facts:
+        rebuild_aggregates(engine)
@@ -0,0 +1,229 @@
+# etl/dw/key_cache.py
+"""
+Persistent primary-key cache for dimension tables.
+
+Each dimension's keys are kept as a sorted int64 NumPy array, saved
+next to the pipeline as <table>.npy with a small JSON stamp of the
+warehouse (row_count, max_key) it was built from. On use the stamp is
+checked with one COUNT/MAX query. A stale cache is first topped up
+with keys above the cached max, and fully reloaded only if that does
+not reconcile the counts. Membership tests are searchsorted lookups.
+"""
+
+import json
+import logging
+import os
+import threading
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import inspect
+
+logger = logging.getLogger(__name__)
+
+
+# =========================
+# CONFIG
+# =========================
+KEY_CACHE_DIR = "cache/dim_keys"
+DW_SCHEMA = "sales_dw"
+
+EMPTY_KEYS = np.empty(0, dtype=np.int64)
+
+
+# =========================
+# SORTED KEY LOOKUP
+# =========================
+def sorted_contains(sorted_keys: np.ndarray, values) -> np.ndarray:
+    """
+    Boolean mask of values present in sorted_keys.
+    """
+    values = np.asarray(values, dtype=np.int64)
+
+    if len(sorted_keys) == 0:
+        return np.zeros(len(values), dtype=bool)
+
+    idx = np.searchsorted(sorted_keys, values)
+    idx[idx == len(sorted_keys)] = 0
+
+    return sorted_keys[idx] == values
+
+
+# =========================
+# CACHE
+# =========================
+class DimensionKeyCache:
+    """
+    Sorted key sets for dim_customer and dim_product,
+    validated against the warehouse by (row_count, max_key).
+    """
+
+    def __init__(self, cache_dir: str = KEY_CACHE_DIR) -> None:
+        self.cache_dir = cache_dir
+        self._keys: Dict[str, np.ndarray] = {}
+        self._stamps: Dict[str, Tuple[int, Optional[int]]] = {}
+        self._lock = threading.Lock()
+
+    # ---------- persistence ----------
+
+    def _path(self, table_name: str, suffix: str) -> str:
+        return os.path.join(self.cache_dir, f"{table_name}{suffix}")
+
+    def _load_local(self, table_name: str) -> None:
+        if table_name in self._keys:
+            return
+
+        keys_path = self._path(table_name, ".npy")
+        stamp_path = self._path(table_name, ".json")
+        if not (os.path.exists(keys_path) and os.path.exists(stamp_path)):
+            return
+
+        try:
+            with open(stamp_path) as fh:
+                stamp = json.load(fh)
+            self._keys[table_name] = np.load(keys_path)
+            self._stamps[table_name] = (stamp["row_count"], stamp["max_key"])
+        except Exception:
+            logger.warning(
+                "Ignoring unreadable key cache for %s", table_name,
+                exc_info=True
+            )
+
+    def _save(self, table_name: str) -> None:
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+        keys_path = self._path(table_name, ".npy")
+        stamp_path = self._path(table_name, ".json")
+        row_count, max_key = self._stamps[table_name]
+
+        with open(keys_path + ".tmp", "wb") as fh:
+            np.save(fh, self._keys[table_name])
+        os.replace(keys_path + ".tmp", keys_path)
+
+        with open(stamp_path + ".tmp", "w") as fh:
+            json.dump({"row_count": row_count, "max_key": max_key}, fh)
+        os.replace(stamp_path + ".tmp", stamp_path)
+
+    def _store(self, table_name: str, keys: np.ndarray) -> np.ndarray:
+        self._keys[table_name] = keys
+        self._stamps[table_name] = (
+            len(keys),
+            int(keys[-1]) if len(keys) else None
+        )
+        self._save(table_name)
+        return keys
+
+    # ---------- warehouse reads ----------
+
+    @staticmethod
+    def _warehouse_stamp(
+        engine, table_name: str, pk: str
+    ) -> Tuple[int, Optional[int]]:
+        result = pd.read_sql(
+            f"SELECT COUNT(*) AS n, MAX({pk}) AS max_key "
+            f"FROM {DW_SCHEMA}.{table_name}",
+            engine
+        )
+        row_count, max_key = result.iloc[0]
+        return (
+            int(row_count),
+            None if pd.isna(max_key) else int(max_key)
+        )
+
+    @staticmethod
+    def _read_keys(engine, table_name: str, pk: str, above=None) -> np.ndarray:
+        query = f"SELECT {pk} FROM {DW_SCHEMA}.{table_name}"
+        if above is not None:
+            query += f" WHERE {pk} > {int(above)}"
+
+        keys = pd.read_sql(query, engine)[pk].to_numpy(dtype=np.int64)
+        return np.unique(keys)
+
+    # ---------- public API ----------
+
+    def keys(self, engine, table_name: str, pk: str) -> np.ndarray:
+        """
+        Sorted keys currently in sales_dw.<table_name>.
+        """
+        with self._lock:
+            self._load_local(table_name)
+            stamp = self._warehouse_stamp(engine, table_name, pk)
+            cached = self._keys.get(table_name)
+
+            if cached is not None and self._stamps[table_name] == stamp:
+                return cached
+
+            row_count, max_key = stamp
+            cached_count, cached_max = self._stamps.get(table_name, (0, None))
+
+            # Incremental top-up: only keys appended above the cached max
+            if (
+                cached is not None
+                and cached_max is not None
+                and row_count > cached_count
+                and max_key is not None
+                and max_key > cached_max
+            ):
+                merged = np.union1d(
+                    cached,
+                    self._read_keys(engine, table_name, pk, above=cached_max)
+                )
+                if len(merged) == row_count:
+                    logger.info(
+                        "Key cache for %s topped up with %d keys",
+                        table_name, len(merged) - len(cached)
+                    )
+                    return self._store(table_name, merged)
+
+            logger.info("Key cache for %s rebuilt from warehouse", table_name)
+            return self._store(
+                table_name, self._read_keys(engine, table_name, pk)
+            )
+
+    def add(self, engine, table_name: str, pk: str, new_keys) -> None:
+        """
+        Record keys just inserted into sales_dw.<table_name>.
+
+        The keys are merged into the persisted set only when the result
+        matches the warehouse stamp; otherwise the in-memory entry is
+        dropped and the next keys() call tops up or rebuilds it.
+        """
+        new_keys = np.asarray(new_keys, dtype=np.int64)
+        if len(new_keys) == 0:
+            return
+
+        with self._lock:
+            self._load_local(table_name)
+            cached = self._keys.get(table_name)
+            if cached is None:
+                return
+
+            merged = np.union1d(cached, new_keys)
+            stamp = self._warehouse_stamp(engine, table_name, pk)
+
+            if (len(merged), int(merged[-1])) != stamp:
+                self._keys.pop(table_name, None)
+                self._stamps.pop(table_name, None)
+                return
+
+            self._store(table_name, merged)
+
+
+DEFAULT_KEY_CACHE = DimensionKeyCache()
+
+
+def warehouse_keys(
+    engine,
+    table_name: str,
+    pk: str,
+    key_cache: Optional[DimensionKeyCache] = None
+) -> np.ndarray:
+    """
+    Sorted keys of sales_dw.<table_name>, or no keys before the
+    warehouse tables exist (first run).
+    """
+    if not inspect(engine).has_table(table_name, schema=DW_SCHEMA):
+        return EMPTY_KEYS
+
+    return (key_cache or DEFAULT_KEY_CACHE).keys(engine, table_name, pk)
@@ -1,20 +1,472 @@
 import logging
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
 import pandas as pd
-from sqlalchemy import inspect
-from etl.dw.models import Base
+from sqlalchemy import Date, Float, Numeric, inspect, text
+from db.bulk_copy import copy_dataframe
+from etl.dw.models import Base, FactSales
+from etl.dw.aggregates import (
+    FACT_DELTA_TABLE,
+    MAINTAIN_AGGREGATES,
+    PRODUCT_MOVES_TABLE,
+    apply_fact_delta,
+    create_fact_delta_table,
+    create_product_moves_table,
+    missing_aggregate_tables,
+    move_product_categories,
+    seed_aggregates,
+)
+from etl.dw.key_cache import (
+    DEFAULT_KEY_CACHE,
+    DimensionKeyCache,
+)
+from etl.transform.date_dim import (
+    CALENDAR_START,
+    CALENDAR_END,
+    FISCAL_YEAR_START_MONTH,
+    build_calendar,
+    date_from_date_id,
+    date_id_from_dates,
+)
 
 logger = logging.getLogger(__name__)
 
-def create_dw_tables(engine):
+# Create fact_sales range-partitioned by month on date_id (PostgreSQL)
+PARTITION_FACT_SALES = False
+
+
+def create_dw_tables(engine, partition_facts: bool = PARTITION_FACT_SALES):
     inspector = inspect(engine)
     if "sales_dw" not in inspector.get_schema_names():
-        engine.execute("CREATE SCHEMA IF NOT EXISTS sales_dw")
+        with engine.begin() as conn:
+            conn.execute(text("CREATE SCHEMA IF NOT EXISTS sales_dw"))
+
+    new_aggregates = missing_aggregate_tables(engine)
+
+    fact_table = FactSales.__table__
+    partition = partition_facts and engine.dialect.name == "postgresql"
+    if partition_facts and not partition:
+        logger.warning(
+            "fact_sales partitioning needs PostgreSQL; creating a plain table"
+        )
+
+    Base.metadata.create_all(
+        engine,
+        tables=[
+            table for table in Base.metadata.sorted_tables
+            if not (partition and table is fact_table)
+        ]
+    )
+    if partition:
+        _create_partitioned_fact_table(engine)
+
+    _add_missing_columns(engine)
+
+    # create_all skips indexes of tables that already exist
+    for index in FactSales.__table__.indexes:
+        index.create(engine, checkfirst=True)
+
+    if new_aggregates:
+        seed_aggregates(engine)
 
-    Base.metadata.create_all(engine)
     logger.info("DW tables created.")
 
-def load_dimension(engine, df: pd.DataFrame, table_name: str, pk: str):
-    df = df.copy()
+
+def _add_missing_columns(engine) -> None:
+    """
+    create_all does not alter existing tables: add model columns
+    (e.g. the dim_date fiscal attributes) that an older table lacks.
+    """
+    inspector = inspect(engine)
+
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name, schema=table.schema):
+            continue
+
+        existing = {
+            col["name"]
+            for col in inspector.get_columns(table.name, schema=table.schema)
+        }
+        missing = [col for col in table.columns if col.name not in existing]
+
+        with engine.begin() as conn:
+            for col in missing:
+                conn.execute(text(
+                    f"ALTER TABLE {table.schema}.{table.name} "
+                    f"ADD COLUMN {col.name} {col.type.compile(engine.dialect)}"
+                ))
+                logger.info("Added column %s.%s", table.name, col.name)
+
+
+# -----------------------------
+# Partitioned fact_sales (PostgreSQL)
+# -----------------------------
+# One partition per month: fact_sales_YYYYMM holds
+# date_id in [YYYYMM01, next month's YYYYMM01).
+
+def fact_partition_name(month: int) -> str:
+    return f"fact_sales_{int(month)}"
+
+
+def _month_bounds(month: int) -> Tuple[int, int]:
+    year, mon = divmod(int(month), 100)
+    next_month = (year + 1) * 100 + 1 if mon == 12 else month + 1
+    return int(month) * 100 + 1, next_month * 100 + 1
+
+
+def fact_is_partitioned(conn) -> bool:
+    if conn.dialect.name != "postgresql":
+        return False
+
+    return bool(conn.execute(text("""
+        SELECT EXISTS (
+            SELECT 1
+            FROM pg_partitioned_table pt
+            JOIN pg_class c ON c.oid = pt.partrelid
+            JOIN pg_namespace n ON n.oid = c.relnamespace
+            WHERE n.nspname = 'sales_dw'
+              AND c.relname = 'fact_sales'
+        )
+    """)).scalar())
+
+
+def _create_partitioned_fact_table(engine) -> None:
+    """
+    CREATE TABLE ... PARTITION BY RANGE (date_id) from the FactSales
+    model. The partition key has to be part of the primary key, so it
+    is (sales_id, date_id) here.
+    """
+    with engine.begin() as conn:
+        if inspect(conn).has_table("fact_sales", schema="sales_dw"):
+            if not fact_is_partitioned(conn):
+                logger.warning(
+                    "sales_dw.fact_sales exists and is not partitioned; "
+                    "leaving it as is"
+                )
+            return
+
+        columns = []
+        for col in FactSales.__table__.columns:
+            if col.name == "sales_id":
+                columns.append("sales_id SERIAL")
+                continue
+
+            ddl = f"{col.name} {col.type.compile(conn.dialect)}"
+            for fk in col.foreign_keys:
+                target_table = fk.target_fullname.rsplit(".", 1)[0]
+                ddl += f" REFERENCES {target_table} ({fk.column.name})"
+            columns.append(ddl)
+
+        conn.execute(text(f"""
+            CREATE TABLE sales_dw.fact_sales (
+                {", ".join(columns)},
+                PRIMARY KEY (sales_id, date_id)
+            ) PARTITION BY RANGE (date_id)
+        """))
+
+    logger.info("Created partitioned sales_dw.fact_sales")
+
+
+def ensure_fact_partitions(conn, months: Iterable[int]) -> List[str]:
+    """
+    Create the monthly partitions (YYYYMM) that do not exist yet.
+    Returns the partition names for the given months.
+    """
+    names = []
+    for month in sorted({int(m) for m in months}):
+        name = fact_partition_name(month)
+        start, end = _month_bounds(month)
+        conn.execute(text(f"""
+            CREATE TABLE IF NOT EXISTS sales_dw.{name}
+            PARTITION OF sales_dw.fact_sales
+            FOR VALUES FROM ({start}) TO ({end})
+        """))
+        names.append(name)
+
+    return names
+
+
+# -----------------------------
+# Calendar dimension
+# -----------------------------
+def _backfill_calendar_attributes(conn) -> None:
+    """
+    Fill is_weekend / fiscal_* on dim_date rows loaded before those
+    columns existed.
+    """
+    conn.execute(text("""
+        UPDATE sales_dw.dim_date
+        SET
+            is_weekend = weekday IN ('Saturday', 'Sunday'),
+            fiscal_month = (month - :start_month + 12) % 12 + 1,
+            fiscal_quarter = ((month - :start_month + 12) % 12) / 3 + 1,
+            fiscal_year = year + CASE
+                WHEN :start_month > 1 AND month >= :start_month THEN 1
+                ELSE 0
+            END
+        WHERE fiscal_year IS NULL
+    """), {"start_month": FISCAL_YEAR_START_MONTH})
+
+
+def ensure_calendar(
+    engine,
+    start=None,
+    end=None
+) -> Tuple[int, int]:
+    """
+    Keep sales_dw.dim_date a contiguous calendar covering
+    CALENDAR_START..CALENDAR_END and [start, end].
+
+    Returns the (first, last) date_id covered, so callers can check
+    fact dates with an integer range test. When the calendar already
+    covers the span this is a single MIN / MAX / COUNT query; otherwise
+    only the missing days are built and copied.
+    """
+    start = min(pd.Timestamp(CALENDAR_START), pd.Timestamp(start or CALENDAR_START))
+    end = max(pd.Timestamp(CALENDAR_END), pd.Timestamp(end or CALENDAR_END))
+
+    stats = pd.read_sql(
+        """
+        SELECT
+            MIN(date_id) AS first_id,
+            MAX(date_id) AS last_id,
+            COUNT(*) AS n,
+            COUNT(fiscal_year) AS n_fiscal
+        FROM sales_dw.dim_date
+        """,
+        engine
+    ).iloc[0]
+    row_count = int(stats["n"])
+
+    if row_count:
+        first = date_from_date_id(stats["first_id"])
+        last = date_from_date_id(stats["last_id"])
+
+        contiguous = row_count == (last - first).days + 1
+        if (
+            contiguous
+            and first <= start
+            and end <= last
+            and int(stats["n_fiscal"]) == row_count
+        ):
+            return int(stats["first_id"]), int(stats["last_id"])
+
+        start, end = min(start, first), max(end, last)
+
+    calendar = build_calendar(start, end)
+
+    with engine.begin() as conn:
+        if row_count:
+            # Older runs loaded only the dates seen in each batch
+            existing = pd.read_sql(
+                "SELECT date_id FROM sales_dw.dim_date", conn
+            )["date_id"]
+            calendar = calendar[~calendar["date_id"].isin(existing)]
+            _backfill_calendar_attributes(conn)
+
+        if not calendar.empty:
+            copy_dataframe(conn, calendar, "dim_date", schema="sales_dw")
+
+    logger.info(
+        "Calendar dim_date covers %s to %s (%d days added)",
+        start.date(), end.date(), len(calendar)
+    )
+
+    first_id, last_id = date_id_from_dates(pd.Series([start, end]))
+    return int(first_id), int(last_id)
+
+# -----------------------------
+# Dimensions: hash-based upsert
+# -----------------------------
+# Each dimension row carries row_hash, a 64-bit hash of its attributes.
+# A load writes only rows whose key is new or whose hash differs from
+# the stored one, so re-sending unchanged rows costs no writes.
+
+def dimension_row_hash(df: pd.DataFrame, table_name: str, pk: str) -> pd.Series:
+    """
+    Signed 64-bit hash of each row's attributes (every model column
+    but pk and row_hash). Values are cast to their column's type first,
+    so categorical / Arrow strings or date objects hash the same as
+    plain ones.
+    """
+    table = Base.metadata.tables[f"sales_dw.{table_name}"]
+
+    attributes = {}
+    for col in table.columns:
+        if col.name in (pk, "row_hash") or col.name not in df.columns:
+            continue
+
+        values = df[col.name]
+        if isinstance(col.type, Date):
+            values = pd.to_datetime(values).astype("datetime64[ns]")
+        elif isinstance(col.type, (Float, Numeric)):
+            values = values.astype("float64")
+        else:
+            values = values.astype(object)
+        attributes[col.name] = values
+
+    hashes = pd.util.hash_pandas_object(
+        pd.DataFrame(attributes, index=df.index), index=False
+    )
+    return pd.Series(
+        hashes.to_numpy().view(np.int64), index=df.index, name="row_hash"
+    )
+
+
+def _record_category_moves(conn, table: str, batch: str) -> bool:
+    """
+    Save (product_id, old_category) of products in batch whose
+    category differs from the stored one. Returns True if any.
+    """
+    create_product_moves_table(conn)
+    moved = conn.execute(text(f"""
+        INSERT INTO {PRODUCT_MOVES_TABLE} (product_id, old_category)
+        SELECT t.product_id, t.category
+        FROM {table} t
+        JOIN {batch} b ON b.product_id = t.product_id
+        WHERE COALESCE(t.category, 'unknown') <> COALESCE(b.category, 'unknown')
+    """)).rowcount
+    return moved > 0
+
+
+def _upsert_dimension(
+    conn,
+    df: pd.DataFrame,
+    table_name: str,
+    pk: str,
+    track_categories: bool = False
+) -> Tuple[np.ndarray, int]:
+    """
+    COPY the batch into a temp table, then one INSERT ... ON CONFLICT
+    that skips rows whose stored row_hash matches and updates only
+    changed ones. Returns (inserted keys, updated count).
+    """
+    target = f"sales_dw.{table_name}"
+    batch = f"{table_name}_batch"
+    columns = list(df.columns)
+
+    conn.execute(text(f"""
+        CREATE TEMP TABLE IF NOT EXISTS {batch}
+        ON COMMIT DROP AS
+        SELECT {", ".join(columns)}
+        FROM {target}
+        WITH NO DATA
+    """))
+    conn.execute(text(f"TRUNCATE {batch}"))
+    copy_dataframe(conn, df, batch)
+
+    moved = track_categories and _record_category_moves(conn, target, batch)
+
+    updates = ", ".join(
+        f"{col} = EXCLUDED.{col}" for col in columns if col != pk
+    )
+    rows = conn.execute(text(f"""
+        INSERT INTO {target} AS t ({", ".join(columns)})
+        SELECT {", ".join(f"b.{col}" for col in columns)}
+        FROM {batch} b
+        WHERE NOT EXISTS (
+            SELECT 1
+            FROM {target} s
+            WHERE s.{pk} = b.{pk}
+              AND s.row_hash = b.row_hash
+        )
+        ON CONFLICT ({pk}) DO UPDATE SET {updates}
+        WHERE t.row_hash IS DISTINCT FROM EXCLUDED.row_hash
+        RETURNING t.{pk}, (xmax = 0) AS inserted
+    """)).all()
+
+    if moved:
+        move_product_categories(conn)
+
+    inserted = np.array([key for key, new in rows if new], dtype=np.int64)
+    return inserted, len(rows) - len(inserted)
+
+
+def _upsert_dimension_pandas(
+    conn,
+    df: pd.DataFrame,
+    table_name: str,
+    pk: str,
+    track_categories: bool = False
+) -> Tuple[np.ndarray, int]:
+    """
+    Fallback for non-Postgres warehouses: compare hashes in pandas,
+    append new rows and UPDATE changed ones.
+    """
+    target = f"sales_dw.{table_name}"
+    stored_columns = [pk, "row_hash"] + (["category"] if track_categories else [])
+    stored = pd.read_sql(f"SELECT {', '.join(stored_columns)} FROM {target}", conn)
+
+    merged = df[[pk, "row_hash"]].merge(
+        stored[[pk, "row_hash"]], on=pk, how="left",
+        suffixes=("", "_stored"), indicator=True
+    )
+    is_new = (merged["_merge"] == "left_only").to_numpy()
+    changed = ~is_new & (
+        merged["row_hash"] != merged["row_hash_stored"]
+    ).to_numpy()
+
+    new_rows = df[is_new]
+    changed_rows = df[changed]
+
+    copy_dataframe(conn, new_rows, table_name, schema="sales_dw")
+
+    moved = False
+    if track_categories and not changed_rows.empty:
+        old = stored.set_index(pk)["category"].reindex(changed_rows[pk])
+        recategorized = (
+            old.astype(object).fillna("unknown").to_numpy()
+            != changed_rows["category"].astype(object).fillna("unknown").to_numpy()
+        )
+        moved = bool(recategorized.any())
+        if moved:
+            create_product_moves_table(conn)
+            conn.execute(
+                text(
+                    f"INSERT INTO {PRODUCT_MOVES_TABLE} (product_id, old_category) "
+                    f"VALUES (:product_id, :old_category)"
+                ),
+                [
+                    {
+                        "product_id": int(key),
+                        "old_category": None if pd.isna(category) else category,
+                    }
+                    for key, category in old[recategorized].items()
+                ]
+            )
+
+    if not changed_rows.empty:
+        attributes = [col for col in df.columns if col != pk]
+        records = changed_rows.astype(object)
+        conn.execute(
+            text(
+                f"UPDATE {target} SET "
+                + ", ".join(f"{col} = :{col}" for col in attributes)
+                + f" WHERE {pk} = :{pk}"
+            ),
+            records.where(changed_rows.notna(), None).to_dict("records")
+        )
+
+    if moved:
+        move_product_categories(conn)
+
+    return new_rows[pk].to_numpy(dtype=np.int64), len(changed_rows)
+
+
+def load_dimension(
+    engine,
+    df: pd.DataFrame,
+    table_name: str,
+    pk: str,
+    key_cache: Optional[DimensionKeyCache] = None,
+    maintain_aggregates: bool = MAINTAIN_AGGREGATES
+) -> int:
+    """
+    Insert new rows and update changed ones (by row_hash).
+    Returns the number of rows written.
+    """
+    key_cache = key_cache or DEFAULT_KEY_CACHE
 
     # Drop ETL-only / validation columns
     drop_cols = {
@@ -25,88 +477,186 @@ def load_dimension(engine, df: pd.DataFrame, table_name: str, pk: str):
         "has_brand"
     }
 
-    df.drop(columns=[c for c in drop_cols if c in df.columns], inplace=True)
+    df = df.drop(columns=[c for c in drop_cols if c in df.columns])
 
-    existing = pd.read_sql(
-        f"SELECT {pk} FROM sales_dw.{table_name}",
-        engine
-    )
+    if df.empty:
+        logger.info("No new or changed rows for %s", table_name)
+        return 0
 
-    delta = df[~df[pk].isin(existing[pk])]
+    df["row_hash"] = dimension_row_hash(df, table_name, pk)
 
-    if delta.empty:
-        logger.info("No new rows for %s", table_name)
-        return
+    # A product's category feeds agg_sales_by_category
+    track_categories = maintain_aggregates and table_name == "dim_product"
 
-    delta.to_sql(
-        table_name,
-        engine,
-        schema="sales_dw",
-        if_exists="append",
-        index=False,
-        method="multi"
-    )
+    with engine.begin() as conn:
+        if conn.dialect.name == "postgresql":
+            upsert = _upsert_dimension
+        else:
+            upsert = _upsert_dimension_pandas
+        inserted, updated = upsert(conn, df, table_name, pk, track_categories)
 
-    logger.info("Loaded %d new rows into %s", len(delta), table_name)
+    key_cache.add(engine, table_name, pk, inserted)
 
+    if len(inserted) or updated:
+        logger.info(
+            "Loaded %s: %d new, %d changed rows",
+            table_name, len(inserted), updated
+        )
+    else:
+        logger.info("No new or changed rows for %s", table_name)
+    return len(inserted) + updated
 
-def load_fact(engine, df: pd.DataFrame):
-    df = df.copy()
 
-    # -----------------------------
-    # 1. Keep ONLY fact columns
-    # -----------------------------
-    fact_columns = [
-        "customer_id",
-        "product_id",
-        "date_id",
-        "quantity",
-        "unit_price",
-        "total_sale_amount",
-        "net_sale_amount",
-    ]
-
-    df = df[fact_columns]
+# -----------------------------
+# Fact grain: one row per customer / product / day
+# -----------------------------
+FACT_COLUMNS = [
+    "customer_id",
+    "product_id",
+    "date_id",
+    "quantity",
+    "unit_price",
+    "total_sale_amount",
+    "net_sale_amount",
+]
+FACT_GRAIN = ["customer_id", "product_id", "date_id"]
+FACT_BATCH_TABLE = "fact_sales_batch"
 
-    # -----------------------------
-    # 2. Deduplicate at FACT GRAIN
-    # -----------------------------
-    existing = pd.read_sql(
-        """
-        SELECT
-            customer_id,
-            product_id,
-            date_id
+
+def _insert_new_facts(
+    conn,
+    df: pd.DataFrame,
+    target: str = "sales_dw.fact_sales",
+    capture_delta: bool = False
+) -> int:
+    """
+    COPY the batch into a temp table and insert only rows whose grain
+    is not in target yet. The fact table never leaves the server.
+
+    With capture_delta the inserted rows are also appended to
+    FACT_DELTA_TABLE (INSERT ... RETURNING).
+    """
+    columns = ", ".join(FACT_COLUMNS)
+    grain_match = " AND ".join(f"f.{c} = b.{c}" for c in FACT_GRAIN)
+
+    conn.execute(text(f"""
+        CREATE TEMP TABLE IF NOT EXISTS {FACT_BATCH_TABLE}
+        ON COMMIT DROP AS
+        SELECT {columns}
         FROM sales_dw.fact_sales
-        """,
-        engine
+        WITH NO DATA
+    """))
+    conn.execute(text(f"TRUNCATE {FACT_BATCH_TABLE}"))
+
+    copy_dataframe(conn, df, FACT_BATCH_TABLE)
+
+    insert = f"""
+        INSERT INTO {target} ({columns})
+        SELECT {", ".join(f"b.{c}" for c in FACT_COLUMNS)}
+        FROM {FACT_BATCH_TABLE} b
+        WHERE NOT EXISTS (
+            SELECT 1
+            FROM {target} f
+            WHERE {grain_match}
+        )
+    """
+    if capture_delta:
+        insert = f"""
+            WITH inserted AS ({insert} RETURNING {columns})
+            INSERT INTO {FACT_DELTA_TABLE} ({columns})
+            SELECT {columns} FROM inserted
+        """
+
+    return conn.execute(text(insert)).rowcount
+
+
+def _insert_new_facts_partitioned(
+    conn,
+    df: pd.DataFrame,
+    capture_delta: bool = False
+) -> int:
+    """
+    Route the batch by month and load each slice straight into its
+    partition, so the anti-join only probes the months touched.
+    """
+    months = df["date_id"].to_numpy(dtype=np.int64) // 100
+    ensure_fact_partitions(conn, np.unique(months))
+
+    loaded = 0
+    for month, part in df.groupby(months, sort=True):
+        loaded += _insert_new_facts(
+            conn, part,
+            target=f"sales_dw.{fact_partition_name(month)}",
+            capture_delta=capture_delta
+        )
+    return loaded
+
+
+def _insert_new_facts_pandas(
+    conn,
+    df: pd.DataFrame,
+    capture_delta: bool = False
+) -> int:
+    """
+    Fallback for non-Postgres warehouses: anti-join in pandas.
+    """
+    existing = pd.read_sql(
+        f"SELECT {', '.join(FACT_GRAIN)} FROM sales_dw.fact_sales",
+        conn
     )
 
     if not existing.empty:
         df = df.merge(
             existing,
-            on=["customer_id", "product_id", "date_id"],
+            on=FACT_GRAIN,
             how="left",
             indicator=True
         )
         df = df[df["_merge"] == "left_only"].drop(columns="_merge")
 
+    if capture_delta:
+        copy_dataframe(conn, df, FACT_DELTA_TABLE)
+
+    return copy_dataframe(conn, df, "fact_sales", schema="sales_dw")
+
+
+def load_fact(
+    engine,
+    df: pd.DataFrame,
+    maintain_aggregates: bool = MAINTAIN_AGGREGATES
+) -> int:
+    # -----------------------------
+    # 1. Keep ONLY fact columns
+    # -----------------------------
+    df = df[FACT_COLUMNS]
+
     if df.empty:
         logger.info("No new fact records to load")
-        return
+        return 0
 
     # -----------------------------
-    # 3. Load facts
+    # 2. Deduplicate at FACT GRAIN and load
     # -----------------------------
-    df.to_sql(
-        "fact_sales",
-        engine,
-        schema="sales_dw",
-        if_exists="append",
-        index=False,
-        method="multi"
-    )
+    # 3. Add the inserted rows to the aggregates (same transaction)
+    # -----------------------------
+    with engine.begin() as conn:
+        if maintain_aggregates:
+            create_fact_delta_table(conn, FACT_COLUMNS)
 
-    logger.info("Loaded %d fact records into fact_sales", len(df))
+        if fact_is_partitioned(conn):
+            insert = _insert_new_facts_partitioned
+        elif conn.dialect.name == "postgresql":
+            insert = _insert_new_facts
+        else:
+            insert = _insert_new_facts_pandas
+        loaded = insert(conn, df, capture_delta=maintain_aggregates)
 
+        if maintain_aggregates:
+            apply_fact_delta(conn)
+
+    if loaded == 0:
+        logger.info("No new fact records to load")
+    else:
+        logger.info("Loaded %d fact records into fact_sales", loaded)
 
+    return loaded
@@ -1,5 +1,6 @@
 from sqlalchemy import (
-    Column, Integer, String, Float, Date, ForeignKey
+    Column, Integer, BigInteger, String, Float, Numeric, Date, Boolean,
+    ForeignKey, Index
 )
 from sqlalchemy.ext.declarative import declarative_base
 
@@ -15,6 +16,8 @@ class DimCustomer(Base):
     city = Column(String)
     state = Column(String)
     signup_date = Column(Date)
+    # hash_pandas_object of the attributes, see load_dimension()
+    row_hash = Column(BigInteger)
 
 class DimProduct(Base):
     __tablename__ = "dim_product"
@@ -25,6 +28,7 @@ class DimProduct(Base):
     category = Column(String)
     brand = Column(String)
     unit_price = Column(Float)
+    row_hash = Column(BigInteger)
 
 class DimDate(Base):
     __tablename__ = "dim_date"
@@ -37,10 +41,18 @@ class DimDate(Base):
     quarter = Column(Integer)
     year = Column(Integer)
     weekday = Column(String)
+    is_weekend = Column(Boolean)
+    fiscal_year = Column(Integer)
+    fiscal_quarter = Column(Integer)
+    fiscal_month = Column(Integer)
 
 class FactSales(Base):
     __tablename__ = "fact_sales"
-    __table_args__ = {"schema": "sales_dw"}
+    __table_args__ = (
+        # Fact grain, probed by the NOT EXISTS anti-join in load_fact
+        Index("idx_fact_sales_grain", "customer_id", "product_id", "date_id"),
+        {"schema": "sales_dw"},
+    )
 
     sales_id = Column(Integer, primary_key=True, autoincrement=True)
     customer_id = Column(Integer, ForeignKey("sales_dw.dim_customer.customer_id"))
@@ -50,3 +62,44 @@ class FactSales(Base):
     unit_price = Column(Float)
     total_sale_amount = Column(Float)
     net_sale_amount = Column(Float)
+
+
+# -----------------------------
+# Aggregates, maintained by etl/dw/aggregates.py
+# -----------------------------
+class AggSalesByProduct(Base):
+    __tablename__ = "agg_sales_by_product"
+    __table_args__ = {"schema": "sales_dw"}
+
+    product_id = Column(Integer, primary_key=True)
+    order_count = Column(BigInteger, nullable=False)
+    quantity = Column(BigInteger, nullable=False)
+    revenue = Column(Numeric(18, 2), nullable=False)
+
+class AggSalesByMonth(Base):
+    __tablename__ = "agg_sales_by_month"
+    __table_args__ = {"schema": "sales_dw"}
+
+    year = Column(Integer, primary_key=True)
+    month = Column(Integer, primary_key=True)
+    order_count = Column(BigInteger, nullable=False)
+    quantity = Column(BigInteger, nullable=False)
+    revenue = Column(Numeric(18, 2), nullable=False)
+
+class AggSalesByCustomer(Base):
+    __tablename__ = "agg_sales_by_customer"
+    __table_args__ = {"schema": "sales_dw"}
+
+    customer_id = Column(Integer, primary_key=True)
+    order_count = Column(BigInteger, nullable=False)
+    quantity = Column(BigInteger, nullable=False)
+    revenue = Column(Numeric(18, 2), nullable=False)
+
+class AggSalesByCategory(Base):
+    __tablename__ = "agg_sales_by_category"
+    __table_args__ = {"schema": "sales_dw"}
+
+    category = Column(String, primary_key=True)
+    order_count = Column(BigInteger, nullable=False)
+    quantity = Column(BigInteger, nullable=False)
+    revenue = Column(Numeric(18, 2), nullable=False)
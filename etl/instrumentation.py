@@ -0,0 +1,229 @@
+# etl/instrumentation.py
+"""
+Stage timing and memory measurement.
+
+measure_stage() wraps a block of work and records wall time, row
+counts and peak RSS. Peak RSS is sampled from a background thread
+(psutil), so short-lived spikes inside pandas calls are caught.
+
+RSS is process-wide: a block that runs alongside others on different
+threads (concurrent DAG steps) would be charged their allocations too.
+Blocks measured through a shared OverlapTracker are flagged as
+overlapped when that happens and record no memory figures; the
+enclosing stage's figures cover them.
+"""
+
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+import psutil
+from sqlalchemy import inspect, text
+
+logger = logging.getLogger(__name__)
+
+# Seconds between RSS samples
+RSS_SAMPLE_INTERVAL = 0.005
+
+STAGE_METRICS_TABLE = "sales_staging.etl_stage_metrics"
+
+_MB = 1024 * 1024
+
+
+class PeakRSSSampler:
+    """
+    Tracks the peak resident set size of this process while running.
+    """
+
+    def __init__(self, interval: float = RSS_SAMPLE_INTERVAL) -> None:
+        self.interval = interval
+        self._process = psutil.Process()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.start_rss = 0
+        self.peak_rss = 0
+
+    def _sample(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.peak_rss = max(self.peak_rss, self._process.memory_info().rss)
+
+    def start(self) -> "PeakRSSSampler":
+        self.start_rss = self.peak_rss = self._process.memory_info().rss
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._sample, name="rss-sampler", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.peak_rss = max(self.peak_rss, self._process.memory_info().rss)
+
+
+class OverlapTracker:
+    """
+    Flags measured blocks whose lifetimes overlap.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._open: List[Dict[str, Any]] = []
+
+    @contextmanager
+    def track(self, metrics: Dict[str, Any]) -> Iterator[None]:
+        with self._lock:
+            metrics["overlapped"] = bool(self._open)
+            for other in self._open:
+                other["overlapped"] = True
+            self._open.append(metrics)
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._open.remove(metrics)
+
+
+@contextmanager
+def measure_stage(
+    stage: str,
+    rows_in: Optional[int] = None,
+    overlaps: Optional[OverlapTracker] = None
+) -> Iterator[Dict[str, Any]]:
+    """
+    Measure a stage. Set metrics["rows_out"] inside the block;
+    the remaining fields are filled in on exit:
+
+        with measure_stage("validate", rows_in=len(df)) as metrics:
+            df = validate(df)
+            metrics["rows_out"] = len(df)
+
+    With overlaps, peak_rss_mb / rss_delta_mb are None if another
+    block tracked by it ran at the same time.
+    """
+    metrics: Dict[str, Any] = {
+        "stage": stage,
+        "rows_in": rows_in,
+        "rows_out": None,
+        "overlapped": False,
+    }
+
+    sampler = PeakRSSSampler().start()
+    start = time.perf_counter()
+    try:
+        if overlaps is None:
+            yield metrics
+        else:
+            with overlaps.track(metrics):
+                yield metrics
+    finally:
+        seconds = time.perf_counter() - start
+        sampler.stop()
+
+        rows = (
+            metrics["rows_in"] if metrics["rows_in"] is not None
+            else metrics["rows_out"]
+        ) or 0
+        metrics.update({
+            "seconds": round(seconds, 6),
+            "rows_per_sec": round(rows / seconds, 1) if seconds > 0 else None,
+            "peak_rss_mb": round(sampler.peak_rss / _MB, 1),
+            "rss_delta_mb": round(
+                (sampler.peak_rss - sampler.start_rss) / _MB, 1
+            ),
+        })
+        if metrics["overlapped"]:
+            # Includes whatever the concurrent blocks allocated
+            metrics["peak_rss_mb"] = metrics["rss_delta_mb"] = None
+
+
+# =========================
+# PERSISTENCE
+# =========================
+def log_stage_metrics(run_id: str, metrics: Dict[str, Any]) -> None:
+    """
+    One structured (JSON) log line per stage.
+    """
+    logger.info(
+        "stage_metrics %s",
+        json.dumps({"run_id": run_id, **metrics}, default=str)
+    )
+
+
+def save_stage_metrics(
+    engine,
+    run_id: str,
+    metrics: List[Dict[str, Any]],
+    pipeline_name: str = "sales_etl"
+) -> None:
+    """
+    Persist a run's stage metrics to sales_staging.etl_stage_metrics.
+    """
+    if not metrics:
+        return
+
+    rows = [
+        {
+            "run_id": run_id,
+            "pipeline_name": pipeline_name,
+            "stage_order": order,
+            "stage": m["stage"],
+            "rows_in": m.get("rows_in"),
+            "rows_out": m.get("rows_out"),
+            "seconds": m.get("seconds"),
+            "rows_per_sec": m.get("rows_per_sec"),
+            "peak_rss_mb": m.get("peak_rss_mb"),
+            "rss_delta_mb": m.get("rss_delta_mb"),
+            "overlapped": bool(m.get("overlapped")),
+        }
+        for order, m in enumerate(metrics, start=1)
+    ]
+
+    with engine.begin() as conn:
+        conn.execute(text(f"""
+            CREATE TABLE IF NOT EXISTS {STAGE_METRICS_TABLE} (
+                run_id VARCHAR(32) NOT NULL,
+                pipeline_name VARCHAR(64) NOT NULL,
+                stage_order INTEGER NOT NULL,
+                stage VARCHAR(128) NOT NULL,
+                rows_in BIGINT,
+                rows_out BIGINT,
+                seconds DOUBLE PRECISION,
+                rows_per_sec DOUBLE PRECISION,
+                peak_rss_mb DOUBLE PRECISION,
+                rss_delta_mb DOUBLE PRECISION,
+                overlapped BOOLEAN,
+                recorded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (run_id, stage_order)
+            )
+        """))
+
+        schema, table = STAGE_METRICS_TABLE.split(".")
+        columns = {c["name"] for c in inspect(conn).get_columns(table, schema=schema)}
+        if "overlapped" not in columns:
+            conn.execute(text(
+                f"ALTER TABLE {STAGE_METRICS_TABLE} ADD COLUMN overlapped BOOLEAN"
+            ))
+
+        conn.execute(
+            text(f"""
+                INSERT INTO {STAGE_METRICS_TABLE} (
+                    run_id, pipeline_name, stage_order, stage,
+                    rows_in, rows_out, seconds, rows_per_sec,
+                    peak_rss_mb, rss_delta_mb, overlapped
+                )
+                VALUES (
+                    :run_id, :pipeline_name, :stage_order, :stage,
+                    :rows_in, :rows_out, :seconds, :rows_per_sec,
+                    :peak_rss_mb, :rss_delta_mb, :overlapped
+                )
+            """),
+            rows
+        )
+
+    logger.info("Saved %d stage metrics for run %s", len(rows), run_id)
@@ -1,15 +1,22 @@
 
 import logging
-from typing import Optional, List
+import threading
+import uuid
+from contextlib import ExitStack, contextmanager
+from datetime import datetime
+from functools import partial
+from typing import Any, Callable, Dict, Iterator, Optional, List, Sequence, Tuple
+import numpy as np
 import pandas as pd
 from sqlalchemy import text
+from sqlalchemy.engine import Engine
 
 from etl.logging_config import setup_logging
-from db.database import get_engine
+from db.database import get_engine, pool_stats
 from etl.transform.customer_transform import transform_customers
 from etl.transform.product_transform import transform_products
 from etl.transform.sales_transform import transform_sales
-from etl.transform.date_dim import build_dim_date
+from etl.transform.date_dim import date_id_from_dates
 
 # Validation
 from etl.validate import (
@@ -25,114 +32,427 @@ from etl.validate import (
 )
 
 # Dedup & rejects
-from etl.dedup import (
-    resolve_duplicate_customers,
-    save_rejected_customer_duplicates
+from etl.dedup import resolve_duplicate_customers
+from etl.product_dedup import resolve_duplicate_products
+from etl.sales_rejects import detect_corrupt_transactions
+from etl.reject_sink import RejectSink
+from etl.validate_sql import (
+    SALES_REJECT_REASONS,
+    VALIDATION_BACKEND,
+    VALIDATION_BACKENDS,
+    SQLValidator,
 )
-from etl.product_dedup import (
-    resolve_duplicate_products,
-    save_rejected_product_duplicates
+from etl.dag import DAG_MAX_WORKERS, Step, run_dag
+from etl.checkpoint import (
+    CHECKPOINT_STAGES,
+    RunCheckpoint,
+    checkpoints_supported,
+    clear_checkpoints,
+    latest_checkpoint,
 )
-from etl.sales_rejects import (
-    detect_corrupt_transactions,
-    save_rejected_sales_transactions
+from etl.instrumentation import (
+    OverlapTracker,
+    measure_stage,
+    log_stage_metrics,
+    save_stage_metrics,
 )
-from etl.rejects import save_rejected_batches
 
 # Transform & DW
-from etl.transform.sales_transform import transform_sales
-from etl.transform.date_dim import build_dim_date
-from etl.dw.load import create_dw_tables, load_dimension, load_fact
+from etl.dw.load import (
+    PARTITION_FACT_SALES,
+    create_dw_tables,
+    ensure_calendar,
+    load_dimension,
+    load_fact,
+)
+from etl.dw.key_cache import warehouse_keys
 
 logger = logging.getLogger(__name__)
 
+# Rows per sales chunk in streaming mode
+STREAM_CHUNK_SIZE = 50_000
+
 
 class SalesETLPipeline:
-    def __init__(self) -> None:
+    # Frames a stage DAG reads from and writes back to the pipeline
+    _FRAMES = ("customers", "products", "sales")
+
+    def __init__(
+        self,
+        streaming: bool = False,
+        chunk_size: int = STREAM_CHUNK_SIZE,
+        engine: Optional[Engine] = None,
+        compact_dtypes: bool = False,
+        max_workers: int = DAG_MAX_WORKERS,
+        partition_facts: bool = PARTITION_FACT_SALES,
+        validation_backend: str = VALIDATION_BACKEND,
+        checkpoint: bool = CHECKPOINT_STAGES
+    ) -> None:
         setup_logging()
-        self.engine = get_engine()
+        self.engine = engine or get_engine()
+
+        if validation_backend not in VALIDATION_BACKENDS:
+            raise ValueError(
+                f"validation_backend must be one of {VALIDATION_BACKENDS}"
+            )
+        if validation_backend == "sql" and self.engine.dialect.name != "postgresql":
+            logger.warning("SQL validation needs PostgreSQL; using pandas")
+            validation_backend = "pandas"
+        self.validation_backend = validation_backend
+
+        self.streaming = streaming
+        self.chunk_size = chunk_size
+        self.compact_dtypes = compact_dtypes
+        self.max_workers = max_workers
+        self.partition_facts = partition_facts
+        self.checkpoint = checkpoint
 
         self.customers: Optional[pd.DataFrame] = None
         self.products: Optional[pd.DataFrame] = None
         self.sales: Optional[pd.DataFrame] = None
 
-        self.rejected_records: List[pd.DataFrame] = []
+        # (first, last) date_id of the contiguous dim_date calendar
+        self.calendar_range: Optional[Tuple[int, int]] = None
+
+        # Sales rows rejected this run (dimension duplicates are
+        # quarantined too but not counted in the audit log)
+        self.rejected_count = 0
+        self.reject_sink: Optional[RejectSink] = None
+        self._reject_lock = threading.Lock()
+
+        self.run_id = uuid.uuid4().hex
+        self.stage_metrics: List[Dict[str, Any]] = []
+        # DAG steps may run side by side; their RSS is then shared
+        self._step_overlaps = OverlapTracker()
+
+        # Upper bound of the staging delta (inclusive). None reads
+        # everything staged so far and advances the watermark to NOW();
+        # the continuous scheduler sets it to a point with no staging
+        # write in flight, so nothing committed later is skipped.
+        self.ingest_ceiling: Optional[datetime] = None
+
+    # INSTRUMENTATION
+
+    @contextmanager
+    def _stage(
+        self,
+        stage: str,
+        rows_in: Optional[int] = None,
+        overlaps: Optional[OverlapTracker] = None
+    ):
+        """
+        Measure a stage and record it under the current run_id.
+        """
+        with measure_stage(stage, rows_in, overlaps) as metrics:
+            yield metrics
+        self.stage_metrics.append(metrics)
+        log_stage_metrics(self.run_id, metrics)
+
+    def _frame_rows(self) -> int:
+        return sum(
+            len(getattr(self, frame)) for frame in self._FRAMES
+            if getattr(self, frame) is not None
+        )
+
+    def _step(self, stage: str, func: Callable, *args, **kwargs):
+        """
+        Run func under _stage(). rows_in is the length of the first
+        frame argument, rows_out the length of the first frame returned
+        (or the count returned by a loader). Steps that overlap another
+        step record no memory figures (see OverlapTracker).
+        """
+        frames = [a for a in args if isinstance(a, pd.DataFrame)]
+        rows_in = len(frames[0]) if frames else None
+
+        with self._stage(stage, rows_in, self._step_overlaps) as metrics:
+            result = func(*args, **kwargs)
+            first = result[0] if isinstance(result, tuple) else result
+            if isinstance(first, pd.DataFrame):
+                metrics["rows_out"] = len(first)
+            elif isinstance(first, int):
+                metrics["rows_out"] = first
+
+        return result
+
+    def _reject(self, df: pd.DataFrame, reason: str) -> int:
+        """
+        Hand rejected rows to the background sink; returns the count.
+        """
+        with self._reject_lock:
+            if self.reject_sink is None:
+                self.reject_sink = RejectSink(run_id=self.run_id)
+        return self.reject_sink.submit(df, reason)
+
+    def _close_reject_sink(self, raise_errors: bool = True) -> None:
+        if self.reject_sink is None:
+            return
+
+        sink, self.reject_sink = self.reject_sink, None
+        try:
+            sink.close()
+        except Exception:
+            if raise_errors:
+                raise
+            logger.exception("Failed to flush rejected records")
+
+    def _save_stage_metrics(self) -> None:
+        try:
+            save_stage_metrics(self.engine, self.run_id, self.stage_metrics)
+        except Exception:
+            # Metrics must never fail a run
+            logger.exception("Failed to save stage metrics")
+
+    def _log_pool_stats(self) -> None:
+        stats = pool_stats(self.engine)
+        if stats:
+            logger.info("Connection pool: %s", stats)
 
     
     # EXTRACT
     
-    def extract(self) -> None:
-        logger.info("Starting extract stage")
-
+    def _read_watermark(self):
         query = """
             SELECT last_processed_ingest_date
             FROM sales_staging.etl_audit_log
             WHERE pipeline_name = 'sales_etl'
         """
         result = pd.read_sql(query, self.engine)
-        last_ingest = result.iloc[0, 0] if not result.empty else "1900-01-01"
+        return result.iloc[0, 0] if not result.empty else "1900-01-01"
+
+    def _delta_filter(self, last_ingest) -> str:
+        """
+        WHERE condition selecting this run's staging rows.
+        """
+        condition = f"ingest_date > '{last_ingest}'"
+        if self.ingest_ceiling is not None:
+            condition += f" AND ingest_date <= '{self.ingest_ceiling}'"
+        return condition
+
+    def _validator(self, last_ingest) -> SQLValidator:
+        return SQLValidator(
+            self.engine, last_ingest, self.run_id, self.ingest_ceiling
+        )
+
+    def _extract_validated(self, last_ingest) -> int:
+        """
+        SQL backend: validate in the staging database and extract only
+        the clean rows. Returns the number of staging rows validated.
+        """
+        with self._validator(last_ingest) as validator:
+            self.customers, self.products = validator.dimensions()
+            self.sales = validator.sales()
+
+        self.rejected_count += validator.sales_rejected_total
+        return sum(validator.extracted.values())
+
+    def extract(self) -> int:
+        """
+        Read the staging delta. Returns the number of staging rows.
+        """
+        logger.info("Starting extract stage")
+
+        last_ingest = self._read_watermark()
+
+        if self.validation_backend == "sql":
+            extracted = self._extract_validated(last_ingest)
+            logger.info("Extract completed (validated in SQL)")
+            return extracted
 
         self.customers = pd.read_sql(
-            f"SELECT * FROM sales_staging.customers_stage WHERE ingest_date > '{last_ingest}'",
+            f"SELECT * FROM sales_staging.customers_stage WHERE {self._delta_filter(last_ingest)}",
             self.engine
         )
         self.products = pd.read_sql(
-            f"SELECT * FROM sales_staging.products_stage WHERE ingest_date > '{last_ingest}'",
+            f"SELECT * FROM sales_staging.products_stage WHERE {self._delta_filter(last_ingest)}",
             self.engine
         )
         self.sales = pd.read_sql(
-            f"SELECT * FROM sales_staging.sales_transactions_stage WHERE ingest_date > '{last_ingest}'",
+            f"SELECT * FROM sales_staging.sales_transactions_stage WHERE {self._delta_filter(last_ingest)}",
             self.engine
         )
 
         logger.info("Extract completed")
+        return len(self.customers) + len(self.products) + len(self.sales)
 
     
     # VALIDATE
     
-    
-    def validate(self) -> None:
-        logger.info("Starting validation stage")
+    # Each stage is a small DAG (etl/dag.py). Steps name the values
+    # they read and write; customers, products and sales only meet at
+    # detect_orphan_transactions, so until then the three branches run
+    # side by side on max_workers threads.
 
-        # ---- Normalize
-        self.customers = normalize_empty_strings(self.customers)
-        self.products = normalize_empty_strings(self.products)
-        self.sales = normalize_empty_strings(self.sales)
+    def _task(
+        self,
+        stage: str,
+        func: Callable,
+        inputs: Sequence[str],
+        outputs: Sequence[str] = (),
+        after: Sequence[str] = (),
+        **kwargs
+    ) -> Step:
+        """
+        A DAG step that runs func through _step(), so it is measured.
+        """
+        return Step(
+            stage,
+            partial(self._step, stage, func, **kwargs),
+            inputs, outputs, after
+        )
 
-        # ---- Numeric cleanup
-        self.sales = clean_numeric_fields(self.sales)
-        self.products = clean_product_numeric_fields(self.products)
+    def _rejecting(self, func: Callable, reason: str) -> Callable:
+        """
+        Wrap a (clean, rejected) validator so rejects go to the sink
+        and only (clean, rejected_count) is passed on.
+        """
+        def run(*args, **kwargs):
+            clean, rejected = func(*args, **kwargs)
+            return clean, self._reject(rejected, reason)
+        return run
 
-        # ---- Dedup dimensions
-        self.customers, rejected_cust = resolve_duplicate_customers(self.customers)
-        save_rejected_customer_duplicates(rejected_cust)
+    def _run_dag(
+        self,
+        name: str,
+        steps: List[Step],
+        max_workers: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Run steps over the pipeline's frames. The DAG owns the frames
+        while it runs, so versions it has replaced are freed early; on
+        failure the frames are left unset.
+        """
+        frames = {}
+        for frame in self._FRAMES:
+            frames[frame] = getattr(self, frame)
+            setattr(self, frame, None)
 
-        self.products, rejected_prod = resolve_duplicate_products(self.products)
-        save_rejected_product_duplicates(rejected_prod)
+        values = run_dag(
+            steps,
+            frames,
+            max_workers=max_workers or self.max_workers,
+            name=name
+        )
+        for frame in self._FRAMES:
+            setattr(self, frame, values[frame])
+        return values
 
-        # ---- Date validation
-        self.sales, rejected_dates = validate_transaction_dates(self.sales)
-        self.rejected_records.append(rejected_dates)
+    def _dimension_steps(self) -> List[Step]:
+        """
+        Normalize, clean and dedup customers and products.
+        Shared by the batch and streaming paths.
+        """
+        return [
+            self._task(
+                "validate.normalize_customers", normalize_empty_strings,
+                ["customers"], ["customers"]
+            ),
+            self._task(
+                "validate.dedup_customers",
+                self._rejecting(resolve_duplicate_customers, "customer_duplicate"),
+                ["customers"], ["customers", "rejected.customer_duplicate"]
+            ),
+            self._task(
+                "validate.normalize_products", normalize_empty_strings,
+                ["products"], ["products"]
+            ),
+            self._task(
+                "validate.clean_product_numeric", clean_product_numeric_fields,
+                ["products"], ["products"]
+            ),
+            self._task(
+                "validate.dedup_products",
+                self._rejecting(resolve_duplicate_products, "product_duplicate"),
+                ["products"], ["products", "rejected.product_duplicate"]
+            ),
+        ]
 
-        # ---- Corrupt sales
-        self.sales, rejected_corrupt = detect_corrupt_transactions(self.sales)
-        self.rejected_records.append(rejected_corrupt)
-        save_rejected_sales_transactions(rejected_corrupt)
+    def _sales_validation_steps(self) -> List[Step]:
+        return [
+            self._task(
+                "validate.normalize_sales", normalize_empty_strings,
+                ["sales"], ["sales"]
+            ),
+            self._task(
+                "validate.clean_sales_numeric", clean_numeric_fields,
+                ["sales"], ["sales"]
+            ),
+            self._task(
+                "validate.transaction_dates",
+                self._rejecting(validate_transaction_dates, "invalid_date"),
+                ["sales"], ["sales", "rejected.invalid_date"]
+            ),
+            self._task(
+                "validate.corrupt_sales",
+                self._rejecting(detect_corrupt_transactions, "corrupt_sales"),
+                ["sales"], ["sales", "rejected.corrupt_sales"]
+            ),
+            self._task(
+                "validate.warehouse_keys", self._warehouse_keys,
+                [], ["dw_customer_ids", "dw_product_ids"]
+            ),
+            # ---- Orphans (USING CLEANED DIMENSIONS + WAREHOUSE KEYS)
+            self._task(
+                "validate.orphans",
+                self._rejecting(detect_orphan_transactions, "orphan_sales"),
+                [
+                    "sales", "customers", "products",
+                    "dw_customer_ids", "dw_product_ids",
+                ],
+                ["sales", "rejected.orphan_sales"]
+            ),
+        ]
 
-        # ---- Orphans (USING CLEANED DIMENSIONS)
-        self.sales, rejected_orphans = detect_orphan_transactions(
-            self.sales, self.customers, self.products
+    def _warehouse_keys(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Sorted customer / product keys already in the warehouse,
+        served from the dimension key cache.
+        """
+        return (
+            warehouse_keys(self.engine, "dim_customer", "customer_id"),
+            warehouse_keys(self.engine, "dim_product", "product_id"),
         )
-        self.rejected_records.append(rejected_orphans)
+
+    def validate(self) -> None:
+        logger.info("Starting validation stage")
 
         # ---- Final dtypes
-        self.customers = enforce_customer_dtypes(self.customers)
-        self.products = enforce_product_dtypes(self.products)
-        self.sales = enforce_sales_dtypes(self.sales)
+        dtype_steps = [
+            self._task(
+                "validate.customer_dtypes", enforce_customer_dtypes,
+                ["customers"], ["customers"], compact=self.compact_dtypes
+            ),
+            self._task(
+                "validate.product_dtypes", enforce_product_dtypes,
+                ["products"], ["products"], compact=self.compact_dtypes
+            ),
+            self._task(
+                "validate.sales_dtypes", enforce_sales_dtypes,
+                ["sales"], ["sales"], compact=self.compact_dtypes
+            ),
+        ]
 
-        save_rejected_batches(self.rejected_records)
+        if self.validation_backend == "sql":
+            # Rules already ran in the staging database during extract
+            self._run_dag("validate", dtype_steps)
+            logger.info("Validation completed")
+            return
+
+        values = self._run_dag(
+            "validate",
+            self._dimension_steps()
+            + self._sales_validation_steps()
+            + dtype_steps
+        )
+
+        self.rejected_count += sum(
+            values[f"rejected.{reason}"]
+            for reason in SALES_REJECT_REASONS
+        )
         logger.info("Validation completed")
 
+    def _validate_dimensions(self) -> None:
+        self._run_dag("validate.dimensions", self._dimension_steps())
+
     
     # TRANSFORM
     
@@ -140,11 +460,13 @@ class SalesETLPipeline:
     def transform(self) -> None:
         logger.info("Starting transform stage")
 
-        self.customers = transform_customers(self.customers)
-        self.products = transform_products(self.products)
-        self.sales = transform_sales(self.sales)
-
-        self.dim_date = build_dim_date(self.sales["transaction_date"])
+        self._run_dag("transform", [
+            Step("transform.customers", transform_customers,
+                 ["customers"], ["customers"]),
+            Step("transform.products", transform_products,
+                 ["products"], ["products"]),
+            Step("transform.sales", transform_sales, ["sales"], ["sales"]),
+        ])
 
         logger.info("Transform completed")
 
@@ -152,22 +474,86 @@ class SalesETLPipeline:
    
     # LOAD
     
+    def _load_workers(self) -> int:
+        # SQLite (benchmark stand-in) allows a single writer
+        return 1 if self.engine.dialect.name == "sqlite" else self.max_workers
+
+    def _load_dimension_steps(self) -> List[Step]:
+        return [
+            self._task(
+                "load.dim_customer",
+                lambda df: load_dimension(self.engine, df, "dim_customer", "customer_id"),
+                ["customers"]
+            ),
+            self._task(
+                "load.dim_product",
+                lambda df: load_dimension(self.engine, df, "dim_product", "product_id"),
+                ["products"]
+            ),
+        ]
+
+    def _ensure_calendar(self, dates: pd.Series) -> Tuple[int, int]:
+        """
+        Make sure dim_date covers dates. Free while they fall inside
+        the calendar range already confirmed in this run.
+        """
+        if dates.isna().all():
+            # No sales survived validation (e.g. a dimension-only
+            # micro-batch): the default calendar is enough
+            if self.calendar_range is None:
+                self.calendar_range = ensure_calendar(self.engine)
+            return self.calendar_range
+
+        first, last = date_id_from_dates(pd.Series([dates.min(), dates.max()]))
+
+        if (
+            self.calendar_range is None
+            or first < self.calendar_range[0]
+            or last > self.calendar_range[1]
+        ):
+            self.calendar_range = ensure_calendar(
+                self.engine, dates.min(), dates.max()
+            )
+        return self.calendar_range
+
+    def _assign_date_ids(self, sales: pd.DataFrame) -> pd.DataFrame:
+        """
+        Arithmetic YYYYMMDD keys, checked against the calendar range
+        instead of diffing a per-batch date dimension.
+        """
+        sales["date_id"] = date_id_from_dates(sales["transaction_date"])
+
+        first, last = self._ensure_calendar(sales["transaction_date"])
+        outside = ~sales["date_id"].between(first, last)
+        if outside.any():
+            raise ValueError(
+                f"{int(outside.sum())} sales have a date_id outside "
+                f"dim_date ({first}..{last})"
+            )
+        return sales
+
+    def _load_fact(self, sales: pd.DataFrame) -> int:
+        return load_fact(self.engine, self._assign_date_ids(sales))
+
     def load(self) -> None:
         logger.info("Starting load stage")
 
-        create_dw_tables(self.engine)  
-
-        load_dimension(self.engine, self.customers, "dim_customer", "customer_id")
-        load_dimension(self.engine, self.products, "dim_product", "product_id")
-        load_dimension(self.engine, self.dim_date, "dim_date", "date_id")
+        create_dw_tables(self.engine, partition_facts=self.partition_facts)
 
-        self.sales["date_id"] = (
-            self.sales["transaction_date"]
-            .dt.strftime("%Y%m%d")
-            .astype(int)
-        )
+        # Dimensions load in parallel; facts wait for all of them
+        # so every foreign key already exists
+        self._run_dag("load", self._load_dimension_steps() + [
+            Step(
+                "load.calendar",
+                lambda sales: self._ensure_calendar(sales["transaction_date"]),
+                ["sales"]
+            ),
+            self._task(
+                "load.fact_sales", self._load_fact, ["sales"],
+                after=["load.dim_customer", "load.dim_product", "load.calendar"]
+            ),
+        ], max_workers=self._load_workers())
 
-        load_fact(self.engine, self.sales)
         logger.info("Load completed")
 
     from sqlalchemy import text
@@ -190,7 +576,11 @@ class SalesETLPipeline:
                     run_status
                 )
             VALUES
-                ('sales_etl', NOW(), :processed, :rejected, :loaded, :status)
+                (
+                    'sales_etl',
+                    COALESCE(CAST(:watermark AS TIMESTAMP), NOW()),
+                    :processed, :rejected, :loaded, :status
+                )
             ON CONFLICT (pipeline_name)
             DO UPDATE SET
                 last_processed_ingest_date = EXCLUDED.last_processed_ingest_date,
@@ -201,6 +591,12 @@ class SalesETLPipeline:
                 updated_at = NOW();
         """)
 
+        watermark = self.ingest_ceiling
+        if status == "FAILED" and watermark is not None:
+            # Pinned runs (continuous or checkpointed) keep the delta
+            # for the next micro-batch or --resume
+            watermark = self._read_watermark()
+
         try:
             with self.engine.begin() as conn:
                 conn.execute(
@@ -209,7 +605,8 @@ class SalesETLPipeline:
                         "processed": records_processed,
                         "rejected": records_rejected,
                         "loaded": records_loaded,
-                        "status": status
+                        "status": status,
+                        "watermark": watermark
                     }
                 )
 
@@ -237,23 +634,374 @@ class SalesETLPipeline:
     #         logger.exception("ETL pipeline failed")
     #         raise
 
-    def run(self) -> None:
+    # =========================
+    # CHECKPOINTS
+    # =========================
+    # With checkpointing on, the frames are saved after extract,
+    # validate and transform (etl/checkpoint.py) and the run's delta is
+    # pinned to the newest ingest_date staged when it started. A failed
+    # run then keeps its watermark, and run(resume=True) reloads the
+    # last saved stage instead of starting over. Loads are idempotent,
+    # so a half-finished load is simply run again.
+
+    def _checkpoint_options(self) -> Dict[str, Any]:
+        # Options that change what the saved frames look like
+        return {
+            "validation_backend": self.validation_backend,
+            "compact_dtypes": self.compact_dtypes,
+        }
+
+    def _staged_ceiling(self, last_ingest):
+        """
+        Newest ingest_date in the staging delta.
+        """
+        query = " UNION ALL ".join(
+            f"SELECT MAX(ingest_date) AS newest FROM sales_staging.{table} "
+            f"WHERE ingest_date > '{last_ingest}'"
+            for table in (
+                "customers_stage", "products_stage", "sales_transactions_stage"
+            )
+        )
+        newest = pd.read_sql(
+            f"SELECT MAX(newest) FROM ({query}) staged", self.engine
+        ).iloc[0, 0]
+        return pd.Timestamp(last_ingest if pd.isna(newest) else newest)
+
+    def _open_checkpoint(self, resume: bool) -> Optional[RunCheckpoint]:
+        """
+        Checkpoint to resume from (frames and counters restored), or
+        a new one for this run. None when checkpointing is off.
+        """
+        if not (resume or self.checkpoint):
+            return None
+        if not checkpoints_supported():
+            logger.warning("pyarrow is not installed; checkpoints disabled")
+            return None
+
+        last_ingest = self._read_watermark()
+        options = self._checkpoint_options()
+
+        if resume:
+            checkpoint = latest_checkpoint(last_ingest, options)
+            if checkpoint is not None:
+                self.ingest_ceiling = pd.Timestamp(checkpoint.manifest["ceiling"])
+                self.rejected_count = checkpoint.counters.get("rejected", 0)
+                for name, df in checkpoint.frames().items():
+                    setattr(self, name, df)
+
+                # This attempt keeps its own run_id for metrics and rejects
+                logger.info(
+                    "Run %s resumes run %s after stage '%s'",
+                    self.run_id, checkpoint.run_id, checkpoint.last_stage
+                )
+                return checkpoint
+
+            logger.warning(
+                "No checkpoint to resume at watermark %s; starting over",
+                last_ingest
+            )
+
+        if self.ingest_ceiling is None:
+            self.ingest_ceiling = self._staged_ceiling(last_ingest)
+
+        return RunCheckpoint.create(
+            self.run_id, last_ingest, self.ingest_ceiling, options
+        )
+
+    def _save_checkpoint(
+        self,
+        checkpoint: Optional[RunCheckpoint],
+        stage: str,
+        **counters: int
+    ) -> None:
+        if checkpoint is None:
+            return
+
+        try:
+            with self._stage(f"checkpoint.{stage}", len(self.sales)):
+                checkpoint.save(
+                    stage,
+                    {frame: getattr(self, frame) for frame in self._FRAMES},
+                    rejected=self.rejected_count,
+                    **counters
+                )
+        except Exception:
+            # A missing checkpoint only costs a longer retry
+            logger.exception("Failed to save %s checkpoint", stage)
+
+    def run(self, resume: bool = False) -> None:
+        """
+        Batch run. With resume, continue the newest checkpointed run
+        that failed at the current watermark, if there is one.
+        """
+        if self.streaming:
+            if resume:
+                logger.warning("Streaming runs are not checkpointed; starting over")
+            self.run_streaming()
+            return
+
         extracted = rejected = loaded = 0
+        self.run_id = uuid.uuid4().hex
+        self.stage_metrics = []
+        self.rejected_count = 0
+        self.calendar_range = None
+
+        ingest_ceiling = self.ingest_ceiling
+        checkpoint = None
 
         try:
-            self.extract()
+            checkpoint = self._open_checkpoint(resume)
+            completed = list(checkpoint.stages) if checkpoint else []
+            if completed:
+                extracted = checkpoint.counters.get("extracted", 0)
+
+            if "extract" not in completed:
+                with self._stage("extract") as metrics:
+                    extracted = self.extract()
+                    metrics["rows_out"] = extracted
+                self._save_checkpoint(checkpoint, "extract", extracted=extracted)
+
+            if "validate" not in completed:
+                with self._stage("validate", self._frame_rows()) as metrics:
+                    self.validate()
+                    metrics["rows_out"] = self._frame_rows()
+                self._save_checkpoint(checkpoint, "validate")
+            rejected = self.rejected_count
+
+            if "transform" not in completed:
+                with self._stage("transform", len(self.sales)) as metrics:
+                    self.transform()
+                    metrics["rows_out"] = len(self.sales)
+                self._save_checkpoint(checkpoint, "transform")
+
+            with self._stage("load", len(self.sales)) as metrics:
+                self.load()
+                metrics["rows_out"] = len(self.sales)
+            loaded = len(self.sales)
+
+            # Rejects must be on disk before the run counts as done
+            self._close_reject_sink()
+
+            self.update_audit_log(
+                records_processed=extracted,
+                records_rejected=rejected,
+                records_loaded=loaded,
+                status="SUCCESS"
+            )
+
+            if checkpoint is not None:
+                # The watermark has moved past every saved delta
+                clear_checkpoints()
+
+        except Exception:
+            self.update_audit_log(
+                records_processed=extracted,
+                records_rejected=rejected,
+                records_loaded=0,
+                status="FAILED"
+            )
+            raise
+
+        finally:
+            self.ingest_ceiling = ingest_ceiling
+            self._close_reject_sink(raise_errors=False)
+            self._save_stage_metrics()
+            self._log_pool_stats()
+
+
+    # =========================
+    # STREAMING
+    # =========================
+    # Dimensions are extracted, validated and loaded once up front.
+    # Sales are then read through a server-side cursor in bounded
+    # chunks and each chunk runs validate -> transform -> load on its
+    # own, so peak memory follows chunk_size instead of the delta size.
+
+    def _sales_median_price(self, last_ingest) -> float:
+        """
+        Median raw unit_price of the whole delta, so every chunk
+        imputes the same value the batch path would.
+        """
+        query = f"""
+            SELECT percentile_cont(0.5) WITHIN GROUP (ORDER BY unit_price)
+            FROM sales_staging.sales_transactions_stage
+            WHERE {self._delta_filter(last_ingest)}
+        """
+        result = pd.read_sql(query, self.engine)
+        return result.iloc[0, 0]
+
+    def _iter_sales_chunks(self, last_ingest) -> Iterator[pd.DataFrame]:
+        query = f"""
+            SELECT *
+            FROM sales_staging.sales_transactions_stage
+            WHERE {self._delta_filter(last_ingest)}
+            ORDER BY ingest_date, transaction_id
+        """
+        with self.engine.connect() as conn:
+            conn = conn.execution_options(
+                stream_results=True,
+                max_row_buffer=self.chunk_size
+            )
+            yield from pd.read_sql(query, conn, chunksize=self.chunk_size)
+
+    def _prepare_dimensions(
+        self,
+        last_ingest,
+        validator: Optional[SQLValidator] = None
+    ) -> int:
+        """
+        Extract, validate, transform and load both dimensions.
+        With a validator the rows come back already validated in SQL.
+        Returns the number of staging rows extracted.
+        """
+        if validator is not None:
+            self.customers, self.products = validator.dimensions()
             extracted = (
-                len(self.customers)
-                + len(self.products)
-                + len(self.sales)
+                validator.extracted["customers"]
+                + validator.extracted["products"]
+            )
+            validation_steps = []
+        else:
+            self.customers = pd.read_sql(
+                f"SELECT * FROM sales_staging.customers_stage WHERE {self._delta_filter(last_ingest)}",
+                self.engine
             )
+            self.products = pd.read_sql(
+                f"SELECT * FROM sales_staging.products_stage WHERE {self._delta_filter(last_ingest)}",
+                self.engine
+            )
+            extracted = len(self.customers) + len(self.products)
+            validation_steps = self._dimension_steps()
 
-            self.validate()
-            rejected = sum(len(df) for df in self.rejected_records)
+        create_dw_tables(self.engine, partition_facts=self.partition_facts)
 
-            self.transform()
-            self.load()
-            loaded = len(self.sales)
+        self._run_dag("dimensions", validation_steps + [
+            self._task(
+                "transform.customers",
+                lambda df: transform_customers(
+                    enforce_customer_dtypes(df, compact=self.compact_dtypes)
+                ),
+                ["customers"], ["customers"]
+            ),
+            self._task(
+                "transform.products",
+                lambda df: transform_products(
+                    enforce_product_dtypes(df, compact=self.compact_dtypes)
+                ),
+                ["products"], ["products"]
+            ),
+        ] + self._load_dimension_steps(), max_workers=self._load_workers())
+
+        return extracted
+
+    def _process_sales_chunk(
+        self,
+        chunk: pd.DataFrame,
+        chunk_no: int,
+        median_price: float,
+        warehouse_ids: Tuple[np.ndarray, np.ndarray]
+    ) -> Tuple[int, int]:
+        """
+        Validate, transform and load one sales chunk.
+        warehouse_ids are the (customer, product) keys in sales_dw.
+
+        Returns:
+            (rejected_count, loaded_count)
+        """
+        chunk = normalize_empty_strings(chunk)
+        chunk = clean_numeric_fields(chunk, median_price=median_price)
+
+        chunk, rejected_dates = validate_transaction_dates(chunk)
+        chunk, rejected_corrupt = detect_corrupt_transactions(chunk)
+        chunk, rejected_orphans = detect_orphan_transactions(
+            chunk, self.customers, self.products, *warehouse_ids
+        )
+
+        rejected_count = (
+            self._reject(rejected_dates, "invalid_date")
+            + self._reject(rejected_corrupt, "corrupt_sales")
+            + self._reject(rejected_orphans, "orphan_sales")
+        )
+
+        return rejected_count, self._load_sales_chunk(chunk)
+
+    def _load_sales_chunk(self, chunk: pd.DataFrame) -> int:
+        """
+        Transform and load validated sales rows; returns the row count.
+        """
+        if chunk.empty:
+            return 0
+
+        chunk = transform_sales(
+            enforce_sales_dtypes(chunk, compact=self.compact_dtypes)
+        )
+
+        load_fact(self.engine, self._assign_date_ids(chunk))
+
+        return len(chunk)
+
+    def run_streaming(self) -> None:
+        extracted = rejected = loaded = 0
+        self.run_id = uuid.uuid4().hex
+        self.stage_metrics = []
+        self.rejected_count = 0
+        self.calendar_range = None
+
+        try:
+            logger.info(
+                "Starting streaming run (chunk_size=%d)", self.chunk_size
+            )
+            last_ingest = self._read_watermark()
+
+            with ExitStack() as stack:
+                # SQL backend: one validating transaction spans the run,
+                # its server-side cursor yields only clean sales
+                validator = None
+                if self.validation_backend == "sql":
+                    validator = stack.enter_context(self._validator(last_ingest))
+
+                with self._stage("stream.dimensions") as metrics:
+                    extracted = self._prepare_dimensions(last_ingest, validator)
+                    metrics["rows_out"] = extracted
+
+                if validator is None:
+                    median_price = self._sales_median_price(last_ingest)
+
+                    # Dimensions are loaded by now, so these include the batch
+                    warehouse_ids = self._warehouse_keys()
+
+                    chunks = self._iter_sales_chunks(last_ingest)
+                    process = partial(
+                        self._process_sales_chunk,
+                        median_price=median_price,
+                        warehouse_ids=warehouse_ids
+                    )
+                else:
+                    chunks = validator.iter_sales(self.chunk_size)
+                    process = lambda chunk, chunk_no: (
+                        0, self._load_sales_chunk(chunk)
+                    )
+
+                for chunk_no, chunk in enumerate(chunks, start=1):
+                    extracted += len(chunk)
+                    with self._stage("stream.sales_chunk", len(chunk)) as metrics:
+                        chunk_rejected, chunk_loaded = process(chunk, chunk_no)
+                        metrics["rows_out"] = chunk_loaded
+                    rejected += chunk_rejected
+                    loaded += chunk_loaded
+
+                    logger.info(
+                        "Chunk %d done | rows=%d rejected=%d loaded=%d",
+                        chunk_no, len(chunk), chunk_rejected, chunk_loaded
+                    )
+
+                if validator is not None:
+                    # Chunks held only the clean rows
+                    extracted += validator.sales_rejected_total
+                    rejected += validator.sales_rejected_total
+
+            # Rejects must be on disk before the run counts as done
+            self._close_reject_sink()
 
             self.update_audit_log(
                 records_processed=extracted,
@@ -270,3 +1018,8 @@ class SalesETLPipeline:
                 status="FAILED"
             )
             raise
+
+        finally:
+            self._close_reject_sink(raise_errors=False)
+            self._save_stage_metrics()
+            self._log_pool_stats()
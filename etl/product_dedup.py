@@ -1,20 +1,12 @@
 # etl/product_dedup.py
 
-import os
 import logging
-from datetime import datetime
 from typing import Tuple, Set
 
 import pandas as pd
 import numpy as np
 
 
-# =========================
-# CONFIG
-# =========================
-REJECT_DIR = "rejected_data/product_duplicates"
-os.makedirs(REJECT_DIR, exist_ok=True)
-
 logger = logging.getLogger(__name__)
 
 
@@ -50,6 +42,22 @@ def is_valid_product_name(name: str) -> bool:
     return True
 
 
+def valid_product_name_mask(names: pd.Series) -> pd.Series:
+    """
+    Vectorized is_valid_product_name over a Series.
+    """
+    clean = names.str.strip().str.lower()
+
+    is_text = clean.notna()
+    long_enough = (clean.str.len() >= 4).fillna(False)
+    is_token = clean.isin(INVALID_TOKENS)
+    is_numeric = clean.str.isnumeric().astype("boolean").fillna(False)
+
+    return (
+        is_text & long_enough & ~is_token & ~is_numeric
+    ).astype(bool)
+
+
 # =========================
 # PRODUCT DEDUPLICATION
 # =========================
@@ -65,98 +73,84 @@ def resolve_duplicate_products(
         1. Valid product_name
         2. Non-null category
         3. Non-null brand
+
+    Vectorized: one stable sort by the ranking keys and a
+    first-per-product_id pick, no per-group Python work.
     """
 
-    df = products_df.copy()
+    # Fresh positional index: rows are matched back by label below
+    df = products_df.reset_index(drop=True)
 
     # Normalize name
     df["product_name"] = df["product_name"].astype(str).str.strip()
 
     # Validate name
-    df["is_valid_name"] = df["product_name"].apply(is_valid_product_name)
+    df["is_valid_name"] = valid_product_name_mask(df["product_name"])
 
-    clean_rows = []
-    rejected_rows = []
+    # groupby() drops NULL keys, so they never reach either output
+    df = df[df["product_id"].notna()]
 
-    for product_id, group in df.groupby("product_id"):
-        valid_names = group[group["is_valid_name"]]
+    has_valid_name = (
+        df.groupby("product_id")["is_valid_name"].transform("any")
+    )
 
-        # Case 1: No valid names → reject entire group
-        if valid_names.empty:
-            rejected_rows.append(
-                group.assign(reject_reason="INVALID_PRODUCT_NAME")
-            )
-            logger.error(
-                "Rejected product_id %s: no valid product_name",
-                product_id
-            )
-            continue
-
-        # Case 2: Rank valid records
-        ranked = (
-            valid_names.assign(
-                valid_price=lambda x: x["unit_price"].fillna(0) > 0,
-                has_category=lambda x: x["category"].notna(),
-                has_brand=lambda x: x["brand"].notna()
-            )
-            .sort_values(
-                by=[
-                    "valid_price",
-                    "has_category",
-                    "has_brand",
-                    "unit_price"
-                ],
-                ascending=False
-            )
+    # Case 2: rank valid records once across all product_ids.
+    # The multi-key sort is stable, so ties keep staging order.
+    ranked = (
+        df[df["is_valid_name"]]
+        .assign(
+            valid_price=lambda x: x["unit_price"].fillna(0) > 0,
+            has_category=lambda x: x["category"].notna(),
+            has_brand=lambda x: x["brand"].notna()
         )
+        .sort_values(
+            by=[
+                "product_id",
+                "valid_price",
+                "has_category",
+                "has_brand",
+                "unit_price"
+            ],
+            ascending=[True, False, False, False, False]
+        )
+    )
 
-        keeper = ranked.iloc[[0]]
-        duplicates = group.drop(index=keeper.index)
-
-        clean_rows.append(keeper)
-
-        if not duplicates.empty:
-            rejected_rows.append(
-                duplicates.assign(reject_reason="DUPLICATE_PRODUCT_ID")
+    keepers = ranked.drop_duplicates(subset=["product_id"], keep="first")
+
+    # Case 1: no valid names -> whole group rejected,
+    # otherwise every non-keeper row is a duplicate
+    rejected = df[~df.index.isin(keepers.index)]
+    rejected = (
+        rejected
+        .assign(
+            reject_reason=np.where(
+                has_valid_name.loc[rejected.index],
+                "DUPLICATE_PRODUCT_ID",
+                "INVALID_PRODUCT_NAME"
             )
+        )
+        .sort_values("product_id", kind="stable")
+    )
 
-            logger.warning(
-                "Product deduplication applied for product_id %s: %d rows rejected",
-                product_id,
-                len(duplicates)
-            )
+    invalid = rejected["reject_reason"] == "INVALID_PRODUCT_NAME"
+    if invalid.any():
+        logger.error(
+            "Rejected %d product_ids with no valid product_name (%d rows)",
+            rejected.loc[invalid, "product_id"].nunique(),
+            invalid.sum()
+        )
+    if (~invalid).any():
+        logger.warning(
+            "Product deduplication applied: %d duplicate records rejected "
+            "across %d product_ids",
+            (~invalid).sum(),
+            rejected.loc[~invalid, "product_id"].nunique()
+        )
 
-    clean_df = pd.concat(clean_rows, ignore_index=True)
+    clean_df = keepers.reset_index(drop=True)
     rejected_df = (
-        pd.concat(rejected_rows, ignore_index=True)
-        if rejected_rows else pd.DataFrame()
+        rejected.reset_index(drop=True)
+        if not rejected.empty else pd.DataFrame()
     )
 
     return clean_df, rejected_df
-
-
-# =========================
-# SAVE REJECTED PRODUCTS
-# =========================
-def save_rejected_product_duplicates(
-    rejected_df: pd.DataFrame
-) -> None:
-    """
-    Save rejected product duplicate records to CSV.
-    """
-    if rejected_df.empty:
-        return
-
-    ts = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
-    path = os.path.join(
-        REJECT_DIR,
-        f"rejected_product_duplicates_{ts}.csv"
-    )
-
-    rejected_df.to_csv(path, index=False)
-
-    logger.error(
-        "Saved %d rejected product records to %s",
-        len(rejected_df),
-        path
-    )
@@ -0,0 +1,244 @@
+# etl/reject_sink.py
+"""
+Background writer for rejected records.
+
+Validation hands rejected frames to a RejectSink and carries on; a
+single writer thread turns them into zstd-compressed Parquet files,
+partitioned Hive-style so the whole store reads back with
+pd.read_parquet(REJECT_SINK_DIR):
+
+    rejected_data/parquet/reason=<reason>/run_date=<YYYY-MM-DD>/part-*.parquet
+
+Files are written under a dot-prefixed temporary name (which readers
+skip) and renamed into place. This run's small files in a partition
+are merged by compact(), which close() runs once the queue has drained.
+"""
+
+import os
+import glob
+import queue
+import logging
+import threading
+import itertools
+import uuid
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401  (parquet engine)
+except ImportError:  # optional: falls back to gzip CSV, no compaction
+    pyarrow = None
+
+
+# =========================
+# CONFIG
+# =========================
+REJECT_SINK_DIR = "rejected_data/parquet"
+REJECT_COMPRESSION = "zstd"
+
+# A partition is compacted once it holds this many files
+# smaller than COMPACT_SMALL_FILE_BYTES.
+COMPACT_MIN_FILES = 4
+COMPACT_SMALL_FILE_BYTES = 16 << 20
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class RejectSink:
+    """
+    Asynchronous, partitioned store for rejected rows.
+
+    submit() only enqueues the frame and returns its row count, so
+    callers keep counters instead of holding rejected frames. Write
+    errors are logged as they happen and raised by close().
+    """
+
+    def __init__(
+        self,
+        run_id: Optional[str] = None,
+        root: str = REJECT_SINK_DIR,
+        compression: str = REJECT_COMPRESSION
+    ) -> None:
+        self.run_id = run_id or uuid.uuid4().hex
+        self.root = root
+        self.compression = compression
+        self.run_date = datetime.utcnow().strftime("%Y-%m-%d")
+
+        self.counts: Dict[str, int] = {}
+        self.failed: List[Tuple[str, int]] = []
+
+        self._queue: "queue.Queue" = queue.Queue()
+        self._seq = itertools.count(1)
+        self._closed = False
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(
+            target=self._writer, name="reject-sink", daemon=True
+        )
+        self._thread.start()
+
+    # ---------- producer side ----------
+
+    def submit(self, df: Optional[pd.DataFrame], reason: str) -> int:
+        """
+        Queue rejected rows under reason. Returns the row count.
+        """
+        if df is None or df.empty:
+            return 0
+
+        if self._closed:
+            raise RuntimeError("RejectSink is closed")
+
+        with self._lock:
+            self.counts[reason] = self.counts.get(reason, 0) + len(df)
+        self._queue.put((reason, df))
+        return len(df)
+
+    def close(self, compact: bool = True) -> None:
+        """
+        Drain the queue, stop the writer and compact this run's
+        partitions. Safe to call more than once.
+        """
+        if self._closed:
+            return
+        self._closed = True
+
+        self._queue.put(_STOP)
+        self._thread.join()
+
+        if compact:
+            for reason in self.counts:
+                try:
+                    self.compact(self._partition_dir(reason))
+                except Exception:
+                    # The uncompacted files are complete; leave them
+                    logger.exception(
+                        "Failed to compact rejected rows (reason=%s)", reason
+                    )
+
+        if self.counts:
+            logger.info(
+                "Reject sink closed | run_id=%s %s",
+                self.run_id,
+                " ".join(f"{r}={n}" for r, n in sorted(self.counts.items()))
+            )
+
+        if self.failed:
+            raise RuntimeError(
+                f"Failed to write {sum(n for _, n in self.failed)} "
+                f"rejected rows: {self.failed}"
+            )
+
+    def __enter__(self) -> "RejectSink":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    # ---------- writer side ----------
+
+    def _partition_dir(self, reason: str) -> str:
+        return os.path.join(
+            self.root, f"reason={reason}", f"run_date={self.run_date}"
+        )
+
+    def _part_prefix(self) -> str:
+        return f"part-{self.run_id[:12]}-"
+
+    def _writer(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+
+            reason, df = item
+            try:
+                self._write(df, reason)
+            except Exception:
+                logger.exception(
+                    "Failed to write %d rejected rows (reason=%s)",
+                    len(df), reason
+                )
+                self.failed.append((reason, len(df)))
+
+    def _write(self, df: pd.DataFrame, reason: str) -> str:
+        part_dir = self._partition_dir(reason)
+        os.makedirs(part_dir, exist_ok=True)
+
+        stem = f"{self._part_prefix()}{next(self._seq):05d}"
+
+        if pyarrow is None:
+            path = os.path.join(part_dir, f"{stem}.csv.gz")
+            tmp = _tmp_path(path)
+            df.to_csv(tmp, index=False, compression="gzip")
+        else:
+            path = os.path.join(part_dir, f"{stem}.parquet")
+            tmp = _tmp_path(path)
+            _to_parquet(df, tmp, self.compression)
+        os.replace(tmp, path)
+
+        logger.debug("Wrote %d rejected rows to %s", len(df), path)
+        return path
+
+    # ---------- maintenance ----------
+
+    def compact(self, part_dir: str) -> Optional[str]:
+        """
+        Merge this run's small Parquet files in one partition into a
+        single file. Files of other runs are left alone. The merged file
+        is written before the inputs are removed.
+        """
+        if pyarrow is None:
+            return None
+
+        pattern = os.path.join(part_dir, f"{self._part_prefix()}*.parquet")
+        small = [
+            path for path in sorted(glob.glob(pattern))
+            if os.path.getsize(path) < COMPACT_SMALL_FILE_BYTES
+        ]
+        if len(small) < COMPACT_MIN_FILES:
+            return None
+
+        merged = pd.concat(
+            [pd.read_parquet(path) for path in small], ignore_index=True
+        )
+
+        out = os.path.join(part_dir, f"compacted-{uuid.uuid4().hex[:12]}.parquet")
+        tmp = _tmp_path(out)
+        _to_parquet(merged, tmp, self.compression)
+        os.replace(tmp, out)
+
+        for path in small:
+            os.remove(path)
+
+        logger.info(
+            "Compacted %d reject files (%d rows) into %s",
+            len(small), len(merged), out
+        )
+        return out
+
+
+def _tmp_path(path: str) -> str:
+    """
+    In-progress name for path; the leading dot hides it from
+    pd.read_parquet and from compact().
+    """
+    head, tail = os.path.split(path)
+    return os.path.join(head, f".{tail}.tmp")
+
+
+def _to_parquet(df: pd.DataFrame, path: str, compression: str) -> None:
+    """
+    Rejected rows are often raw text mixed with other types;
+    object columns pyarrow cannot infer are written as strings.
+    """
+    try:
+        df.to_parquet(path, index=False, compression=compression)
+    except (TypeError, ValueError):  # ArrowInvalid / ArrowTypeError
+        text_cols = df.select_dtypes(include="object").columns
+        df.astype({col: "string" for col in text_cols}).to_parquet(
+            path, index=False, compression=compression
+        )
@@ -1,16 +1,10 @@
 # etl/sales_rejects.py
 
-import os
 import logging
-from datetime import datetime
 from typing import Tuple
 import pandas as pd
 
-# =========================
-# CONFIG
-# =========================
-REJECT_DIR = "rejected_data/sales_corrupt"
-os.makedirs(REJECT_DIR, exist_ok=True)
+from etl.dtypes import split_rows
 
 logger = logging.getLogger(__name__)
 
@@ -36,8 +30,9 @@ def detect_corrupt_transactions(
         | (sales_df["unit_price"] <= 0)
     )
 
-    rejected_df = sales_df[corrupt_mask].reset_index(drop=True)
-    clean_df = sales_df[~corrupt_mask].reset_index(drop=True)
+    clean_df, rejected_df = split_rows(sales_df, corrupt_mask)
+    clean_df = clean_df.reset_index(drop=True)
+    rejected_df = rejected_df.reset_index(drop=True)
 
     if not rejected_df.empty:
         logger.error(
@@ -46,31 +41,3 @@ def detect_corrupt_transactions(
         )
 
     return clean_df, rejected_df
-
-
-# =========================
-# SAVE REJECTED SALES
-# =========================
-def save_rejected_sales_transactions(
-    rejected_df: pd.DataFrame
-) -> None:
-    """
-    Save rejected sales transactions to CSV.
-    """
-
-    if rejected_df.empty:
-        return
-
-    ts = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
-    path = os.path.join(
-        REJECT_DIR,
-        f"rejected_sales_transactions_{ts}.csv"
-    )
-
-    rejected_df.to_csv(path, index=False)
-
-    logger.error(
-        "Saved %d rejected sales transactions to %s",
-        len(rejected_df),
-        path
-    )
@@ -2,19 +2,23 @@ import pandas as pd
 from datetime import datetime
 import logging
 
+from etl.dtypes import fill_missing, map_text
+
 logger = logging.getLogger(__name__)
 
 
 def transform_customers(df: pd.DataFrame) -> pd.DataFrame:
-    df = df.copy()
+    """
+    Impute and normalize customer attributes, in place.
 
+    df is modified and returned; pass df.copy() to keep the original.
+    """
     # -------------------------
     # EMAIL
     # -------------------------
-    df["email"] = (
-        df["email"]
-        .fillna("unknown@example.com")
-        .str.lower()
+    df["email"] = map_text(
+        fill_missing(df["email"], "unknown@example.com"),
+        lambda s: s.str.lower()
     )
 
     # -------------------------
@@ -22,23 +26,24 @@ def transform_customers(df: pd.DataFrame) -> pd.DataFrame:
     # -------------------------
     if df["city"].notna().any():
         city_mode = df["city"].mode(dropna=True)[0]
-        df["city"] = df["city"].fillna(city_mode)
+        df["city"] = fill_missing(df["city"], city_mode)
 
     # -------------------------
     # STATE (mode + uppercase)
     # -------------------------
     if df["state"].notna().any():
         state_mode = df["state"].mode(dropna=True)[0]
-        df["state"] = (
-            df["state"]
-            .fillna(state_mode)
-            .str.upper()
+        df["state"] = map_text(
+            fill_missing(df["state"], state_mode),
+            lambda s: s.str.upper()
         )
 
     # -------------------------
     # SIGNUP DATE
     # -------------------------
     today = pd.Timestamp.utcnow().date()
+    if pd.api.types.is_datetime64_any_dtype(df["signup_date"]):
+        today = pd.Timestamp(today)
     df["signup_date"] = df["signup_date"].fillna(today)
 
     logger.info("Customer transformation completed")
@@ -1,12 +1,79 @@
 import pandas as pd
 
-def build_dim_date(dates: pd.Series) -> pd.DataFrame:
-    dim_date = pd.DataFrame({"date": dates.drop_duplicates()})
-    dim_date["date_id"] = dim_date["date"].dt.strftime("%Y%m%d").astype(int)
-    dim_date["day"] = dim_date["date"].dt.day
-    dim_date["month"] = dim_date["date"].dt.month
-    dim_date["quarter"] = dim_date["date"].dt.quarter
-    dim_date["year"] = dim_date["date"].dt.year
-    dim_date["weekday"] = dim_date["date"].dt.day_name()
-
-    return dim_date
+# =========================
+# CONFIG
+# =========================
+# Span dim_date is built for up front; ensure_calendar() extends it
+# when a batch falls outside.
+CALENDAR_START = "2015-01-01"
+CALENDAR_END = "2035-12-31"
+
+# First month of the fiscal year (1 = fiscal year is the calendar year).
+# Fiscal years are named after the calendar year they end in.
+FISCAL_YEAR_START_MONTH = 1
+
+
+def date_id_from_parts(year, month, day):
+    """
+    YYYYMMDD integer key from year / month / day columns.
+    """
+    return year * 10000 + month * 100 + day
+
+
+def date_id_from_dates(dates: pd.Series) -> pd.Series:
+    """
+    YYYYMMDD integer keys for a date column, without string formatting.
+    """
+    dates = pd.to_datetime(dates)
+    return date_id_from_parts(
+        dates.dt.year, dates.dt.month, dates.dt.day
+    ).astype("int64")
+
+
+def date_from_date_id(date_id: int) -> pd.Timestamp:
+    date_id = int(date_id)
+    return pd.Timestamp(
+        year=date_id // 10000,
+        month=date_id // 100 % 100,
+        day=date_id % 100
+    )
+
+
+def _calendar_attributes(
+    dates: pd.Series,
+    fiscal_year_start_month: int = FISCAL_YEAR_START_MONTH
+) -> pd.DataFrame:
+    year = dates.dt.year
+    month = dates.dt.month
+
+    fiscal_month = (month - fiscal_year_start_month) % 12 + 1
+    fiscal_year = year + (
+        (month >= fiscal_year_start_month) & (fiscal_year_start_month > 1)
+    ).astype(int)
+
+    return pd.DataFrame({
+        "date_id": date_id_from_parts(year, month, dates.dt.day),
+        "date": dates,
+        "day": dates.dt.day,
+        "month": month,
+        "quarter": dates.dt.quarter,
+        "year": year,
+        "weekday": dates.dt.day_name(),
+        "is_weekend": dates.dt.dayofweek >= 5,
+        "fiscal_year": fiscal_year,
+        "fiscal_quarter": (fiscal_month - 1) // 3 + 1,
+        "fiscal_month": fiscal_month,
+    })
+
+
+def build_calendar(
+    start=CALENDAR_START,
+    end=CALENDAR_END,
+    fiscal_year_start_month: int = FISCAL_YEAR_START_MONTH
+) -> pd.DataFrame:
+    """
+    One dim_date row per day from start to end (inclusive).
+    """
+    dates = pd.Series(pd.date_range(start, end, freq="D"))
+    return _calendar_attributes(dates, fiscal_year_start_month)
+
@@ -2,20 +2,24 @@
 
 import pandas as pd
 
+from etl.dtypes import fill_missing, map_text
+
 def transform_products(df: pd.DataFrame) -> pd.DataFrame:
-    df = df.copy()
+    """
+    Impute and normalize brand, category and name, in place.
 
+    Writes into the caller's frame; callers that still need the raw
+    products pass a copy.
+    """
     # ---------- BRAND ----------
     if df["brand"].notna().any():
         brand_mode = df["brand"].mode(dropna=True)[0]
     else:
         brand_mode = "unknown"
 
-    df["brand"] = (
-        df["brand"]
-        .fillna(brand_mode)
-        .str.strip()
-        .str.lower()
+    df["brand"] = map_text(
+        fill_missing(df["brand"], brand_mode),
+        lambda s: s.str.strip().str.lower()
     )
 
     # ---------- CATEGORY ----------
@@ -24,18 +28,15 @@ def transform_products(df: pd.DataFrame) -> pd.DataFrame:
     else:
         category_mode = "unknown"
 
-    df["category"] = (
-        df["category"]
-        .fillna(category_mode)
-        .str.strip()
-        .str.lower()
+    df["category"] = map_text(
+        fill_missing(df["category"], category_mode),
+        lambda s: s.str.strip().str.lower()
     )
 
     # ---------- PRODUCT NAME ----------
-    df["product_name"] = (
-        df["product_name"]
-        .str.strip()
-        .str.lower()
+    df["product_name"] = map_text(
+        df["product_name"],
+        lambda s: s.str.strip().str.lower()
     )
 
     return df
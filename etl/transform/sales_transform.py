@@ -1,13 +1,19 @@
 import pandas as pd
 import logging
 
+from etl.dates import parse_dates
+
 logger = logging.getLogger(__name__)
 
 def transform_sales(df: pd.DataFrame) -> pd.DataFrame:
-    df = df.copy()
+    """
+    Add sale amounts and order date parts to df, in place.
 
+    The new columns are written into the caller's frame, which is
+    also returned.
+    """
     # Ensure datetime.
-    df["transaction_date"] = pd.to_datetime(
+    df["transaction_date"] = parse_dates(
         df["transaction_date"],
         errors="raise"   # safe now because invalid dates are already rejected
     )
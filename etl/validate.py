@@ -10,12 +10,16 @@ Responsibilities:
 """
 
 import logging
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 
 import numpy as np
 import pandas as pd
 import os
 
+from etl.dates import parse_dates
+from etl.dtypes import compact_frame, split_rows, to_datetime64_date
+from etl.dw.key_cache import sorted_contains
+
 # =========================
 # LOGGING CONFIG
 # =========================
@@ -35,7 +39,13 @@ logger = logging.getLogger(__name__)
 
 # SALES DTYPES
 
-def enforce_sales_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+def enforce_sales_dtypes(df: pd.DataFrame, compact: bool = False) -> pd.DataFrame:
+    """
+    Enforce final sales dtypes.
+
+    compact=True keeps transaction_date as datetime64 and shrinks
+    ids / measures to the smallest lossless widths.
+    """
     try:
         df["transaction_id"] = df["transaction_id"].astype(int)
         df["customer_id"] = df["customer_id"].astype(int)
@@ -43,10 +53,19 @@ def enforce_sales_dtypes(df: pd.DataFrame) -> pd.DataFrame:
         df["quantity"] = df["quantity"].astype(int)
         df["unit_price"] = df["unit_price"].astype(float)
         df["discount"] = df["discount"].astype(float)
-        df["transaction_date"] = pd.to_datetime(
-            df["transaction_date"], errors="coerce"
-        ).dt.date
-        df["ingest_date"] = pd.to_datetime(df["ingest_date"])
+        if compact:
+            df["transaction_date"] = to_datetime64_date(df["transaction_date"])
+        else:
+            df["transaction_date"] = parse_dates(df["transaction_date"]).dt.date
+        df["ingest_date"] = parse_dates(df["ingest_date"], errors="raise")
+
+        if compact:
+            df, _ = compact_frame(
+                df,
+                "sales",
+                int_cols=["transaction_id", "customer_id", "product_id", "quantity"],
+                float_cols=["unit_price", "discount"]
+            )
     except Exception as exc:
         raise ValueError("Sales dtype enforcement failed") from exc
 
@@ -56,9 +75,12 @@ def enforce_sales_dtypes(df: pd.DataFrame) -> pd.DataFrame:
 
 # CUSTOMERS DTYPES
 
-def enforce_customer_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+def enforce_customer_dtypes(df: pd.DataFrame, compact: bool = False) -> pd.DataFrame:
     """
     Enforce final customer table dtypes.
+
+    compact=True stores city / state as categoricals, signup_date as
+    datetime64 and customer_id at the smallest integer width.
     """
     try:
         df["customer_id"] = df["customer_id"].astype(int)
@@ -68,11 +90,20 @@ def enforce_customer_dtypes(df: pd.DataFrame) -> pd.DataFrame:
         df["city"] = df["city"].astype("string")
         df["state"] = df["state"].astype("string")
 
-        df["signup_date"] = pd.to_datetime(
-            df["signup_date"], errors="coerce"
-        ).dt.date
+        if compact:
+            df["signup_date"] = to_datetime64_date(df["signup_date"])
+        else:
+            df["signup_date"] = parse_dates(df["signup_date"]).dt.date
+
+        df["ingest_date"] = parse_dates(df["ingest_date"], errors="raise")
 
-        df["ingest_date"] = pd.to_datetime(df["ingest_date"])
+        if compact:
+            df, _ = compact_frame(
+                df,
+                "customers",
+                category_cols=["city", "state"],
+                int_cols=["customer_id"]
+            )
 
     except Exception as exc:
         logger.error(
@@ -90,7 +121,13 @@ def enforce_customer_dtypes(df: pd.DataFrame) -> pd.DataFrame:
 
 # PRODUCTS DTYPES
 
-def enforce_product_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+def enforce_product_dtypes(df: pd.DataFrame, compact: bool = False) -> pd.DataFrame:
+    """
+    Enforce final product table dtypes.
+
+    compact=True stores category / brand as categoricals and shrinks
+    product_id / unit_price to the smallest lossless widths.
+    """
     try:
         df["product_id"] = df["product_id"].astype(int)
 
@@ -107,7 +144,16 @@ def enforce_product_dtypes(df: pd.DataFrame) -> pd.DataFrame:
             )
 
         df["unit_price"] = df["unit_price"].astype(float)
-        df["ingest_date"] = pd.to_datetime(df["ingest_date"])
+        df["ingest_date"] = parse_dates(df["ingest_date"], errors="raise")
+
+        if compact:
+            df, _ = compact_frame(
+                df,
+                "products",
+                category_cols=["category", "brand"],
+                int_cols=["product_id"],
+                float_cols=["unit_price"]
+            )
     except Exception as exc:
         raise ValueError("Product dtype enforcement failed") from exc
 
@@ -184,11 +230,64 @@ def validate_schema(
 
 
 # EMPTY STRING HANDLING
+
+# infer_dtype() results of object columns that hold at least one str
+# (the .str accessor turns the non-str values into NaN)
+_TEXT_INFERRED_TYPES = {"string", "mixed", "mixed-integer"}
+
+
+def _is_text_column(series: pd.Series) -> bool:
+    if isinstance(series.dtype, pd.StringDtype):
+        return True
+    # Object columns of dates, Decimals, ... have no .str accessor
+    return (
+        series.dtype == object
+        and pd.api.types.infer_dtype(series, skipna=True) in _TEXT_INFERRED_TYPES
+    )
+
+
+def normalize_empty_strings_with_counts(
+    df: pd.DataFrame
+) -> Tuple[pd.DataFrame, Dict[str, int]]:
+    """
+    Replace empty or whitespace-only strings with NA.
+
+    Only text columns are scanned, using vectorized strip + compare
+    (Arrow kernels on pyarrow-backed strings) instead of a regex over
+    every column. Returns the frame and how many values were nulled
+    per column.
+    """
+    replaced: Dict[str, pd.Series] = {}
+    counts: Dict[str, int] = {}
+
+    for col in df.columns:
+        series = df[col]
+        if not _is_text_column(series):
+            continue
+
+        # Non-string objects strip to NaN and never match
+        blank = series.str.strip().eq("").fillna(False)
+        nulled = int(blank.sum())
+        if nulled:
+            replaced[col] = series.mask(blank, pd.NA)
+            counts[col] = nulled
+
+    if replaced:
+        df = df.assign(**replaced)
+
+    return df, counts
+
+
 def normalize_empty_strings(df: pd.DataFrame) -> pd.DataFrame:
     """
     Replace empty or whitespace-only strings with NaN.
     """
-    return df.replace(r"^\s*$", pd.NA, regex=True)
+    df, counts = normalize_empty_strings_with_counts(df)
+
+    if counts:
+        logger.info("Nulled empty strings per column: %s", counts)
+
+    return df
 
 
 def impute_transaction_dates(
@@ -203,10 +302,8 @@ def impute_transaction_dates(
     """
 
     # Ensure datetime
-    sales_df[date_col] = pd.to_datetime(sales_df[date_col], errors="coerce")
-    customers_df["signup_date"] = pd.to_datetime(
-        customers_df["signup_date"], errors="coerce"
-    )
+    sales_df[date_col] = parse_dates(sales_df[date_col])
+    customers_df["signup_date"] = parse_dates(customers_df["signup_date"])
 
     # FIX: make customer_id unique using earliest signup_date
     signup_map = (
@@ -244,7 +341,7 @@ def enforce_column_types(
     for col, dtype in type_map.items():
         try:
             if dtype == "datetime":
-                df[col] = pd.to_datetime(df[col], errors="coerce")
+                df[col] = parse_dates(df[col])
             else:
                 df[col] = df[col].astype(dtype)
         except Exception as exc:
@@ -264,11 +361,18 @@ def enforce_column_types(
 def clean_numeric_fields(
     df: pd.DataFrame,
     quantity_col: str = "quantity",
-    price_col: str = "unit_price"
+    price_col: str = "unit_price",
+    median_price: Optional[float] = None
 ) -> pd.DataFrame:
     """
     Apply deterministic numeric corrections.
+
+    median_price lets chunked callers pass the median of the whole
+    batch so every chunk imputes the same value.
     """
+    if median_price is None:
+        median_price = np.nanmedian(df[price_col])
+
     # Quantity
     df[quantity_col] = (
         df[quantity_col]
@@ -282,7 +386,7 @@ def clean_numeric_fields(
         df[price_col]
         .abs()
         .replace(0, np.nan)
-        .fillna(np.nanmedian(df[price_col]))
+        .fillna(median_price)
     )
 
     return df
@@ -326,11 +430,9 @@ def validate_transaction_dates(
     Returns:
         clean_df, rejected_df
     """
-    df[date_col] = pd.to_datetime(df[date_col], errors="coerce")
+    df[date_col] = parse_dates(df[date_col])
 
-    invalid_mask = df[date_col].isna()
-    rejected = df[invalid_mask]
-    clean = df[~invalid_mask]
+    clean, rejected = split_rows(df, df[date_col].isna())
 
     if not rejected.empty:
         logger.error(
@@ -371,13 +473,9 @@ def detect_corrupt_transactions(
         "transaction_id"
     ]
 
-    rejected = sales_df[
-        sales_df["transaction_id"].isin(corrupt_txn_ids)
-    ]
-
-    clean = sales_df[
-        ~sales_df["transaction_id"].isin(corrupt_txn_ids)
-    ]
+    clean, rejected = split_rows(
+        sales_df, sales_df["transaction_id"].isin(corrupt_txn_ids)
+    )
 
     if not rejected.empty:
         logger.error(
@@ -394,21 +492,66 @@ def detect_corrupt_transactions(
 
 # ORPHAN DETECTION
 
+def _integer_keys(values: pd.Series) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    int64 view of an id column plus a mask of rows holding a usable
+    integer id (NULL / non-numeric ids can never match a key).
+    """
+    numeric = pd.to_numeric(values, errors="coerce").astype("float64")
+    valid = numeric.notna() & (numeric % 1 == 0)
+    keys = numeric.where(valid, 0).to_numpy(dtype=np.int64)
+    return keys, valid.to_numpy()
+
+
+def _known_key_mask(
+    ids: pd.Series,
+    batch_ids: pd.Series,
+    warehouse_ids: Optional[np.ndarray]
+) -> np.ndarray:
+    """
+    True where an id exists in the current batch or in the warehouse.
+    Both key sets are sorted, so each row is a binary search.
+    """
+    keys, valid = _integer_keys(ids)
+
+    batch_keys, batch_valid = _integer_keys(batch_ids)
+    known = sorted_contains(np.unique(batch_keys[batch_valid]), keys)
+
+    if warehouse_ids is not None:
+        known |= sorted_contains(warehouse_ids, keys)
+
+    return known & valid
+
+
 def detect_orphan_transactions(
     sales_df: pd.DataFrame,
     customers_df: pd.DataFrame,
-    products_df: pd.DataFrame
+    products_df: pd.DataFrame,
+    warehouse_customer_ids: Optional[np.ndarray] = None,
+    warehouse_product_ids: Optional[np.ndarray] = None
 ) -> Tuple[pd.DataFrame, pd.DataFrame]:
     """
     Detect orphan sales transactions.
+
+    A sale is kept when its customer and product exist in this batch
+    or, if the sorted warehouse key arrays are given (see
+    etl.dw.key_cache.warehouse_keys), already in sales_dw, so late
+    sales for previously loaded customers are not rejected.
     """
-    orphan_mask = (
-        ~sales_df["customer_id"].isin(customers_df["customer_id"]) |
-        ~sales_df["product_id"].isin(products_df["product_id"])
+    orphan_mask = ~(
+        _known_key_mask(
+            sales_df["customer_id"],
+            customers_df["customer_id"],
+            warehouse_customer_ids
+        )
+        & _known_key_mask(
+            sales_df["product_id"],
+            products_df["product_id"],
+            warehouse_product_ids
+        )
     )
 
-    rejected = sales_df[orphan_mask]
-    clean = sales_df[~orphan_mask]
+    clean, rejected = split_rows(sales_df, orphan_mask)
 
     if not rejected.empty:
         logger.error(
@@ -0,0 +1,518 @@
+# etl/validate_sql.py
+"""
+SQL pushdown validation (PostgreSQL).
+
+Runs the pandas validation rules as set-based SQL inside the staging
+database, so rejected rows never leave the server:
+
+- blank / whitespace-only text -> NULL          (normalize_empty_strings)
+- customer dedup, latest signup_date wins       (resolve_duplicate_customers)
+- product price cleaning + ranked dedup         (clean_product_numeric_fields,
+                                                 resolve_duplicate_products)
+- sales quantity / price cleaning               (clean_numeric_fields)
+- invalid dates, corrupt sales, orphans         (validate_transaction_dates,
+                                                 detect_corrupt_transactions,
+                                                 detect_orphan_transactions)
+
+Rejects are copied, as raw staging rows, into sales_staging.quarantine_*
+tables tagged with the reason and run_id. Only clean rows are read back,
+shaped like the frames the pandas path hands to enforce_*_dtypes, so the
+warehouse ends up identical whichever backend ran.
+
+Dates are not parsed by PostgreSQL: the distinct raw values are parsed
+with etl.dates.parse_dates and joined back through a temp lookup table,
+so both backends accept exactly the same formats.
+"""
+
+import logging
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import pandas as pd
+from sqlalchemy import inspect, text
+from sqlalchemy.types import String
+
+from db.bulk_copy import copy_dataframe
+from etl.dates import parse_dates
+from etl.product_dedup import INVALID_TOKENS
+
+logger = logging.getLogger(__name__)
+
+# =========================
+# CONFIG
+# =========================
+# "pandas" validates extracted frames in Python, "sql" pushes the
+# rules down into the staging database (PostgreSQL only)
+VALIDATION_BACKENDS = ("pandas", "sql")
+VALIDATION_BACKEND = "pandas"
+
+STAGING_SCHEMA = "sales_staging"
+STAGING_TABLES = {
+    "customers": "customers_stage",
+    "products": "products_stage",
+    "sales": "sales_transactions_stage",
+}
+QUARANTINE_TABLES = {
+    "customers": "quarantine_customers",
+    "products": "quarantine_products",
+    "sales": "quarantine_sales",
+}
+
+# Sales reject reasons, in the order the pandas path applies them
+SALES_REJECT_REASONS = ("invalid_date", "corrupt_sales", "orphan_sales")
+
+_DATE_LOOKUP = "v_dates"
+
+
+def _blank_to_null(expr: str) -> str:
+    return f"CASE WHEN {expr} ~ '^\\s*$' THEN NULL ELSE {expr} END"
+
+
+def _median(expr: str, source: str) -> str:
+    """
+    np.nanmedian as SQL: mean of the middle value(s), NULLs ignored.
+    Averaging the two middle values (rather than percentile_cont's
+    interpolation) rounds exactly like numpy.
+    """
+    return f"""
+        SELECT AVG(x) FROM (
+            SELECT
+                x,
+                ROW_NUMBER() OVER (ORDER BY x) AS rn,
+                COUNT(*) OVER () AS n
+            FROM (SELECT {expr} AS x FROM {source}) v
+            WHERE x IS NOT NULL
+        ) ranked
+        WHERE rn IN ((n + 1) / 2, (n + 2) / 2)
+    """
+
+
+class SQLValidator:
+    """
+    Validate the staging delta (ingest_date > watermark, and
+    <= ceiling when one is given) in SQL.
+
+    Use as a context manager: all work happens in one transaction on
+    one connection, temp tables are dropped at commit and the
+    quarantine inserts commit with it.
+
+        with SQLValidator(engine, last_ingest, run_id) as validator:
+            customers, products = validator.dimensions()
+            sales = validator.sales()
+    """
+
+    def __init__(self, engine, watermark, run_id: str, ceiling=None) -> None:
+        self.engine = engine
+        self.params = {
+            "watermark": watermark,
+            "run_id": run_id,
+            "ceiling": ceiling,
+        }
+        self.conn = None
+        self._tx = None
+        self._column_cache: Dict[str, List[Tuple[str, bool]]] = {}
+
+        # Raw staging rows per table and sales rejects per reason
+        self.extracted: Dict[str, int] = {}
+        self.sales_rejected: Dict[str, int] = {}
+
+    def __enter__(self) -> "SQLValidator":
+        self.conn = self.engine.connect()
+        self._tx = self.conn.begin()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        try:
+            if exc_type is None:
+                self._tx.commit()
+            else:
+                self._tx.rollback()
+        finally:
+            self.conn.close()
+
+    # -----------------------------
+    # Helpers
+    # -----------------------------
+    def _execute(self, sql: str):
+        return self.conn.execute(text(sql), self.params)
+
+    def _columns(self, name: str) -> List[Tuple[str, bool]]:
+        """
+        (column, is_text) for a staging table, in table order.
+        """
+        if name not in self._column_cache:
+            self._column_cache[name] = [
+                (col["name"], isinstance(col["type"], String))
+                for col in inspect(self.conn).get_columns(
+                    STAGING_TABLES[name], schema=STAGING_SCHEMA
+                )
+            ]
+        return self._column_cache[name]
+
+    def _staging(self, name: str) -> str:
+        return f"{STAGING_SCHEMA}.{STAGING_TABLES[name]}"
+
+    def _delta(self, alias: str) -> str:
+        """
+        Condition selecting the delta rows of staging alias.
+        """
+        condition = f"{alias}.ingest_date > :watermark"
+        if self.params["ceiling"] is not None:
+            condition += f" AND {alias}.ingest_date <= :ceiling"
+        return condition
+
+    def _normalized(self, name: str, alias: str = "s") -> Dict[str, str]:
+        """
+        Column -> SQL expression with blank text turned into NULL.
+        """
+        return {
+            col: _blank_to_null(f"{alias}.{col}") if is_text else f"{alias}.{col}"
+            for col, is_text in self._columns(name)
+        }
+
+    def _date_expr(self, name: str, column: str, alias: str = "s") -> Tuple[str, str]:
+        """
+        (join clause, parsed expression) for a raw date column.
+        Text columns go through the parse_dates lookup table.
+        """
+        if not dict(self._columns(name))[column]:
+            return "", f"{alias}.{column}"
+
+        lookup = f"d_{column}"
+        return (
+            f"LEFT JOIN {_DATE_LOOKUP} {lookup} ON {lookup}.raw = {alias}.{column}",
+            f"{lookup}.parsed"
+        )
+
+    def _build_date_lookup(self) -> None:
+        """
+        Parse each distinct raw date value once, in Python.
+        """
+        sources = [
+            (name, column)
+            for name, column in (("customers", "signup_date"), ("sales", "transaction_date"))
+            if dict(self._columns(name))[column]
+        ]
+
+        self._execute(f"""
+            CREATE TEMP TABLE {_DATE_LOOKUP} (
+                raw TEXT PRIMARY KEY,
+                parsed TIMESTAMP
+            ) ON COMMIT DROP
+        """)
+        if not sources:
+            return
+
+        raw = pd.read_sql(
+            text(" UNION ".join(
+                f"SELECT DISTINCT {column} AS raw FROM {self._staging(name)} s "
+                f"WHERE {self._delta('s')} AND s.{column} IS NOT NULL"
+                for name, column in sources
+            )),
+            self.conn,
+            params=self.params
+        )["raw"]
+
+        lookup = pd.DataFrame({"raw": raw, "parsed": parse_dates(raw)})
+        copy_dataframe(self.conn, lookup, _DATE_LOOKUP)
+        self._execute(f"ANALYZE {_DATE_LOOKUP}")
+
+    def _quarantine(self, name: str, source: str, where: str, reason: str) -> None:
+        """
+        Copy the raw staging columns of rejected rows to the
+        quarantine table, tagged with reason and run_id.
+        """
+        table = f"{STAGING_SCHEMA}.{QUARANTINE_TABLES[name]}"
+        self._execute(f"""
+            CREATE TABLE IF NOT EXISTS {table}
+            (LIKE {self._staging(name)})
+        """)
+        self._execute(f"""
+            ALTER TABLE {table}
+                ADD COLUMN IF NOT EXISTS reject_reason TEXT,
+                ADD COLUMN IF NOT EXISTS run_id TEXT,
+                ADD COLUMN IF NOT EXISTS quarantined_at TIMESTAMP DEFAULT NOW()
+        """)
+
+        columns = ", ".join(col for col, _ in self._columns(name))
+        self._execute(f"""
+            INSERT INTO {table} ({columns}, reject_reason, run_id)
+            SELECT {columns}, {reason}, :run_id
+            FROM {source}
+            WHERE {where}
+        """)
+
+    def _count(self, name: str) -> None:
+        self.extracted[name] = self._execute(
+            f"SELECT COUNT(*) FROM v_{name}"
+        ).scalar()
+
+    def _read(self, sql: str, chunksize: Optional[int] = None):
+        conn = self.conn
+        if chunksize:
+            conn = conn.execution_options(
+                stream_results=True, max_row_buffer=chunksize
+            )
+        return pd.read_sql(text(sql), conn, params=self.params, chunksize=chunksize)
+
+    # -----------------------------
+    # Dimensions
+    # -----------------------------
+    def _validate_customers(self) -> pd.DataFrame:
+        cols = self._normalized("customers")
+        join, signup = self._date_expr("customers", "signup_date")
+
+        # Latest signup_date wins (NULLs last); ties keep staging order
+        self._execute(f"""
+            CREATE TEMP TABLE v_customers ON COMMIT DROP AS
+            SELECT
+                s.*,
+                {signup} AS v_signup_date,
+                ROW_NUMBER() OVER (
+                    PARTITION BY s.customer_id
+                    ORDER BY {signup} DESC NULLS LAST, s.ctid
+                ) AS v_rank
+            FROM {self._staging("customers")} s
+            {join}
+            WHERE {self._delta("s")}
+        """)
+        self._count("customers")
+
+        self._quarantine(
+            "customers", "v_customers", "v_rank > 1", "'customer_duplicate'"
+        )
+
+        cols["signup_date"] = "s.v_signup_date"
+        return self._read(f"""
+            SELECT {", ".join(f"{expr} AS {col}" for col, expr in cols.items())}
+            FROM v_customers s
+            WHERE s.v_rank = 1
+            ORDER BY s.customer_id
+        """)
+
+    def _validate_products(self) -> pd.DataFrame:
+        cols = self._normalized("products", alias="st")
+        tokens = ", ".join(f"'{token}'" for token in sorted(INVALID_TOKENS))
+
+        self._execute(f"""
+            CREATE TEMP TABLE v_products ON COMMIT DROP AS
+            WITH s AS (
+                SELECT
+                    st.*,
+                    st.ctid AS v_stage_row,
+                    NULLIF(ABS(st.unit_price), 0) AS v_price,
+                    {cols["category"]} AS v_category,
+                    {cols["brand"]} AS v_brand,
+                    regexp_replace(
+                        {cols["product_name"]}, '^\\s+|\\s+$', '', 'g'
+                    ) AS v_product_name
+                FROM {self._staging("products")} st
+                WHERE {self._delta("st")}
+            ),
+            priced AS (
+                SELECT
+                    s.*,
+                    COALESCE(s.v_price, ({_median("v_price", "s")})) AS v_unit_price,
+                    (
+                        s.v_product_name IS NOT NULL
+                        AND char_length(s.v_product_name) >= 4
+                        AND lower(s.v_product_name) NOT IN ({tokens})
+                        AND lower(s.v_product_name) !~ '^[0-9]+$'
+                    ) AS is_valid_name
+                FROM s
+            ),
+            flagged AS (
+                SELECT
+                    p.*,
+                    COALESCE(p.v_unit_price, 0) > 0 AS valid_price,
+                    p.v_category IS NOT NULL AS has_category,
+                    p.v_brand IS NOT NULL AS has_brand
+                FROM priced p
+            )
+            SELECT
+                f.*,
+                bool_or(f.is_valid_name) OVER (
+                    PARTITION BY f.product_id
+                ) AS v_group_valid,
+                CASE WHEN f.is_valid_name THEN ROW_NUMBER() OVER (
+                    PARTITION BY f.product_id, f.is_valid_name
+                    ORDER BY
+                        f.valid_price DESC,
+                        f.has_category DESC,
+                        f.has_brand DESC,
+                        f.v_unit_price DESC NULLS LAST,
+                        f.v_stage_row
+                ) END AS v_rank
+            FROM flagged f
+        """)
+        self._count("products")
+
+        # Rows without a product_id are dropped, as in pandas. Reasons
+        # match resolve_duplicate_products: a group with no valid name
+        # is rejected whole, otherwise its non-keepers are duplicates.
+        rejected = "product_id IS NOT NULL AND v_rank IS DISTINCT FROM 1"
+        self._quarantine(
+            "products", "v_products", rejected,
+            "CASE WHEN v_group_valid THEN 'DUPLICATE_PRODUCT_ID' "
+            "ELSE 'INVALID_PRODUCT_NAME' END"
+        )
+
+        invalid_ids, invalid_rows, duplicate_ids, duplicate_rows = self._execute(f"""
+            SELECT
+                COUNT(DISTINCT product_id) FILTER (WHERE NOT v_group_valid),
+                COUNT(*) FILTER (WHERE NOT v_group_valid),
+                COUNT(DISTINCT product_id) FILTER (WHERE v_group_valid),
+                COUNT(*) FILTER (WHERE v_group_valid)
+            FROM v_products
+            WHERE {rejected}
+        """).one()
+        if invalid_rows:
+            logger.error(
+                "Rejected %d product_ids with no valid product_name (%d rows)",
+                invalid_ids, invalid_rows
+            )
+        if duplicate_rows:
+            logger.warning(
+                "Product deduplication applied: %d duplicate records rejected "
+                "across %d product_ids",
+                duplicate_rows, duplicate_ids
+            )
+
+        out = self._normalized("products")
+        out.update({
+            "product_name": "s.v_product_name",
+            "unit_price": "s.v_unit_price",
+        })
+        return self._read(f"""
+            SELECT
+                {", ".join(f"{expr} AS {col}" for col, expr in out.items())},
+                s.is_valid_name,
+                s.valid_price,
+                s.has_category,
+                s.has_brand
+            FROM v_products s
+            WHERE s.product_id IS NOT NULL AND s.v_rank = 1
+            ORDER BY s.product_id
+        """)
+
+    def dimensions(self) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """
+        Clean (customers, products); duplicates are quarantined.
+        """
+        self._build_date_lookup()
+        customers = self._validate_customers()
+        products = self._validate_products()
+
+        logger.info(
+            "SQL validation: %d / %d customers and %d / %d products kept",
+            len(customers), self.extracted["customers"],
+            len(products), self.extracted["products"]
+        )
+        return customers, products
+
+    # -----------------------------
+    # Sales
+    # -----------------------------
+    def _known(self, column: str, batch: str, dimension: str) -> str:
+        """
+        The id exists in the clean batch or already in sales_dw.
+        """
+        known = (
+            f"EXISTS (SELECT 1 FROM {batch} b "
+            f"WHERE b.v_rank = 1 AND b.{column} = s.{column})"
+        )
+        if inspect(self.conn).has_table(dimension, schema="sales_dw"):
+            known += (
+                f" OR EXISTS (SELECT 1 FROM sales_dw.{dimension} w "
+                f"WHERE w.{column} = s.{column})"
+            )
+        return f"({known})"
+
+    def _classify_sales(self) -> None:
+        join, parsed = self._date_expr("sales", "transaction_date", alias="st")
+
+        self._execute(f"""
+            CREATE TEMP TABLE v_sales ON COMMIT DROP AS
+            WITH raw AS (
+                SELECT
+                    st.*,
+                    st.ctid AS v_stage_row,
+                    {parsed} AS v_transaction_date,
+                    TRUNC(ABS(COALESCE(st.quantity, 0))) AS v_quantity,
+                    COALESCE(
+                        NULLIF(ABS(st.unit_price), 0),
+                        ({_median("unit_price", f"{self._staging('sales')} m WHERE {self._delta('m')}")})
+                    ) AS v_unit_price
+                FROM {self._staging("sales")} st
+                {join}
+                WHERE {self._delta("st")}
+            )
+            SELECT
+                s.*,
+                CASE
+                    WHEN s.v_transaction_date IS NULL THEN 'invalid_date'
+                    WHEN s.v_quantity <= 0 OR s.v_unit_price <= 0
+                        THEN 'corrupt_sales'
+                    WHEN NOT (
+                        {self._known("customer_id", "v_customers", "dim_customer")}
+                        AND {self._known("product_id", "v_products", "dim_product")}
+                    ) THEN 'orphan_sales'
+                END AS v_reject_reason
+            FROM raw s
+        """)
+        self._count("sales")
+
+        self.sales_rejected = {reason: 0 for reason in SALES_REJECT_REASONS}
+        self.sales_rejected.update(
+            self._execute("""
+                SELECT v_reject_reason, COUNT(*)
+                FROM v_sales
+                WHERE v_reject_reason IS NOT NULL
+                GROUP BY v_reject_reason
+            """).all()
+        )
+        self._quarantine(
+            "sales", "v_sales", "v_reject_reason IS NOT NULL", "v_reject_reason"
+        )
+
+        for reason, count in self.sales_rejected.items():
+            if count:
+                logger.error("SQL validation rejected %d rows: %s", count, reason)
+
+    def _clean_sales_sql(self, order_by: str = "s.v_stage_row") -> str:
+        cols = self._normalized("sales")
+        cols.update({
+            "transaction_date": "s.v_transaction_date",
+            "quantity": "s.v_quantity",
+            "unit_price": "s.v_unit_price",
+        })
+        return f"""
+            SELECT {", ".join(f"{expr} AS {col}" for col, expr in cols.items())}
+            FROM v_sales s
+            WHERE s.v_reject_reason IS NULL
+            ORDER BY {order_by}
+        """
+
+    def sales(self) -> pd.DataFrame:
+        """
+        Clean sales; call after dimensions().
+        """
+        self._classify_sales()
+        return self._read(self._clean_sales_sql())
+
+    def iter_sales(self, chunksize: int) -> Iterator[pd.DataFrame]:
+        """
+        Clean sales through a server-side cursor, chunksize rows at a
+        time, in the order the pandas streaming path reads staging;
+        call after dimensions().
+        """
+        self._classify_sales()
+        yield from self._read(
+            self._clean_sales_sql(
+                "s.ingest_date, s.transaction_id, s.v_stage_row"
+            ),
+            chunksize=chunksize
+        )
+
+    @property
+    def sales_rejected_total(self) -> int:
+        return sum(self.sales_rejected.values())
@@ -1,14 +1,27 @@
 import os
 import logging
+import queue
 import shutil
+import itertools
+import threading
+import time
+from contextlib import nullcontext
 from datetime import datetime
-from typing import Optional
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
 
 import pandas as pd
 from watchdog.events import FileSystemEventHandler
 from sqlalchemy.engine import Engine
 
 from db.database import get_engine
+from db.bulk_copy import copy_dataframe
+
+try:
+    import pyarrow as pa
+    from pyarrow import csv as pa_csv
+except ImportError:  # optional: falls back to chunked pd.read_csv
+    pa = None
+    pa_csv = None
 
 
 
@@ -21,6 +34,51 @@ STAGING_SCHEMA = "sales_staging"
 LOG_DIR = "logs"
 LOG_FILE = os.path.join(LOG_DIR, "ingestion.log")
 
+# Worker pool size and max files waiting for a worker.
+# Keep INGEST_WORKERS within the engine's connection pool.
+INGEST_WORKERS = 4
+INGEST_QUEUE_SIZE = 64
+
+# Lower runs first: dimensions before transactions
+FILE_PRIORITY = {
+    "customers_stage": 0,
+    "products_stage": 0,
+    "sales_transactions_stage": 1,
+}
+UNKNOWN_FILE_PRIORITY = 2
+_STOP_PRIORITY = 99
+
+# Micro-batching of small files. Files up to COALESCE_MAX_FILE_BYTES
+# are parsed on arrival and buffered per staging table; a buffer is
+# written in one transaction (and its files moved together) once it
+# holds COALESCE_MAX_ROWS rows or COALESCE_MAX_BYTES of CSV, or its
+# oldest file has waited COALESCE_WINDOW_SECONDS. 0 disables batching.
+COALESCE_WINDOW_SECONDS = 2.0
+COALESCE_MAX_ROWS = 200_000
+COALESCE_MAX_BYTES = 32 << 20
+COALESCE_MAX_FILE_BYTES = 4 << 20
+
+# Streaming parse: bytes per pyarrow block / rows per pandas chunk
+CSV_BLOCK_SIZE = 64 << 20
+CSV_CHUNK_ROWS = 500_000
+
+# Pinned so every block parses to the same types as the first one.
+# Dates stay text (staging is raw); measures are always float.
+CSV_COLUMN_TYPES = {
+    "signup_date": "string",
+    "transaction_date": "string",
+    "quantity": "float64",
+    "unit_price": "float64",
+    "discount": "float64",
+}
+
+# pd.read_csv's default NA markers, so both parsers agree on nulls
+CSV_NULL_VALUES = [
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan",
+    "1.#IND", "1.#QNAN", "<NA>", "N/A", "NA", "NULL", "NaN", "None",
+    "n/a", "nan", "null",
+]
+
 os.makedirs(LOG_DIR, exist_ok=True)
 os.makedirs(PROCESSED_DIR, exist_ok=True)
 
@@ -41,6 +99,42 @@ logger = logging.getLogger(__name__)
 
 
 
+# MICRO-BATCH BUFFER
+
+class _TableBatch:
+    """
+    Parsed small files waiting to be written to one staging table.
+    """
+
+    def __init__(self) -> None:
+        self.opened_at = time.monotonic()
+        self.files: List[str] = []
+        self.frames: List[pd.DataFrame] = []
+        self.rows = 0
+        self.bytes = 0
+        self.dimension_files = 0
+
+    def add(
+        self,
+        file_path: str,
+        frames: List[pd.DataFrame],
+        size: int,
+        is_dimension: bool
+    ) -> None:
+        self.files.append(file_path)
+        self.frames.extend(frames)
+        self.rows += sum(len(df) for df in frames)
+        self.bytes += size
+        self.dimension_files += int(is_dimension)
+
+    def is_full(self) -> bool:
+        return self.rows >= COALESCE_MAX_ROWS or self.bytes >= COALESCE_MAX_BYTES
+
+    def age(self) -> float:
+        return time.monotonic() - self.opened_at
+
+
+
 # WATCHDOG HANDLER
 
 class RawDataHandler(FileSystemEventHandler):
@@ -48,10 +142,68 @@ class RawDataHandler(FileSystemEventHandler):
     Watches raw_data directory and ingests new CSV files
     into PostgreSQL sales_staging schema.
     After successful ingestion, moves files to processed_files.
+
+    Files are handed to a pool of worker threads through a bounded
+    priority queue. The observer thread blocks when the queue is full,
+    which gives backpressure. Customer and product files are taken
+    first, and a transactions file waits for any dimension file that
+    is still being ingested. Each worker writes on its own pooled
+    connection.
+
+    Small files are micro-batched (see COALESCE_*): workers parse them
+    into a per-table buffer, and each full or expired buffer becomes
+    one bulk write and one commit.
+
+    For continuous ETL (etl/continuous.py) every staging write runs
+    inside staging_gate.write(), and on_commit(table, rows) is called
+    after each successful commit.
     """
 
-    def __init__(self, engine: Engine):
+    def __init__(
+        self,
+        engine: Engine,
+        workers: int = INGEST_WORKERS,
+        queue_size: int = INGEST_QUEUE_SIZE,
+        coalesce_window: float = COALESCE_WINDOW_SECONDS,
+        staging_gate=None,
+        on_commit: Optional[Callable[[str, int], None]] = None
+    ):
         self.engine = engine
+        self.coalesce_window = coalesce_window
+        self.staging_gate = staging_gate
+        self.on_commit = on_commit
+
+        self._batches: Dict[str, _TableBatch] = {}
+        self._batches_lock = threading.Lock()
+        self._stop_flusher = threading.Event()
+
+        self._queue: "queue.PriorityQueue" = queue.PriorityQueue(
+            maxsize=queue_size
+        )
+        self._sequence = itertools.count()
+
+        self._dimensions_in_flight = 0
+        self._dimensions_done = threading.Condition()
+
+        self._workers = [
+            threading.Thread(
+                target=self._worker,
+                name=f"ingest-worker-{i}",
+                daemon=True
+            )
+            for i in range(workers)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+        self._flusher = None
+        if coalesce_window > 0:
+            self._flusher = threading.Thread(
+                target=self._flush_expired,
+                name="ingest-flusher",
+                daemon=True
+            )
+            self._flusher.start()
 
     def on_created(self, event) -> None:
         """
@@ -62,37 +214,258 @@ class RawDataHandler(FileSystemEventHandler):
 
         if event.src_path.endswith(".csv"):
             logger.info(f"New file detected: {event.src_path}")
-            self._process_file(event.src_path)
+            self.submit(event.src_path)
+
+    def submit(self, file_path: str) -> None:
+        """
+        Queue a file for ingestion. Blocks while the queue is full.
+        """
+        table_name = self._resolve_table(os.path.basename(file_path).lower())
+        priority = FILE_PRIORITY.get(table_name, UNKNOWN_FILE_PRIORITY)
+
+        self._queue.put((priority, next(self._sequence), file_path))
+
+    def shutdown(self, timeout: Optional[float] = None) -> None:
+        """
+        Drain queued files, then stop the workers.
+        """
+        logger.info("Draining ingestion queue")
+        self._queue.join()
+
+        self._stop_flusher.set()
+        if self._flusher is not None:
+            self._flusher.join(timeout)
+        self._flush_batches()
+
+        for _ in self._workers:
+            self._queue.put((_STOP_PRIORITY, next(self._sequence), None))
+        for worker in self._workers:
+            worker.join(timeout)
+
+        logger.info("Ingestion workers stopped")
+
+    def _worker(self) -> None:
+        while True:
+            priority, _, file_path = self._queue.get()
+            try:
+                if file_path is None:
+                    return
+
+                is_dimension = priority == 0
+                if is_dimension:
+                    with self._dimensions_done:
+                        self._dimensions_in_flight += 1
+                else:
+                    self._wait_for_dimensions()
+
+                # A buffered dimension file stays in flight until its
+                # batch is written
+                buffered = False
+                try:
+                    if self._coalescable(file_path):
+                        buffered = self._buffer_file(file_path, is_dimension)
+                    else:
+                        self._process_file(file_path)
+                finally:
+                    if is_dimension and not buffered:
+                        self._release_dimensions(1)
+            finally:
+                self._queue.task_done()
+
+    def _release_dimensions(self, count: int) -> None:
+        if not count:
+            return
+        with self._dimensions_done:
+            self._dimensions_in_flight -= count
+            self._dimensions_done.notify_all()
+
+    def _wait_for_dimensions(self) -> None:
+        """
+        Block until no dimension file is in flight. Once every such
+        file is parsed and buffered, their batches are written right
+        away instead of waiting out the window.
+        """
+        dimension_tables = [
+            table for table, priority in FILE_PRIORITY.items()
+            if priority == 0
+        ]
+        while True:
+            with self._batches_lock:
+                buffered = sum(
+                    batch.dimension_files for batch in self._batches.values()
+                )
+            with self._dimensions_done:
+                only_buffered = 0 < self._dimensions_in_flight <= buffered
+            if only_buffered:
+                self._flush_batches(dimension_tables)
+
+            with self._dimensions_done:
+                if self._dimensions_done.wait_for(
+                    lambda: self._dimensions_in_flight == 0,
+                    timeout=0.1
+                ):
+                    return
+
+    # -----------------------------
+    # Micro-batching
+    # -----------------------------
+    def _coalescable(self, file_path: str) -> bool:
+        if self.coalesce_window <= 0:
+            return False
+        if not self._resolve_table(os.path.basename(file_path).lower()):
+            return False
+        try:
+            return os.path.getsize(file_path) <= COALESCE_MAX_FILE_BYTES
+        except OSError:
+            return False
+
+    def _buffer_file(self, file_path: str, is_dimension: bool) -> bool:
+        """
+        Parse a small file into its table's batch, writing the batch
+        if that fills it. Returns False if the file could not be read.
+        """
+        file_name = os.path.basename(file_path).lower()
+        table_name = self._resolve_table(file_name)
+
+        try:
+            size = os.path.getsize(file_path)
+            frames = self._parse_file(file_path)
+        except Exception:
+            logger.error(f"Failed to read file: {file_name}", exc_info=True)
+            return False
+
+        with self._batches_lock:
+            batch = self._batches.setdefault(table_name, _TableBatch())
+            batch.add(file_path, frames, size, is_dimension)
+            if not batch.is_full():
+                return True
+            del self._batches[table_name]
+
+        self._write_batch(table_name, batch)
+        return True
+
+    def _parse_file(self, file_path: str) -> List[pd.DataFrame]:
+        if pa_csv is not None:
+            try:
+                return list(self._read_blocks_arrow(file_path))
+            except pa.ArrowInvalid:
+                pass
+        return list(self._read_blocks_pandas(file_path))
+
+    def _flush_expired(self) -> None:
+        """
+        Flusher thread: write batches older than the window.
+        """
+        interval = min(self.coalesce_window / 4, 0.5)
+        while not self._stop_flusher.wait(interval):
+            with self._batches_lock:
+                expired = [
+                    table for table, batch in self._batches.items()
+                    if batch.age() >= self.coalesce_window
+                ]
+            self._flush_batches(expired)
+
+    def _flush_batches(self, tables: Optional[Iterable[str]] = None) -> None:
+        """
+        Write the pending batches of tables (default: all).
+        """
+        with self._batches_lock:
+            names = list(self._batches) if tables is None else list(tables)
+            batches = [
+                (table, self._batches.pop(table))
+                for table in names if table in self._batches
+            ]
+
+        for table_name, batch in batches:
+            self._write_batch(table_name, batch)
+
+    def _write_batch(self, table_name: str, batch: _TableBatch) -> None:
+        """
+        One bulk write and one commit for all files in batch, then
+        move them together. On failure the files stay in raw_data.
+        """
+        try:
+            df = pd.concat(batch.frames, ignore_index=True)
+
+            with self._staging_write():
+                df["ingest_date"] = datetime.utcnow()
+
+                with self.engine.begin() as conn:
+                    rows = copy_dataframe(
+                        conn,
+                        df,
+                        table_name,
+                        schema=STAGING_SCHEMA
+                    )
+            self._committed(table_name, rows)
+
+            logger.info(
+                f"Successfully ingested {len(batch.files)} files "
+                f"({rows} rows) into {STAGING_SCHEMA}.{table_name} "
+                f"in one batch"
+            )
+
+            for file_path in batch.files:
+                self._move_to_processed(file_path)
+
+        except Exception:
+            logger.error(
+                f"Failed to ingest batch of {len(batch.files)} files "
+                f"into {table_name}: {batch.files}",
+                exc_info=True
+            )
+        finally:
+            self._release_dimensions(batch.dimension_files)
 
     def _process_file(self, file_path: str) -> None:
         """
         Process and ingest a single CSV file.
+
+        The file is parsed in fixed-size blocks and each block is
+        streamed into staging as soon as it is parsed. All blocks go
+        in one transaction, so a file lands completely or not at all.
         """
         file_name = os.path.basename(file_path).lower()
-        ingest_date = datetime.utcnow()
 
         try:
             logger.info(f"Starting ingestion for {file_name}")
 
-            df = pd.read_csv(file_path)
-            df["ingest_date"] = ingest_date
-
             table_name = self._resolve_table(file_name)
 
             if not table_name:
                 logger.warning(f"Unknown file type. Skipping: {file_name}")
                 return
 
-            df.to_sql(
-                name=table_name,
-                schema=STAGING_SCHEMA,
-                con=self.engine,
-                if_exists="append",
-                index=False
-            )
+            with self._staging_write():
+                ingest_date = datetime.utcnow()
+
+                if pa_csv is not None:
+                    try:
+                        rows = self._stream_blocks(
+                            self._read_blocks_arrow(file_path),
+                            table_name,
+                            ingest_date
+                        )
+                    except pa.ArrowInvalid:
+                        logger.warning(
+                            f"pyarrow could not parse {file_name} with stable "
+                            f"column types, retrying with pandas"
+                        )
+                        rows = self._stream_blocks(
+                            self._read_blocks_pandas(file_path),
+                            table_name,
+                            ingest_date
+                        )
+                else:
+                    rows = self._stream_blocks(
+                        self._read_blocks_pandas(file_path),
+                        table_name,
+                        ingest_date
+                    )
+            self._committed(table_name, rows)
 
             logger.info(
-                f"Successfully ingested {file_name} "
+                f"Successfully ingested {file_name} ({rows} rows) "
                 f"into {STAGING_SCHEMA}.{table_name}"
             )
 
@@ -105,6 +478,72 @@ class RawDataHandler(FileSystemEventHandler):
                 exc_info=True
             )
 
+    def _staging_write(self):
+        if self.staging_gate is None:
+            return nullcontext()
+        return self.staging_gate.write()
+
+    def _committed(self, table_name: str, rows: int) -> None:
+        if self.on_commit is None:
+            return
+        try:
+            self.on_commit(table_name, rows)
+        except Exception:
+            # Staged rows are safe; the next signal picks them up
+            logger.error("on_commit callback failed", exc_info=True)
+
+    def _stream_blocks(
+        self,
+        blocks: Iterator[pd.DataFrame],
+        table_name: str,
+        ingest_date: datetime
+    ) -> int:
+        rows = 0
+        with self.engine.begin() as conn:
+            for df in blocks:
+                df["ingest_date"] = ingest_date
+                rows += copy_dataframe(
+                    conn,
+                    df,
+                    table_name,
+                    schema=STAGING_SCHEMA
+                )
+        return rows
+
+    @staticmethod
+    def _read_blocks_arrow(file_path: str) -> Iterator[pd.DataFrame]:
+        """
+        Multi-threaded pyarrow parse, CSV_BLOCK_SIZE bytes at a time.
+        """
+        reader = pa_csv.open_csv(
+            file_path,
+            read_options=pa_csv.ReadOptions(
+                block_size=CSV_BLOCK_SIZE,
+                use_threads=True
+            ),
+            convert_options=pa_csv.ConvertOptions(
+                column_types={
+                    col: pa.type_for_alias(dtype)
+                    for col, dtype in CSV_COLUMN_TYPES.items()
+                },
+                null_values=CSV_NULL_VALUES,
+                strings_can_be_null=True
+            )
+        )
+        for batch in reader:
+            yield batch.to_pandas()
+
+    @staticmethod
+    def _read_blocks_pandas(file_path: str) -> Iterator[pd.DataFrame]:
+        yield from pd.read_csv(
+            file_path,
+            chunksize=CSV_CHUNK_ROWS,
+            dtype={
+                col: ("str" if dtype == "string" else dtype)
+                for col, dtype in CSV_COLUMN_TYPES.items()
+            }
+        )
+
     def _move_to_processed(self, file_path: str) -> None:
         """
         Move processed file to processed_files directory.
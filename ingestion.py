@@ -1,18 +1,86 @@
+import argparse
 import time
 from watchdog.observers import Observer
 
 from etl.watchdog_ingest import RawDataHandler
-from db.database import get_engine
+from etl.continuous import (
+    CONTINUOUS_DEBOUNCE_SECONDS,
+    CONTINUOUS_MIN_INTERVAL_SECONDS,
+    ContinuousETL,
+)
+from etl.pipeline import SalesETLPipeline
+from etl.validate_sql import VALIDATION_BACKEND, VALIDATION_BACKENDS
+from db.database import get_engine, pool_stats
+
+RUN_DURATION_SECONDS = 60
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Ingest raw_data files into staging")
+    parser.add_argument(
+        "--continuous",
+        action="store_true",
+        help="Run the ETL after staging commits and keep watching "
+             "until interrupted"
+    )
+    parser.add_argument(
+        "--duration",
+        type=float,
+        default=None,
+        help=f"Seconds to watch (default {RUN_DURATION_SECONDS}, "
+             f"or until interrupted with --continuous)"
+    )
+    parser.add_argument(
+        "--debounce",
+        type=float,
+        default=CONTINUOUS_DEBOUNCE_SECONDS,
+        help="Quiet seconds after the last staging commit before an ETL run"
+    )
+    parser.add_argument(
+        "--min-interval",
+        type=float,
+        default=CONTINUOUS_MIN_INTERVAL_SECONDS,
+        help="Minimum seconds between continuous ETL runs"
+    )
+    parser.add_argument(
+        "--validation-backend",
+        choices=VALIDATION_BACKENDS,
+        default=VALIDATION_BACKEND,
+        help="Validation backend for continuous ETL runs"
+    )
+    return parser.parse_args()
 
-RUN_DURATION_SECONDS = 60  
 
 def main() -> None:
     """
     Start watchdog listener for raw_data ingestion.
     """
+    args = parse_args()
+    duration = args.duration
+    if duration is None and not args.continuous:
+        duration = RUN_DURATION_SECONDS
+
     engine = get_engine()
 
-    event_handler = RawDataHandler(engine)
+    scheduler = None
+    if args.continuous:
+        scheduler = ContinuousETL(
+            SalesETLPipeline(
+                engine=engine,
+                validation_backend=args.validation_backend
+            ),
+            debounce=args.debounce,
+            min_interval=args.min_interval
+        )
+        event_handler = RawDataHandler(
+            engine,
+            staging_gate=scheduler.gate,
+            on_commit=scheduler.notify
+        )
+        scheduler.start()
+    else:
+        event_handler = RawDataHandler(engine)
+
     observer = Observer()
     observer.schedule(event_handler, path="raw_data", recursive=False)
 
@@ -22,15 +90,19 @@ def main() -> None:
     start_time = time.time()
 
     try:
-        while time.time() - start_time < RUN_DURATION_SECONDS:
-            time.sleep(5)
+        while duration is None or time.time() - start_time < duration:
+            time.sleep(1)
     except KeyboardInterrupt:
         print("Ingestion interrupted manually")
 
     finally:
         observer.stop()
         observer.join()
-        print("Ingestion stopped after 1 minute")
+        event_handler.shutdown()
+        if scheduler is not None:
+            scheduler.stop()
+        print(f"Connection pool: {pool_stats(engine)}")
+        print(f"Ingestion stopped after {time.time() - start_time:.0f} seconds")
 
 if __name__ == "__main__":
     main()
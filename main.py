@@ -1,5 +1,83 @@
-from etl.pipeline import SalesETLPipeline
+import argparse
+
+from db.database import get_engine
+from etl.dag import DAG_MAX_WORKERS
+from etl.dw.aggregates import rebuild_aggregates
+from etl.logging_config import setup_logging
+from etl.pipeline import SalesETLPipeline, STREAM_CHUNK_SIZE
+from etl.validate_sql import VALIDATION_BACKEND, VALIDATION_BACKENDS
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run the sales ETL pipeline")
+    parser.add_argument(
+        "--streaming",
+        action="store_true",
+        help="Process sales in bounded chunks instead of one frame"
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=STREAM_CHUNK_SIZE,
+        help="Sales rows per chunk in streaming mode"
+    )
+    parser.add_argument(
+        "--compact-dtypes",
+        action="store_true",
+        help="Use categorical / downcast dtypes to cut frame memory"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=DAG_MAX_WORKERS,
+        help="Threads for independent pipeline steps (1 = sequential)"
+    )
+    parser.add_argument(
+        "--partition-facts",
+        action="store_true",
+        help="Create fact_sales range-partitioned by month (PostgreSQL)"
+    )
+    parser.add_argument(
+        "--validation-backend",
+        choices=VALIDATION_BACKENDS,
+        default=VALIDATION_BACKEND,
+        help="Validate in pandas, or push the rules down into the "
+             "staging database (sql, PostgreSQL only)"
+    )
+    parser.add_argument(
+        "--checkpoint",
+        action="store_true",
+        help="Save the frames after extract, validate and transform so "
+             "a failed run can be resumed"
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue the last failed checkpointed run from its last "
+             "completed stage"
+    )
+    parser.add_argument(
+        "--rebuild-aggregates",
+        action="store_true",
+        help="Recompute the sales_dw.agg_* tables from fact_sales and exit"
+    )
+    return parser.parse_args()
+
 
 if __name__ == "__main__":
-    pipeline = SalesETLPipeline()
-    pipeline.run()
+    args = parse_args()
+    if args.rebuild_aggregates:
+        setup_logging()
+        rebuild_aggregates(get_engine())
+        raise SystemExit(0)
+
+    pipeline = SalesETLPipeline(
+        streaming=args.streaming,
+        chunk_size=args.chunk_size,
+        compact_dtypes=args.compact_dtypes,
+        max_workers=args.workers,
+        partition_facts=args.partition_facts,
+        validation_backend=args.validation_backend,
+        checkpoint=args.checkpoint
+    )
+    pipeline.run(resume=args.resume)
@@ -0,0 +1,54 @@
+"""
+Each pipeline stage must stay within the memory bound of
+benchmarks/pipeline_bench.py: a fixed overhead plus MAX_MEMORY_MULTIPLE
+times the size of its input frames.
+
+Runs on the embedded SQLite stand-in. The 500k-row scale is slow and
+only runs with ETL_MEMORY_TEST_LARGE=1.
+"""
+
+import os
+
+import pytest
+
+from benchmarks.pipeline_bench import (
+    memory_violations,
+    reset_database,
+    run_stages,
+    seed_staging,
+    sqlite_engine,
+)
+
+STAGES = ["extract", "validate", "transform", "load"]
+
+
+@pytest.fixture(scope="module")
+def workdir(tmp_path_factory):
+    """
+    One scratch directory for every scale, as in the bench: reject
+    files, logs and key caches land there instead of in the repo.
+    """
+    path = tmp_path_factory.mktemp("memory_bound")
+    with pytest.MonkeyPatch.context() as mp:
+        mp.chdir(path)
+        yield path
+
+
+@pytest.mark.parametrize("rows", [
+    100_000,
+    pytest.param(500_000, marks=pytest.mark.skipif(
+        not os.environ.get("ETL_MEMORY_TEST_LARGE"),
+        reason="set ETL_MEMORY_TEST_LARGE=1 for the 500k-row scale"
+    )),
+])
+def test_stage_memory_within_bound(rows, workdir):
+    engine = sqlite_engine(str(workdir))
+    try:
+        reset_database(engine)
+        seed_staging(engine, rows, seed=42)
+        stages = run_stages(engine, STAGES)
+    finally:
+        engine.dispose()
+
+    violations = memory_violations([{"sales_rows": rows, "stages": stages}])
+    assert not violations, violations